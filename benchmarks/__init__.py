@@ -0,0 +1,4 @@
+# Headless benchmarks for pomodoro_core; run them from the repository root.
+# `python -m benchmarks` runs the whole suite and prints one JSON document;
+# each module (persistence, task_memory, list_refresh, timer_drift) can also
+# be run on its own, e.g. `python -m benchmarks.timer_drift`.
@@ -0,0 +1,52 @@
+# Runs every benchmark and writes one JSON document, so runs from different
+# versions can be diffed or compared by a script.
+#
+#   python -m benchmarks [--sizes 1k,10k,100k,1M] [--only persistence,timer_drift] [--output results.json]
+import argparse
+import json
+import sys
+
+from . import list_refresh, persistence, session_history, task_memory, timer_drift, timer_manager
+from .common import SIZES, environment, parse_sizes
+
+SUITES = ["persistence", "task_memory", "list_refresh", "timer_drift", "session_history", "timer_manager"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run the benchmark suite")
+    parser.add_argument("--sizes", type=parse_sizes, default=SIZES, help="task counts, e.g. 1k,10k,100k,1M")
+    parser.add_argument("--only", type=lambda text: text.split(","), default=SUITES,
+                        help="comma separated subset of: " + ", ".join(SUITES))
+    parser.add_argument("--sessions", type=int, default=200, help="simulated sessions for timer_drift")
+    parser.add_argument("--history", type=int, default=100_000, help="logged sessions for session_history")
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = {"environment": environment(), "sizes": args.sizes}
+    for suite in args.only:
+        print(f"running {suite}...", file=sys.stderr)
+        if suite == "persistence":
+            results[suite] = persistence.run(args.sizes)
+        elif suite == "task_memory":
+            results[suite] = [task_memory.run(count) for count in args.sizes]
+        elif suite == "list_refresh":
+            results[suite] = list_refresh.run(args.sizes)
+        elif suite == "timer_drift":
+            results[suite] = timer_drift.run(args.sessions)
+        elif suite == "session_history":
+            results[suite] = session_history.run(args.history)
+        elif suite == "timer_manager":
+            results[suite] = timer_manager.run()
+        else:
+            parser.error(f"unknown suite: {suite}")
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
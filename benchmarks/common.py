@@ -0,0 +1,82 @@
+# Helpers shared by the benchmarks: synthetic task data, timing and the
+# environment block written alongside every JSON result.
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+WORDS = ["review", "write", "fix", "plan", "call", "email", "read", "ship", "test", "report",
+         "notes", "draft", "budget", "meeting", "design", "bug", "release", "docs", "invoice", "backup"]
+
+
+def synthetic_task_dicts(count, seed=1):
+    # Built through json.loads like a real data file, so strings are not shared
+    rng = random.Random(seed)
+    start = date(2025, 1, 1).toordinal()
+    tasks = []
+    for i in range(count):
+        due = date.fromordinal(start + rng.randrange(730)).isoformat() if rng.random() < 0.7 else ""
+        tasks.append({
+            "id": i + 1,
+            "title": " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))),
+            "details": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 12))),
+            "due": due,
+            "priority": rng.choice(["High", "Medium", "Low"]),
+            "done": rng.random() < 0.3
+        })
+    return tasks
+
+
+def write_data_file(path, count, seed=1):
+    # A data file as the app writes it: settings, tasks and the journal seq
+    data = {"work_mins": 25, "short_break_mins": 5, "long_break_mins": 15, "pomodoro_target": 4,
+            "tasks": synthetic_task_dicts(count, seed), "seq": 0}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+    return os.path.getsize(path)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def peak_memory(fn):
+    # Peak bytes allocated while fn runs (tracemalloc slows fn down; don't time it)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def environment():
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def parse_sizes(text):
+    return [int(size.replace("_", "").replace("k", "000").replace("M", "000000")) for size in text.split(",")]
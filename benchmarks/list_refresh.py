@@ -0,0 +1,145 @@
+# Cost of refresh_task_list: VirtualTaskList redrawing a real ttk.Treeview
+# over a TaskJournal of N tasks. Needs a display; without $DISPLAY an Xvfb
+# server is started if one is installed, otherwise the run is reported as
+# skipped rather than failing.
+#
+#   python -m benchmarks.list_refresh [--sizes 1k,10k,100k] [--json]
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from pomodoro_core import TaskJournal, TaskQuery
+
+from .common import SIZES, environment, parse_sizes, percentile, write_data_file
+
+REPEAT = 50  # timed calls per operation
+XVFB_DISPLAY = ":99"
+
+
+def start_virtual_display():
+    # Returns (Xvfb process or None, reason it could not be started or None)
+    if os.environ.get("DISPLAY"):
+        return None, None
+    if not shutil.which("Xvfb"):
+        return None, "no $DISPLAY and Xvfb is not installed"
+    process = subprocess.Popen(["Xvfb", XVFB_DISPLAY, "-screen", "0", "1024x768x24"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    if process.poll() is not None:
+        return None, "Xvfb exited at startup"
+    os.environ["DISPLAY"] = XVFB_DISPLAY
+    return process, None
+
+
+def time_calls(fn, repeat=REPEAT):
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return {"p50_ms": percentile(samples, 0.5) * 1000, "p99_ms": percentile(samples, 0.99) * 1000,
+            "max_ms": max(samples) * 1000}
+
+
+def bench_size(root, count):
+    from tkinter import ttk
+    from todo_pomodoro import VirtualTaskList, task_row_values
+
+    work_dir = tempfile.mkdtemp(prefix="pomodoro-bench-")
+    store = TaskJournal(os.path.join(work_dir, "tasks.json"))
+    try:
+        write_data_file(store.snapshot_path, count)
+        store.load()
+        query = TaskQuery(store)
+        tree = ttk.Treeview(root, columns=("Detail", "Due", "Priority", "Done"), show="headings")
+        scroll = ttk.Scrollbar(root, orient="vertical")
+        tree.pack(side="left", fill="both", expand=True)
+        scroll.pack(side="right", fill="y")
+        view = VirtualTaskList(tree, scroll, query, task_row_values)
+        view.refresh()
+        root.update()
+
+        def edit(i):
+            task = store.get(view.rendered[i % len(view.rendered)]).copy()
+            task.title += "!"
+            store.update(task)
+            view.refresh()
+            root.update_idletasks()
+
+        def scroll_page(i):
+            view.scroll(view.page_size if i % 2 == 0 else -view.page_size)
+            root.update_idletasks()
+
+        def jump(i):
+            view.yview("moveto", (i * 0.37) % 1.0)
+            root.update_idletasks()
+
+        def resort(i):
+            query.sort = ("due", "priority", None)[i % 3]
+            view.set_source(query)
+            root.update_idletasks()
+
+        result = {
+            "count": count,
+            "refresh_unchanged": time_calls(lambda i: (view.refresh(), root.update_idletasks())),
+            "refresh_after_edit": time_calls(edit),
+            "scroll_page": time_calls(scroll_page),
+            "jump": time_calls(jump),
+            "resort": time_calls(resort),
+        }
+        tree.destroy()
+        scroll.destroy()
+        return result
+    finally:
+        store.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run(sizes=SIZES):
+    xvfb, reason = start_virtual_display()
+    if reason:
+        return {"skipped": reason}
+    try:
+        import tkinter as tk
+        try:
+            root = tk.Tk()
+        except tk.TclError as e:
+            return {"skipped": f"Tk could not start: {e}"}
+        try:
+            root.geometry("600x500")
+            return {"results": [bench_size(root, count) for count in sizes]}
+        finally:
+            root.destroy()
+    except ImportError as e:
+        return {"skipped": f"tkinter is not available: {e}"}
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark task list refreshes in a real Treeview")
+    parser.add_argument("--sizes", type=parse_sizes, default=SIZES, help="comma separated, e.g. 1k,10k")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+    result = run(args.sizes)
+    if args.json:
+        print(json.dumps({"environment": environment(), "list_refresh": result}, indent=2))
+        return
+    if "skipped" in result:
+        print(f"skipped: {result['skipped']}")
+        return
+    for r in result["results"]:
+        print(f"{r['count']:,} tasks")
+        for name in ("refresh_unchanged", "refresh_after_edit", "scroll_page", "jump", "resort"):
+            t = r[name]
+            print(f"  {name:20} p50 {t['p50_ms']:7.2f}ms  p99 {t['p99_ms']:7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# Load/save throughput and peak memory of both storage backends on synthetic
+# data files (what load_data, save_data and the task buttons cost).
+#
+#   python -m benchmarks.persistence [--sizes 1k,10k,100k,1M] [--json]
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+
+from pomodoro_core import SQLiteTaskStore, TaskJournal, migrate_json_to_sqlite
+
+from .common import SIZES, environment, parse_sizes, peak_memory, timed, write_data_file
+
+EDITS = 10_000  # task edits per run, capped at the task count
+
+
+def bench_journal(path, count, edits):
+    store = TaskJournal(path)
+    _, load_s = timed(store.load)
+
+    rng = random.Random(2)
+    ids = rng.sample(range(1, count + 1), edits)
+
+    def edit_all():
+        for task_id in ids:
+            task = store.get(task_id).copy()
+            task.title += " (edited)"
+            store.update(task)
+        return store.flush()
+
+    _, edit_s = timed(edit_all)
+    writes = store.writer.stats()["writes"]
+    # What a full save (compaction) of the whole list costs
+    _, save_s = timed(lambda: store.compact(wait=True))
+    store.close()
+
+    def load_and_close():
+        store = TaskJournal(path)
+        store.load()
+        store.close()
+
+    load_peak = peak_memory(load_and_close)
+    return {
+        "load_s": load_s,
+        "load_tasks_per_s": count / load_s,
+        "load_peak_bytes": load_peak,
+        "edits": edits,
+        "edit_s": edit_s,
+        "edits_per_s": edits / edit_s,
+        "edit_writes": writes,
+        "save_s": save_s,
+        "save_tasks_per_s": count / save_s,
+        "save_bytes": os.path.getsize(path),
+    }
+
+
+def bench_sqlite(json_path, db_path, count, edits):
+    _, migrate_s = timed(lambda: migrate_json_to_sqlite(json_path, db_path))
+    store = SQLiteTaskStore(db_path)
+    _, load_s = timed(store.load)
+    _, page_s = timed(lambda: store.page(count // 2, 50, sort="due"))
+
+    rng = random.Random(2)
+    ids = rng.sample(range(1, count + 1), edits)
+
+    def edit_all():
+        for task_id in ids:
+            task = store.get(task_id).copy()
+            task.title += " (edited)"
+            store.update(task)
+        return store.flush()
+
+    _, edit_s = timed(edit_all)
+    writes = store.writer.stats()["writes"]
+    store.close()
+    return {
+        "migrate_s": migrate_s,
+        "migrate_tasks_per_s": count / migrate_s,
+        "load_s": load_s,
+        "sorted_page_s": page_s,
+        "edits": edits,
+        "edit_s": edit_s,
+        "edits_per_s": edits / edit_s,
+        "edit_writes": writes,
+        "db_bytes": os.path.getsize(db_path),
+    }
+
+
+def run(sizes=SIZES):
+    results = []
+    for count in sizes:
+        work_dir = tempfile.mkdtemp(prefix="pomodoro-bench-")
+        try:
+            json_path = os.path.join(work_dir, "tasks.json")
+            file_bytes = write_data_file(json_path, count)
+            edits = min(count, EDITS)
+            results.append({
+                "count": count,
+                "file_bytes": file_bytes,
+                "json": bench_journal(json_path, count, edits),
+                "sqlite": bench_sqlite(json_path, os.path.join(work_dir, "tasks.db"), count, edits),
+            })
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark task loading and saving")
+    parser.add_argument("--sizes", type=parse_sizes, default=SIZES, help="comma separated, e.g. 1k,10k")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+    results = run(args.sizes)
+    if args.json:
+        print(json.dumps({"environment": environment(), "persistence": results}, indent=2))
+        return
+    for r in results:
+        j, s = r["json"], r["sqlite"]
+        print(f"{r['count']:,} tasks ({r['file_bytes'] / 2**20:.1f} MiB)")
+        print(f"  json:   load {j['load_s']:.3f}s ({j['load_tasks_per_s']:,.0f}/s, peak {j['load_peak_bytes'] / 2**20:.1f} MiB)"
+              f"  save {j['save_s']:.3f}s  {j['edits']:,} edits {j['edit_s']:.3f}s in {j['edit_writes']} writes")
+        print(f"  sqlite: migrate {s['migrate_s']:.3f}s  load {s['load_s']:.4f}s  sorted page {s['sorted_page_s'] * 1000:.2f}ms"
+              f"  {s['edits']:,} edits {s['edit_s']:.3f}s in {s['edit_writes']} writes")
+
+
+if __name__ == "__main__":
+    main()
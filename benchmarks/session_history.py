@@ -0,0 +1,86 @@
+# Session history: appending, reading the log back and building the Stats
+# tab (today, this week, last 7 days, streak, top tasks) from the running
+# totals, for years' worth of synthetic sessions.
+#
+#   python -m benchmarks.session_history [--sessions 100000] [--json]
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import date
+
+from pomodoro_core import SessionLog
+
+from .common import environment, peak_memory, timed
+
+SESSION_GAP = 1800  # seconds between synthetic session starts
+
+
+def fill(log, count, seed=1):
+    rng = random.Random(seed)
+    start = time.time() - count * SESSION_GAP
+    for i in range(count):
+        mode = "Work" if i % 2 == 0 else ("Long Break" if i % 8 == 7 else "Short Break")
+        planned = 1500 if mode == "Work" else 300
+        actual = planned * rng.uniform(0.3, 1.05)
+        task_id = rng.randint(1, 2000) if mode == "Work" else None
+        wall = start + i * SESSION_GAP
+        log.append(mode, wall, wall + actual, wall, wall + actual, planned, task_id, rng.random() < 0.9)
+
+
+def stats_view(log, today):
+    return (log.day(today), log.week(today), log.last_days(7, today), log.streak(today), log.top_tasks(5))
+
+
+def run(count=100_000):
+    work_dir = tempfile.mkdtemp(prefix="pomodoro-bench-")
+    try:
+        path = os.path.join(work_dir, "sessions.bin")
+        log = SessionLog(path)
+        log.load()
+        _, append_s = timed(lambda: fill(log, count))
+        log.close()
+
+        log = SessionLog(path)
+        _, load_s = timed(log.load)
+        today = date.today()
+        _, stats_s = timed(lambda: stats_view(log, today))
+        log.close()
+
+        def load_and_close():
+            loaded = SessionLog(path)
+            loaded.load()
+            loaded.close()
+
+        return {
+            "sessions": count,
+            "file_bytes": os.path.getsize(path),
+            "append_s": append_s,
+            "appends_per_s": count / append_s,
+            "load_s": load_s,
+            "load_peak_bytes": peak_memory(load_and_close),
+            "stats_view_ms": stats_s * 1000,
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the session history log and its stats")
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+    result = run(args.sessions)
+    if args.json:
+        print(json.dumps({"environment": environment(), "session_history": result}, indent=2))
+        return
+    print(f"{result['sessions']:,} sessions ({result['file_bytes'] / 2**20:.1f} MiB)")
+    print(f"  append {result['appends_per_s']:,.0f}/s  load {result['load_s']:.3f}s"
+          f" (peak {result['load_peak_bytes'] / 2**20:.1f} MiB)  stats view {result['stats_view_ms']:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
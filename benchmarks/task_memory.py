@@ -0,0 +1,59 @@
+# Memory used by N tasks held as JSON dicts (as load_data used to keep them)
+# versus the slotted Task model.
+#
+#   python -m benchmarks.task_memory [--count 1000000] [--json]
+import argparse
+import gc
+import json
+import tracemalloc
+
+from pomodoro_core import Task
+
+from .common import synthetic_task_dicts
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def run(count):
+    text = json.dumps(synthetic_task_dicts(count))
+    dicts, dict_bytes = measure(lambda: json.loads(text))
+    sample = dicts[count // 2]
+    del dicts
+    # Decode again so the Tasks own their strings rather than sharing the dicts'
+    tasks, task_bytes = measure(lambda: [Task.from_dict(d) for d in json.loads(text)])
+    assert tasks[count // 2].to_dict() == sample
+    return {
+        "count": count,
+        "dict_bytes": dict_bytes,
+        "task_bytes": task_bytes,
+        "dict_bytes_per_task": dict_bytes / count,
+        "task_bytes_per_task": task_bytes / count,
+        "saving": 1 - task_bytes / dict_bytes,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare task memory: dicts vs. Task")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+    result = run(args.count)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['count']:,} tasks")
+        print(f"  dicts: {result['dict_bytes'] / 2**20:8.1f} MiB ({result['dict_bytes_per_task']:.0f} B/task)")
+        print(f"  Task:  {result['task_bytes'] / 2**20:8.1f} MiB ({result['task_bytes_per_task']:.0f} B/task)")
+        print(f"  saving: {result['saving']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
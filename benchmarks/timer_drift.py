@@ -0,0 +1,157 @@
+# Timer accuracy over simulated Pomodoro days. A fake clock and event loop
+# stand in for time.monotonic and Tk's after(), with callbacks firing late
+# the way a busy Tk loop makes them, so hours of sessions run in seconds.
+# The old one-second countdown (_timer_countdown before TimerEngine) is
+# simulated under the same delays for comparison.
+#
+#   python -m benchmarks.timer_drift [--sessions 200] [--json]
+import argparse
+import heapq
+import json
+import random
+
+from pomodoro_core import PomodoroCycle, TimerEngine
+
+from .common import environment, percentile
+
+
+class SimulatedLoop:
+    # after()/after_cancel() on a virtual clock. Every callback fires
+    # lateness() seconds after it was due.
+    def __init__(self, lateness):
+        self.now = 0.0
+        self.lateness = lateness
+        self._queue = []
+        self._cancelled = set()
+        self._seq = 0
+        self.callbacks = 0
+
+    def clock(self):
+        return self.now
+
+    def after(self, delay_ms, callback):
+        self._seq += 1
+        heapq.heappush(self._queue, (self.now + delay_ms / 1000 + self.lateness(), self._seq, callback))
+        return self._seq
+
+    def after_cancel(self, handle):
+        self._cancelled.add(handle)
+
+    def run(self):
+        while self._queue:
+            when, seq, callback = heapq.heappop(self._queue)
+            if seq in self._cancelled:
+                self._cancelled.discard(seq)
+                continue
+            self.now = max(self.now, when)
+            self.callbacks += 1
+            callback()
+
+
+def lateness_model(seed, mean_ms, stall_ms, stall_rate):
+    # Mostly small exponential delays, with the occasional long stall
+    rng = random.Random(seed)
+
+    def lateness():
+        late = rng.expovariate(1000 / mean_ms) if mean_ms else 0.0
+        if rng.random() < stall_rate:
+            late += stall_ms / 1000
+        return late
+    return lateness
+
+
+def simulate_engine(sessions, lateness):
+    loop = SimulatedLoop(lateness)
+    cycle = PomodoroCycle()
+    engine = TimerEngine(loop.after, loop.after_cancel, clock=loop.clock)
+    state = {"left": sessions, "started": 0.0, "planned": 0.0, "overrun": []}
+
+    def start_session():
+        engine.set(cycle.duration_seconds())
+        state["started"] = loop.now
+        state["planned"] = cycle.duration_seconds()
+        engine.start()
+
+    def finished():
+        state["overrun"].append(loop.now - state["started"] - state["planned"])
+        state["left"] -= 1
+        if state["left"]:
+            cycle.advance()
+            start_session()
+
+    engine.on_finish = finished
+    start_session()
+    loop.run()
+    return loop, state["overrun"]
+
+
+def simulate_countdown(sessions, lateness):
+    # The pre-TimerEngine loop: after(1000) and subtract one second per tick
+    loop = SimulatedLoop(lateness)
+    cycle = PomodoroCycle()
+    state = {"left": sessions, "started": 0.0, "planned": 0.0, "seconds": 0, "overrun": []}
+
+    def start_session():
+        state["seconds"] = state["planned"] = cycle.duration_seconds()
+        state["started"] = loop.now
+        loop.after(1000, countdown)
+
+    def countdown():
+        state["seconds"] -= 1
+        if state["seconds"] > 0:
+            loop.after(1000, countdown)
+            return
+        state["overrun"].append(loop.now - state["started"] - state["planned"])
+        state["left"] -= 1
+        if state["left"]:
+            cycle.advance()
+            start_session()
+
+    start_session()
+    loop.run()
+    return loop, state["overrun"]
+
+
+def summarize(loop, overrun):
+    return {
+        "simulated_hours": loop.now / 3600,
+        "callbacks": loop.callbacks,
+        "mean_overrun_s": sum(overrun) / len(overrun),
+        "p50_overrun_s": percentile(overrun, 0.5),
+        "p99_overrun_s": percentile(overrun, 0.99),
+        "max_overrun_s": max(overrun),
+        "total_overrun_s": sum(overrun),
+    }
+
+
+def run(sessions=200, mean_ms=4.0, stall_ms=250.0, stall_rate=0.01, seed=1):
+    model = dict(mean_ms=mean_ms, stall_ms=stall_ms, stall_rate=stall_rate)
+    return {
+        "sessions": sessions,
+        "lateness": model,
+        "engine": summarize(*simulate_engine(sessions, lateness_model(seed, **model))),
+        "one_second_countdown": summarize(*simulate_countdown(sessions, lateness_model(seed, **model))),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate timer drift over many sessions")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--mean-ms", type=float, default=4.0, help="mean callback lateness")
+    parser.add_argument("--stall-ms", type=float, default=250.0, help="extra lateness of a stalled callback")
+    parser.add_argument("--stall-rate", type=float, default=0.01, help="fraction of callbacks that stall")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+    result = run(args.sessions, args.mean_ms, args.stall_ms, args.stall_rate)
+    if args.json:
+        print(json.dumps({"environment": environment(), "timer_drift": result}, indent=2))
+        return
+    print(f"{result['sessions']} sessions, {result['engine']['simulated_hours']:.1f} simulated hours")
+    for name in ("engine", "one_second_countdown"):
+        r = result[name]
+        print(f"  {name:22} overrun mean {r['mean_overrun_s'] * 1000:8.1f}ms  p99 {r['p99_overrun_s'] * 1000:8.1f}ms"
+              f"  max {r['max_overrun_s'] * 1000:8.1f}ms  ({r['callbacks']:,} callbacks)")
+
+
+if __name__ == "__main__":
+    main()
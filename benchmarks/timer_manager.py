@@ -0,0 +1,72 @@
+# Many named timers on one TimerManager: simulated hours of staggered
+# sessions for growing timer counts, on the same virtual clock and late
+# event loop as timer_drift. Reports loop callbacks, CPU time and memory
+# per session, which should stay flat as the count grows.
+#
+#   python -m benchmarks.timer_manager [--counts 10,100,1000,10000] [--hours 4] [--json]
+import argparse
+import json
+import random
+import time
+
+from pomodoro_core import TimerManager
+
+from .common import environment, peak_memory, percentile
+from .timer_drift import SimulatedLoop, lateness_model
+
+COUNTS = [10, 100, 1_000, 10_000]
+
+
+def simulate(count, hours, seed=1):
+    rng = random.Random(seed)
+    loop = SimulatedLoop(lateness_model(seed, mean_ms=4.0, stall_ms=250.0, stall_rate=0.01))
+    finished = []
+    manager = TimerManager(loop.after, loop.after_cancel, on_finish=lambda timer: finished.append(timer.last_drift),
+                           clock=loop.clock)
+    for i in range(count):
+        # Different lengths, and a head start so the deadlines are spread out
+        manager.add(f"timer-{i}", {"work_mins": rng.randint(15, 50), "short_break_mins": rng.randint(3, 10)})
+        manager.get(f"timer-{i}").remaining = rng.uniform(1, 25 * 60)
+        manager.start(f"timer-{i}")
+    loop.after(hours * 3600 * 1000, manager.close)
+    loop.run()
+    return manager, loop, finished
+
+
+def run_one(count, hours=4):
+    start = time.process_time()
+    manager, loop, finished = simulate(count, hours)
+    cpu_s = time.process_time() - start
+    return {
+        "timers": count,
+        "sessions": len(finished),
+        "callbacks": loop.callbacks,
+        "callbacks_per_session": loop.callbacks / max(1, len(finished)),
+        "cpu_us_per_session": cpu_s * 1e6 / max(1, len(finished)),
+        "p99_drift_ms": percentile(finished, 0.99) * 1000,
+        "peak_bytes_per_timer": peak_memory(lambda: simulate(count, 0)) / count,
+    }
+
+
+def run(counts=COUNTS, hours=4):
+    return [run_one(count, hours) for count in counts]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark many timers on one TimerManager")
+    parser.add_argument("--counts", type=lambda text: [int(n) for n in text.split(",")], default=COUNTS)
+    parser.add_argument("--hours", type=float, default=4)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+    results = run(args.counts, args.hours)
+    if args.json:
+        print(json.dumps({"environment": environment(), "timer_manager": results}, indent=2))
+        return
+    for r in results:
+        print(f"{r['timers']:>7,} timers: {r['sessions']:>8,} sessions, {r['callbacks_per_session']:.2f} callbacks"
+              f" and {r['cpu_us_per_session']:.1f}µs CPU each, p99 drift {r['p99_drift_ms']:.1f}ms,"
+              f" {r['peak_bytes_per_timer']:,.0f} bytes/timer")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Headless core of the ToDo + Pomodoro app: task storage, search, due-date
+# reminders, undo/redo, audio, the timer, the session history, the local
+# control API and the instrumentation behind the Diagnostics tab.
+# Nothing in here imports tkinter, and platform audio modules are only
+# imported by the sink that needs them, so scripts, tests and benchmarks
+# can use it without a display.
+from .audio import (
+    AudioPlayer,
+    NullSink,
+    RecordingSink,
+    SoundClip,
+    SubprocessSink,
+    WinsoundSink,
+    default_sink,
+    load_clip,
+)
+from .control import ControlServer, parse_address
+from .history import SESSION_LOG_FILE, SessionLog, SessionTotals
+from .locking import FileLock
+from .metrics import LatencyStat, Metrics, percentile
+from .ordering import SORT_KEYS, TaskOrdering
+from .reminders import ReminderSchedule, due_deadline
+from .search import MIN_PREFIX, SearchIndex, SearchQuery, tokenize
+from .storage import (
+    APP_DATA_FILE,
+    SQLITE_DATA_FILE,
+    SQLiteTaskStore,
+    StoreEvents,
+    TaskJournal,
+    TaskQuery,
+    migrate_json_to_sqlite,
+    open_store,
+)
+from .tasks import (
+    DUE_FORMAT,
+    NO_DUE,
+    PRIORITIES,
+    PRIORITY_RANK,
+    Priority,
+    Task,
+    format_due,
+    parse_due,
+    validate_due,
+)
+from .transfer import TRANSFER_BATCH, TaskExporter, TaskImporter, detect_format, task_from_record
+from .timer import (
+    DEFAULT_SETTINGS,
+    MODES,
+    NamedTimer,
+    PomodoroCycle,
+    TimerEngine,
+    TimerManager,
+    validate_settings,
+)
+from .undo import UndoHistory, UndoStep
@@ -0,0 +1,222 @@
+import io
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import threading
+import time
+import wave
+from collections import deque
+
+# Players tried in order on systems without winsound; each reads a WAV from stdin
+SUBPROCESS_PLAYERS = [
+    ["aplay", "-q", "-"],
+    ["paplay"],
+    ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet", "-"],
+]
+
+
+class SoundClip:
+    # A WAV file decoded once into memory. wav_bytes is a complete WAV image
+    # that sinks can play without touching the disk again.
+    __slots__ = ("path", "channels", "sample_width", "frame_rate", "frames", "wav_bytes")
+
+    def __init__(self, path, channels, sample_width, frame_rate, frames):
+        self.path = path
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frame_rate = frame_rate
+        self.frames = frames
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as out:
+            out.setnchannels(channels)
+            out.setsampwidth(sample_width)
+            out.setframerate(frame_rate)
+            out.writeframes(frames)
+        self.wav_bytes = buffer.getvalue()
+
+    @property
+    def duration(self):
+        return len(self.frames) / (self.channels * self.sample_width * self.frame_rate)
+
+
+def load_clip(path):
+    # Raises wave.Error (or EOFError/OSError) for files that are not PCM WAV
+    with wave.open(path, "rb") as source:
+        return SoundClip(path, source.getnchannels(), source.getsampwidth(),
+                         source.getframerate(), source.readframes(source.getnframes()))
+
+
+# ----- sinks: play(clip) blocks until the clip is done; called on the worker -----
+class NullSink:
+    name = "null"
+
+    def play(self, clip):
+        pass
+
+    def stop(self):
+        pass
+
+
+class RecordingSink(NullSink):
+    # Remembers what was played and when; for tests and benchmarks.
+    # hold makes play() take that many seconds, like a real device would.
+    name = "recording"
+
+    def __init__(self, hold=0.0, clock=time.perf_counter):
+        self.hold = hold
+        self.clock = clock
+        self.played = []  # (clip, clock() when playback started)
+
+    def play(self, clip):
+        self.played.append((clip, self.clock()))
+        if self.hold:
+            time.sleep(self.hold)
+
+
+class WinsoundSink(NullSink):
+    name = "winsound"
+
+    def __init__(self):
+        import winsound  # Windows-only module
+        self.winsound = winsound
+
+    def play(self, clip):
+        # SND_MEMORY can't be combined with SND_ASYNC; we are on the worker anyway
+        self.winsound.PlaySound(clip.wav_bytes, self.winsound.SND_MEMORY)
+
+    def stop(self):
+        self.winsound.PlaySound(None, 0)
+
+
+class SubprocessSink(NullSink):
+    # Pipes the WAV image into an external player such as aplay
+    name = "subprocess"
+
+    def __init__(self, command):
+        self.command = command
+        self._process = None
+
+    def play(self, clip):
+        self._process = subprocess.Popen(self.command, stdin=subprocess.PIPE,
+                                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            self._process.communicate(clip.wav_bytes)
+        finally:
+            self._process = None
+
+    def stop(self):
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.terminate()
+
+
+def default_sink():
+    if platform.system() == "Windows":
+        return WinsoundSink()
+    for command in SUBPROCESS_PLAYERS:
+        if shutil.which(command[0]):
+            return SubprocessSink(command)
+    return NullSink()
+
+
+class AudioPlayer:
+    # Plays sounds on a dedicated worker thread so callers never wait on disk
+    # or on the sound device. Clips are decoded on first use and cached by
+    # path (reloaded if the file changes). A play request that arrives while
+    # another sound is still playing waits for it; repeated requests for the
+    # same sound while one is queued are dropped.
+    def __init__(self, sink=None, clock=time.perf_counter):
+        self.sink = sink if sink is not None else default_sink()
+        self.clock = clock
+        self.clips = {}   # path -> (mtime, SoundClip)
+        self.error = None  # last load/playback error, for the UI to report
+        self.plays = 0
+        self.latencies = deque(maxlen=100)  # seconds from play() to the sink starting
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._closing = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="audio", daemon=True)
+        self._thread.start()
+
+    def load(self, path):
+        # Decode now (or reuse the cached clip); raises if it isn't a PCM WAV
+        return self._clip(path)
+
+    def preload(self, path):
+        # Decode ahead of time, on the worker
+        self._queue.put(("load", path, None))
+
+    def play(self, path):
+        with self._lock:
+            if path in self._queued:
+                return
+            self._queued.add(path)
+        self._queue.put(("play", path, self.clock()))
+
+    def take_error(self):
+        with self._lock:
+            error, self.error = self.error, None
+            return error
+
+    def stats(self):
+        with self._lock:
+            last = self.latencies[-1] if self.latencies else 0.0
+            latencies = sorted(self.latencies) or [0.0]
+            plays = self.plays
+        return {
+            "sink": self.sink.name,
+            "plays": plays,
+            "last_latency_ms": last * 1000,
+            "median_latency_ms": latencies[len(latencies) // 2] * 1000,
+            "max_latency_ms": latencies[-1] * 1000,
+        }
+
+    def wait_idle(self, timeout=None):
+        # Block until everything queued so far has been handled (for tests)
+        done = threading.Event()
+        self._queue.put(("mark", done, None))
+        return done.wait(timeout)
+
+    def close(self, timeout=1.0):
+        # Cuts off a sound that is still playing rather than waiting for it
+        self._closing = True
+        self.sink.stop()
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _clip(self, path):
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            cached = self.clips.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, load_clip(path))
+            with self._lock:
+                self.clips[path] = cached
+        return cached[1]
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            action, arg, requested = item
+            if action == "mark":
+                arg.set()
+                continue
+            if action == "play":
+                with self._lock:
+                    self._queued.discard(arg)
+            try:
+                clip = self._clip(arg)
+                if action == "play" and not self._closing:
+                    started = self.clock()
+                    with self._lock:
+                        self.latencies.append(started - requested)
+                        self.plays += 1
+                    self.sink.play(clip)
+            except Exception as e:  # bad files, and whatever the sink raises (winsound: RuntimeError)
+                with self._lock:
+                    self.error = e
@@ -0,0 +1,261 @@
+import asyncio
+import concurrent.futures
+import json
+import os
+import queue
+import socket
+import stat
+import threading
+
+EVENT_BACKLOG = 256        # events queued per subscriber; a slow one loses the oldest
+MAX_REQUEST_BYTES = 1 << 20
+TOPICS = ("tick", "tasks")
+LOCAL_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+
+def parse_address(text):
+    # "PORT" or "HOST:PORT" -> (host, port) on TCP; anything else is a Unix socket path.
+    # Anyone who can connect may edit tasks, so TCP only listens on loopback.
+    host, _, port = text.rpartition(":")
+    if port.isdigit() and os.sep not in text:
+        host = host.strip("[]") or "127.0.0.1"
+        if host not in LOCAL_HOSTS:
+            raise ValueError(f"the control API has no authentication, so it only listens on "
+                             f"{', '.join(LOCAL_HOSTS)}, not {host}")
+        return (host, int(port))
+    return text
+
+
+def describe_error(error):
+    if isinstance(error, KeyError):
+        return f"not found: {error.args[0]!r}"
+    return str(error) or type(error).__name__
+
+
+class ControlServer:
+    # Local API for scripts and plugins: JSON Lines over a Unix socket or a
+    # localhost port, served by asyncio on its own thread. A request is
+    # {"id": 1, "method": "tasks.add", "params": {...}} and the reply
+    # {"id": 1, "result": ...} or {"id": 1, "error": "..."}.
+    #
+    # Handlers touch Tk and the store, so they never run here: calls wait
+    # in a queue that the app drains on the Tk thread with run_pending().
+    # "status" is answered from the last status the app published, so any
+    # number of clients can poll it without the GUI noticing. "batch" runs
+    # several calls in one trip to the Tk thread. "subscribe" adds the
+    # connection to a topic; events arrive as {"event": topic, "data": ...}.
+    def __init__(self, address, handlers, status=None):
+        self.address = address    # (host, port) or a socket path, see parse_address()
+        self.handlers = handlers  # method -> fn(params), run on the Tk thread
+        self.status = status or {}  # replaced whole by the app, never changed in place
+        self.calls = queue.SimpleQueue()  # (fn, params, future) for run_pending()
+        self.clients = 0
+        self.requests = 0
+        self.dropped_events = 0
+        self._subscribers = {topic: set() for topic in TOPICS}  # topic -> event queues
+        self._events = []         # published but not yet handed to the loop
+        self._events_lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._started = threading.Event()
+        self._start_error = None
+
+    def start(self):
+        # Raises OSError if the address can't be bound
+        self._thread = threading.Thread(target=self._run, name="control-server", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self._start_error is not None:
+            raise self._start_error
+
+    def stop(self):
+        if self._loop is None or not self._thread.is_alive():
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2)
+
+    def stats(self):
+        return {
+            "clients": self.clients,
+            "requests": self.requests,
+            "subscribers": {topic: len(queues) for topic, queues in self._subscribers.items()},
+            "dropped_events": self.dropped_events,
+        }
+
+    # ----- Tk thread -----
+    def run_pending(self, limit=100):
+        # Runs up to limit queued calls; returns how many ran
+        for ran in range(limit):
+            try:
+                fn, params, future = self.calls.get_nowait()
+            except queue.Empty:
+                return ran
+            if not future.set_running_or_notify_cancel():
+                continue  # the client went away
+            try:
+                future.set_result(fn(params))
+            except Exception as e:
+                future.set_exception(e)
+        return limit
+
+    def wants(self, topic):
+        # Cheap check, so callers can skip building events nobody reads
+        return bool(self._subscribers[topic])
+
+    def publish(self, topic, data):
+        # Safe from any thread; events reach the loop in batches, one wake-up each
+        if not self._subscribers[topic] or self._loop is None:
+            return
+        with self._events_lock:
+            wake = not self._events
+            self._events.append((topic, data))
+        if wake:
+            self._loop.call_soon_threadsafe(self._deliver)
+
+    # ----- event loop thread -----
+    def _run(self):
+        loop = self._loop = asyncio.new_event_loop()
+        try:
+            server = loop.run_until_complete(self._listen())
+        except OSError as e:
+            self._start_error = e
+            self._started.set()
+            loop.close()
+            return
+        self._started.set()
+        try:
+            loop.run_forever()
+        finally:
+            server.close()
+            for task in asyncio.all_tasks(loop):
+                task.cancel()
+            loop.run_until_complete(asyncio.sleep(0))
+            loop.close()
+            if isinstance(self.address, str):
+                try:
+                    os.remove(self.address)
+                except OSError:
+                    pass
+
+    async def _listen(self):
+        if not isinstance(self.address, str):
+            host, port = self.address
+            return await asyncio.start_server(self._serve, host, port, limit=MAX_REQUEST_BYTES)
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix sockets are not available here; give a port instead")
+        try:
+            if stat.S_ISSOCK(os.stat(self.address).st_mode):
+                os.remove(self.address)  # left behind by an instance that crashed
+        except FileNotFoundError:
+            pass
+        server = await asyncio.start_unix_server(self._serve, self.address, limit=MAX_REQUEST_BYTES)
+        os.chmod(self.address, 0o600)  # only this user may drive the app
+        return server
+
+    async def _serve(self, reader, writer):
+        self.clients += 1
+        events = asyncio.Queue(EVENT_BACKLOG)
+        sender = asyncio.ensure_future(self._send_events(events, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(self._encode({"id": None, "error": "request too long"}))
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    writer.write(self._encode(await self._handle(line, events)))
+                    await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # client gone, or the server is stopping
+        finally:
+            for queues in self._subscribers.values():
+                queues.discard(events)
+            sender.cancel()
+            writer.close()
+            self.clients -= 1
+
+    async def _handle(self, line, events):
+        self.requests += 1
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("a request is a JSON object")
+        except ValueError as e:
+            return {"id": None, "error": f"bad request: {e}"}
+        request_id = request.get("id")
+        method = request.get("method")
+        params = request.get("params") or {}
+        try:
+            if method == "status":
+                result = self.status
+            elif method in ("subscribe", "unsubscribe"):
+                topics = params.get("topics") or list(TOPICS)
+                for topic in topics:
+                    if topic not in self._subscribers:
+                        raise ValueError(f"unknown topic {topic!r}")
+                for topic in topics:
+                    if method == "subscribe":
+                        self._subscribers[topic].add(events)
+                    else:
+                        self._subscribers[topic].discard(events)
+                result = sorted(topic for topic, queues in self._subscribers.items() if events in queues)
+            elif method == "batch":
+                calls = [(self._handler(call.get("method")), call.get("params") or {})
+                         for call in params.get("requests", [])]
+                result = await self._call(self._run_batch, calls)
+            else:
+                result = await self._call(self._handler(method), params)
+        except Exception as e:
+            return {"id": request_id, "error": describe_error(e)}
+        return {"id": request_id, "result": result}
+
+    def _handler(self, method):
+        fn = self.handlers.get(method)
+        if fn is None:
+            raise ValueError(f"unknown method {method!r}")
+        return fn
+
+    async def _call(self, fn, params):
+        # Queued for the Tk thread; this connection waits, the others carry on
+        future = concurrent.futures.Future()
+        self.calls.put((fn, params, future))
+        return await asyncio.wrap_future(future)
+
+    @staticmethod
+    def _run_batch(calls):
+        results = []
+        for fn, params in calls:
+            try:
+                results.append({"result": fn(params)})
+            except Exception as e:
+                results.append({"error": describe_error(e)})
+        return results
+
+    def _deliver(self):
+        with self._events_lock:
+            events, self._events = self._events, []
+        for topic, data in events:
+            line = None
+            for pending in self._subscribers[topic]:
+                if line is None:
+                    line = self._encode({"event": topic, "data": data})
+                if pending.full():
+                    pending.get_nowait()
+                    self.dropped_events += 1
+                pending.put_nowait(line)
+
+    @staticmethod
+    async def _send_events(events, writer):
+        try:
+            while True:
+                writer.write(await events.get())
+                await writer.drain()
+        except ConnectionError:
+            pass
+
+    @staticmethod
+    def _encode(message):
+        return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
@@ -0,0 +1,310 @@
+import heapq
+import os
+import struct
+import threading
+from array import array
+from datetime import date, datetime, timedelta
+
+from .locking import FileLock
+from .timer import MODES
+
+SESSION_LOG_FILE = "todo_pomodoro_sessions.bin"
+LOG_MAGIC = b"PSLOG\x00\x00\x01"  # file type + format version
+# start/end wall time, start/end monotonic time, planned and actual seconds,
+# mode index, completed flag, task id (0 = none)
+RECORD = struct.Struct("<6dBBq")
+NO_TASK = 0
+RETRY_SECONDS = 5.0  # before writing again after a failed write
+
+
+class SessionTotals:
+    # Running totals for one day, week or task
+    __slots__ = ("work_sessions", "completed", "work_seconds", "break_seconds")
+
+    def __init__(self):
+        self.work_sessions = 0
+        self.completed = 0       # work sessions that ran to the end
+        self.work_seconds = 0.0
+        self.break_seconds = 0.0
+
+    def add(self, mode, actual, completed):
+        if mode == 0:
+            self.work_sessions += 1
+            self.completed += completed
+            self.work_seconds += actual
+        else:
+            self.break_seconds += actual
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def week_key(day):
+    # (ISO year, ISO week) of a date
+    iso = day.isocalendar()
+    return iso[0], iso[1]
+
+
+class SessionLog:
+    # Every finished or abandoned timer session, appended to a binary file of
+    # fixed-size records and held in memory as parallel arrays (about 60 bytes
+    # a session, no per-session objects). Daily, weekly and per-task totals
+    # are kept up to date on every append, so the stats view never has to
+    # scan the history.
+    #
+    # Several instances may append to the same file: each append happens
+    # under an advisory lock on "<path>.lock", after first reading in the
+    # records the others appended since, and goes to the end of the file.
+    #
+    # append() only updates memory; once load() has opened the file, a
+    # thread of its own does the writing. The records of other instances it
+    # reads on the way are taken in by the next append() or flush(), on the
+    # caller's thread, so only that thread ever touches the arrays.
+    def __init__(self, path=SESSION_LOG_FILE):
+        self.path = path
+        self.lock = FileLock(path + ".lock")
+        self.start_wall = array("d")
+        self.end_wall = array("d")
+        self.start_mono = array("d")
+        self.end_mono = array("d")
+        self.planned = array("d")
+        self.actual = array("d")
+        self.modes = array("B")
+        self.completed = array("B")
+        self.task_ids = array("q")
+        self.days = {}    # date ordinal -> SessionTotals
+        self.weeks = {}   # (ISO year, week) -> SessionTotals
+        self.tasks = {}   # task id -> SessionTotals (work sessions only)
+        self.skipped_bytes = 0  # torn records cut off the end of the file, from crashes
+        self.failures = 0       # failed writes
+        self._file = None
+        self._pos = 0           # bytes of the file read or written by us
+        self._unwritten = []    # packed records of ours, oldest first
+        self._theirs = []       # other instances' records, read but not taken in yet
+        self._writer = None
+        self._closing = False
+        self._cond = threading.Condition()
+        self._day_span = (0.0, 0.0, None, None)  # start/end timestamp, ordinal and week of the last day seen
+
+    def __len__(self):
+        return len(self.modes)
+
+    def load(self):
+        # Read the whole log once; a partial last record is cut off
+        self._clear()
+        self.skipped_bytes = 0
+        with self.lock:
+            data = b""
+            if os.path.isfile(self.path):
+                with open(self.path, "rb") as f:
+                    data = f.read()
+            if data and not data.startswith(LOG_MAGIC):
+                raise ValueError(f"{self.path} is not a session log")
+            if not data:
+                with open(self.path, "wb") as f:
+                    f.write(LOG_MAGIC)
+            self._pos = len(LOG_MAGIC)
+            self._file = open(self.path, "ab")
+            for record in self._read_records(data, len(LOG_MAGIC)):
+                self._absorb(*record)
+        self._closing = False
+        self._writer = threading.Thread(target=self._run, name="session-log", daemon=True)
+        self._writer.start()
+
+    def append(self, mode, start_wall, end_wall, start_mono, end_mono, planned,
+               task_id=None, completed=True, actual=None):
+        # mode is one of MODES; actual is the time the timer ran, pauses left
+        # out, and defaults to the elapsed monotonic time
+        if actual is None:
+            actual = end_mono - start_mono
+        record = (start_wall, end_wall, start_mono, end_mono, float(planned),
+                  max(0.0, float(actual)), MODES.index(mode), int(completed),
+                  task_id if task_id is not None else NO_TASK)
+        self._take_theirs()
+        self._absorb(*record)
+        if self._writer is not None:
+            with self._cond:
+                self._unwritten.append(RECORD.pack(*record))
+                self._cond.notify_all()
+        return len(self) - 1
+
+    def flush(self):
+        # Waits until our sessions are written (or a write fails) and takes in
+        # the others'; returns False if some of ours are not on disk
+        with self._cond:
+            failures = self.failures
+            while self._unwritten and self.failures == failures and self._writer is not None:
+                self._cond.wait()
+            ok = not self._unwritten
+        self._take_theirs()
+        return ok
+
+    def stats(self):
+        with self._cond:
+            return {"sessions": len(self), "unwritten": len(self._unwritten), "failures": self.failures}
+
+    def _take_theirs(self):
+        with self._cond:
+            theirs, self._theirs = self._theirs, []
+        for record in theirs:
+            self._absorb(*record)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._unwritten and not self._closing:
+                    self._cond.wait()
+                if not self._unwritten:
+                    return
+                count = len(self._unwritten)
+                data = b"".join(self._unwritten)
+            theirs = []
+            error = None
+            try:
+                with self.lock:
+                    theirs = self._sync()
+                    self._file.write(data)
+                    self._file.flush()
+                    self._pos += len(data)
+            except OSError as e:
+                error = e
+            with self._cond:
+                self._theirs.extend(theirs)
+                if error is None:
+                    del self._unwritten[:count]
+                else:
+                    self.failures += 1
+                self._cond.notify_all()
+                if error is not None:
+                    if self._closing:
+                        return  # close() reports what is left via flush()
+                    self._cond.wait(RETRY_SECONDS)
+
+    def _sync(self):
+        # Caller holds self.lock. What other instances appended since we last looked
+        size = os.fstat(self._file.fileno()).st_size
+        if size <= self._pos:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self._pos)
+            return self._read_records(f.read(size - self._pos), 0)
+
+    def _read_records(self, data, start):
+        # Caller holds self.lock. Whole records in data[start:], which begins
+        # at self._pos in the file; a partial one at the end can only be left
+        # by a crash (appends happen under the lock), so it is cut off
+        body = memoryview(data)[start:]
+        whole = len(body) - len(body) % RECORD.size
+        records = list(RECORD.iter_unpack(body[:whole]))
+        self._pos += whole
+        if whole != len(body):
+            self.skipped_bytes += len(body) - whole
+            os.truncate(self.path, self._pos)
+        return records
+
+    def session(self, index):
+        task_id = self.task_ids[index]
+        return {
+            "mode": MODES[self.modes[index]],
+            "start": self.start_wall[index],
+            "end": self.end_wall[index],
+            "start_monotonic": self.start_mono[index],
+            "end_monotonic": self.end_mono[index],
+            "planned_s": self.planned[index],
+            "actual_s": self.actual[index],
+            "completed": bool(self.completed[index]),
+            "task_id": task_id if task_id != NO_TASK else None,
+        }
+
+    def recent(self, limit=20):
+        # Newest first
+        return [self.session(i) for i in range(len(self) - 1, max(-1, len(self) - 1 - limit), -1)]
+
+    # ----- rollups -----
+    def day(self, day):
+        return self.days.get(day.toordinal()) or SessionTotals()
+
+    def week(self, day):
+        return self.weeks.get(week_key(day)) or SessionTotals()
+
+    def task(self, task_id):
+        return self.tasks.get(task_id) or SessionTotals()
+
+    def last_days(self, count, today=None):
+        # [(date, SessionTotals)] for the last count days, oldest first
+        end = (today or date.today()).toordinal()
+        return [(date.fromordinal(o), self.days.get(o) or SessionTotals())
+                for o in range(end - count + 1, end + 1)]
+
+    def top_tasks(self, count=5):
+        # [(task_id, SessionTotals)] with the most work time
+        return heapq.nlargest(count, self.tasks.items(), key=lambda item: item[1].work_seconds)
+
+    def streak(self, today=None):
+        # Days in a row, ending today or yesterday, with a completed work session
+        day = (today or date.today()).toordinal()
+        if not self._productive(day):
+            day -= 1
+        streak = 0
+        while self._productive(day):
+            streak += 1
+            day -= 1
+        return streak
+
+    def close(self):
+        # Returns False if sessions of ours could not be written
+        ok = True
+        if self._writer is not None:
+            ok = self.flush()
+            with self._cond:
+                self._closing = True
+                self._cond.notify_all()
+            self._writer.join()
+            self._writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.lock.close()
+        return ok
+
+    def _productive(self, ordinal):
+        totals = self.days.get(ordinal)
+        return totals is not None and totals.completed > 0
+
+    def _absorb(self, start_wall, end_wall, start_mono, end_mono, planned, actual, mode, completed, task_id):
+        self.start_wall.append(start_wall)
+        self.end_wall.append(end_wall)
+        self.start_mono.append(start_mono)
+        self.end_mono.append(end_mono)
+        self.planned.append(planned)
+        self.actual.append(actual)
+        self.modes.append(mode)
+        self.completed.append(completed)
+        self.task_ids.append(task_id)
+
+        day_start, day_end, ordinal, week = self._day_span
+        if not day_start <= start_wall < day_end:
+            # Sessions arrive (mostly) in time order, so the local day rarely changes
+            day = date.fromtimestamp(start_wall)
+            midnight = datetime.combine(day, datetime.min.time())
+            ordinal, week = day.toordinal(), week_key(day)
+            self._day_span = (midnight.timestamp(), (midnight + timedelta(days=1)).timestamp(), ordinal, week)
+        for rollups, key in ((self.days, ordinal), (self.weeks, week)):
+            totals = rollups.get(key)
+            if totals is None:
+                totals = rollups[key] = SessionTotals()
+            totals.add(mode, actual, completed)
+        if mode == 0 and task_id != NO_TASK:
+            totals = self.tasks.get(task_id)
+            if totals is None:
+                totals = self.tasks[task_id] = SessionTotals()
+            totals.add(mode, actual, completed)
+
+    def _clear(self):
+        self.close()
+        for column in (self.start_wall, self.end_wall, self.start_mono, self.end_mono,
+                       self.planned, self.actual, self.modes, self.completed, self.task_ids):
+            del column[:]
+        self.days.clear()
+        self.weeks.clear()
+        self.tasks.clear()
@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+import time
+
+SAMPLE_WINDOW = 1024  # most recent durations kept per stat for p50/p99
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LatencyStat:
+    # Count, errors, total and max of one operation, plus a ring buffer of
+    # the last SAMPLE_WINDOW durations. record() is O(1); percentiles are only
+    # worked out when someone asks for a summary.
+    __slots__ = ("count", "errors", "total", "max", "samples", "_next")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+        self._next = 0
+
+    def record(self, seconds, error=False):
+        self.count += 1
+        if error:
+            self.errors += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if len(self.samples) < SAMPLE_WINDOW:
+            self.samples.append(seconds)
+        else:
+            self.samples[self._next] = seconds
+            self._next = (self._next + 1) % SAMPLE_WINDOW
+
+    def summary(self):
+        samples = sorted(self.samples)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": self.total * 1000 / self.count if self.count else 0.0,
+            "p50_ms": percentile(samples, 0.5) * 1000,
+            "p99_ms": percentile(samples, 0.99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class _Timing:
+    # What Metrics.timed() returns; records on exit, as an error if it raised
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = self.metrics.clock()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.record(self.name, self.metrics.clock() - self.start, exc_type is not None)
+        return False
+
+
+class Metrics:
+    # Named latency stats and counters for the app's hot paths. Safe to
+    # record from any thread. Other components that keep their own numbers
+    # (the store writer, the audio player) are added as sources and read
+    # only when a snapshot is taken.
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started = time.time()
+        self.stats = {}     # name -> LatencyStat
+        self.counters = {}  # name -> int
+        self.sources = {}   # name -> callable returning a JSON-able dict
+        self._lock = threading.Lock()
+
+    def timed(self, name):
+        # with metrics.timed("save_data"): ...
+        return _Timing(self, name)
+
+    def record(self, name, seconds, error=False):
+        with self._lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                stat = self.stats[name] = LatencyStat()
+            stat.record(seconds, error)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_source(self, name, fn):
+        self.sources[name] = fn
+
+    def snapshot(self):
+        with self._lock:
+            latency = {name: stat.summary() for name, stat in sorted(self.stats.items())}
+            counters = dict(sorted(self.counters.items()))
+        data = {
+            "started": self.started,
+            "uptime_s": time.time() - self.started,
+            "latency": latency,
+            "counters": counters,
+        }
+        for name, fn in self.sources.items():
+            data[name] = fn()
+        return data
+
+    def dump(self, path):
+        # Written next to the target and renamed, so readers never see half a file
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            self.counters.clear()
+        self.started = time.time()
@@ -0,0 +1,93 @@
+from bisect import bisect_left, insort
+
+from .tasks import NO_DUE
+
+# Sort orders shared by both storage backends. Open tasks always come before
+# done ones, so the front of the "due" order is the next task to work on.
+SORT_KEYS = {
+    "due": lambda t: (t.done, t.due == NO_DUE, t.due, t.priority, t.id),
+    "priority": lambda t: (t.done, t.priority, t.due == NO_DUE, t.due, t.id),
+}
+OPEN_END = (True,)  # sorts after every open task's key and before every done one
+
+
+class TaskOrdering:
+    # Every SORT_KEYS order kept as a sorted list of key tuples (the task id
+    # is the last element). A change re-files one task with two bisects rather
+    # than re-sorting the whole list; the key each task is filed under is
+    # remembered, since mark_done changes a task in place.
+    def __init__(self, sort_keys=SORT_KEYS):
+        self.sort_keys = sort_keys
+        self.orders = {name: [] for name in sort_keys}
+        self.filed = {}  # task_id -> tuple of keys, one per order
+        self.built = False
+
+    def add_all(self, tasks):
+        # One sort per order for the initial build
+        names = list(self.sort_keys)
+        for task in tasks:
+            self.filed[task.id] = tuple(self.sort_keys[name](task) for name in names)
+        for i, name in enumerate(names):
+            self.orders[name] = sorted(keys[i] for keys in self.filed.values())
+        self.built = True
+
+    def update(self, task):
+        keys = tuple(key(task) for key in self.sort_keys.values())
+        if self.filed.get(task.id) == keys:
+            return
+        self.remove(task.id)
+        for order, key in zip(self.orders.values(), keys):
+            insort(order, key)
+        self.filed[task.id] = keys
+
+    def remove(self, task_id):
+        keys = self.filed.pop(task_id, None)
+        if keys is None:
+            return
+        for order, key in zip(self.orders.values(), keys):
+            del order[bisect_left(order, key)]
+
+    def on_store_change(self, op, task_id, task):
+        if not self.built:
+            return
+        if task is None:
+            self.remove(task_id)
+        else:
+            self.update(task)
+
+    def count(self, show_done=True):
+        order = next(iter(self.orders.values()), [])
+        return len(order) if show_done else bisect_left(order, OPEN_END)
+
+    def first(self, sort="due"):
+        # Id of the top open task in an order, or None when everything is done
+        order = self.orders[sort]
+        if order and order[0] < OPEN_END:
+            return order[0][-1]
+        return None
+
+    def ids(self, sort, offset, limit, show_done=True, descending=False):
+        # A page of task ids. Descending reverses the order within the open
+        # and done groups but still lists open tasks first.
+        order = self.orders[sort]
+        open_count = bisect_left(order, OPEN_END)
+        groups = [(0, open_count)]
+        if show_done:
+            groups.append((open_count, len(order)))
+        ids = []
+        for start, end in groups:
+            size = end - start
+            if offset >= size:
+                offset -= size
+                continue
+            want = limit - len(ids)
+            if descending:
+                hi = end - offset
+                ids.extend(key[-1] for key in reversed(order[max(start, hi - want):hi]))
+            else:
+                lo = start + offset
+                ids.extend(key[-1] for key in order[lo:min(end, lo + want)])
+            offset = 0
+            if len(ids) >= limit:
+                break
+        return ids
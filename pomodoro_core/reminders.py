@@ -0,0 +1,110 @@
+import heapq
+import time
+from datetime import date, datetime
+from functools import lru_cache
+
+from .tasks import NO_DUE
+
+STALE_SLACK = 64  # dead heap entries tolerated beyond the live ones before a rebuild
+
+
+@lru_cache(maxsize=4096)
+def due_deadline(ordinal):
+    # Timestamp a task due on that day becomes overdue: the local midnight after it.
+    # Cached, since thousands of tasks share a handful of due dates
+    return datetime.combine(date.fromordinal(ordinal + 1), datetime.min.time()).timestamp()
+
+
+class ReminderSchedule:
+    # Due-date deadlines of the open tasks, earliest first, in a min-heap of
+    # (deadline, task_id). A change pushes a new entry and leaves the old one
+    # behind; entries that no longer match deadlines[task_id] are dropped
+    # when they reach the top. So a change costs O(log N), and between
+    # deadlines nobody has to look at the tasks at all.
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.heap = []
+        self.deadlines = {}   # task_id -> deadline, for open tasks not yet overdue
+        self.overdue = set()  # open tasks whose due date has passed
+        self.built = False
+
+    def add_all(self, tasks):
+        now = self.clock()
+        for task in tasks:
+            self._forget(task.id)
+            self._track(task, now, push=False)
+        self.heap = [(deadline, task_id) for task_id, deadline in self.deadlines.items()]
+        heapq.heapify(self.heap)
+        self.built = True
+
+    def clear(self):
+        self.heap = []
+        self.deadlines.clear()
+        self.overdue.clear()
+        self.built = False
+
+    def on_store_change(self, op, task_id, task):
+        # Store listener. Ignored until add_all() has built the schedule; an
+        # edit that leaves the deadline alone costs a dict lookup
+        if not self.built:
+            return
+        if op == "reload":
+            self.clear()
+            return
+        deadline = self.deadlines.get(task_id)
+        if deadline is not None and task is not None and deadline == self._deadline(task):
+            return  # edited, but the deadline stayed put
+        self._forget(task_id)
+        if task is not None:
+            self._track(task, self.clock())
+
+    def next_deadline(self):
+        # Earliest live deadline, or None; dead entries on top are dropped
+        heap = self.heap
+        while heap:
+            deadline, task_id = heap[0]
+            if self.deadlines.get(task_id) == deadline:
+                return deadline
+            heapq.heappop(heap)
+        return None
+
+    def pop_due(self, now=None):
+        # Task ids whose deadline has passed by now, in deadline order; they
+        # move to overdue
+        if now is None:
+            now = self.clock()
+        due = []
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > now:
+                return due
+            _, task_id = heapq.heappop(self.heap)
+            del self.deadlines[task_id]
+            self.overdue.add(task_id)
+            due.append(task_id)
+
+    @staticmethod
+    def _deadline(task):
+        if task.done or task.due == NO_DUE:
+            return None
+        return due_deadline(task.due)
+
+    def _forget(self, task_id):
+        # Its heap entry, if any, is now dead
+        self.deadlines.pop(task_id, None)
+        self.overdue.discard(task_id)
+
+    def _track(self, task, now, push=True):
+        deadline = self._deadline(task)
+        if deadline is None:
+            return
+        if deadline <= now:
+            self.overdue.add(task.id)
+            return
+        self.deadlines[task.id] = deadline
+        if push:
+            heapq.heappush(self.heap, (deadline, task.id))
+            if len(self.heap) > 2 * len(self.deadlines) + STALE_SLACK:
+                # Mostly dead entries from tasks edited or closed; start over
+                self.heap = [(d, i) for i, d in self.deadlines.items()]
+                heapq.heapify(self.heap)
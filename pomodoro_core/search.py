@@ -0,0 +1,154 @@
+import re
+from bisect import bisect_left, insort
+
+TOKEN_RE = re.compile(r"\w+")
+TITLE_WEIGHT = 3
+DETAILS_WEIGHT = 1
+MIN_PREFIX = 3  # shorter query terms only match whole words; the app shows every task until then
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class SearchIndex:
+    # Inverted index over task titles and details.
+    # postings maps token -> {task_id: weight}; vocabulary is kept sorted so
+    # prefix lookups for type-ahead are a bisect. Changes are applied per task
+    # (add/update/remove), never by re-scanning the whole task list.
+    def __init__(self):
+        self.postings = {}
+        self.vocabulary = []
+        self.doc_tokens = {}   # task_id -> tokens indexed for it
+        self.done_ids = set()
+        self.version = 0       # bumped on every change, for cached results
+        self.built = False
+
+    def add_all(self, tasks):
+        for task in tasks:
+            self.update(task)
+        self.built = True
+
+    def update(self, task):
+        self.remove(task.id)
+        weights = {}
+        for token in tokenize(task.title):
+            weights[token] = weights.get(token, 0) + TITLE_WEIGHT
+        for token in tokenize(task.details):
+            weights[token] = weights.get(token, 0) + DETAILS_WEIGHT
+        for token, weight in weights.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                insort(self.vocabulary, token)
+            posting[task.id] = weight
+        self.doc_tokens[task.id] = tuple(weights)
+        if task.done:
+            self.done_ids.add(task.id)
+        self.version += 1
+
+    def remove(self, task_id):
+        tokens = self.doc_tokens.pop(task_id, None)
+        if tokens is None:
+            return
+        for token in tokens:
+            posting = self.postings[token]
+            del posting[task_id]
+            if not posting:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+        self.done_ids.discard(task_id)
+        self.version += 1
+
+    def clear(self):
+        self.postings.clear()
+        self.vocabulary.clear()
+        self.doc_tokens.clear()
+        self.done_ids.clear()
+        self.version += 1
+        self.built = False
+
+    def on_store_change(self, op, task_id, task):
+        # Store listener. The index is built on the first search, so until
+        # then changes are ignored; a reload empties it for the next search
+        if not self.built:
+            return
+        if op == "reload":
+            self.clear()  # rebuilt on the next search
+        elif task is None:
+            self.remove(task_id)
+        else:
+            self.update(task)
+
+    def _matches(self, term):
+        # Vocabulary tokens a query term matches, with the exact word (if any) last
+        if len(term) < MIN_PREFIX:
+            return [term] if term in self.postings else []
+        start = bisect_left(self.vocabulary, term)
+        end = bisect_left(self.vocabulary, term + "\U0010ffff", start)
+        tokens = self.vocabulary[start:end]
+        if tokens and tokens[0] == term:
+            tokens.append(tokens.pop(0))
+        return tokens
+
+    def _term_scores(self, tokens):
+        # task_id -> weight for one query term; set operations and dict.update
+        # keep the per-task work in C, which is what makes type-ahead fast
+        if len(tokens) == 1:
+            return self.postings[tokens[0]]
+        merged = {}
+        for token in tokens:
+            merged.update(self.postings[token])
+        return merged
+
+    def search(self, text, show_done=True):
+        # Task ids containing every term (as a word or word prefix), best first
+        terms = set(tokenize(text))
+        if not terms:
+            return []
+        term_scores = []
+        for term in terms:
+            tokens = self._matches(term)
+            if not tokens:
+                return []
+            term_scores.append(self._term_scores(tokens))
+        term_scores.sort(key=len)  # rarest term first keeps the candidate set small
+
+        scored = dict(term_scores[0])
+        for scores in term_scores[1:]:
+            scored = {task_id: scored[task_id] + scores[task_id] for task_id in scored.keys() & scores.keys()}
+            if not scored:
+                return []
+        if not show_done and self.done_ids:
+            for task_id in scored.keys() & self.done_ids:
+                del scored[task_id]
+
+        # Key lookups stay in C; ties keep index order
+        return sorted(scored, key=scored.__getitem__, reverse=True)
+
+
+class SearchQuery:
+    # Search results as a source for the task list (count/page like TaskQuery).
+    # Results are recomputed only when the index has changed since last time.
+    def __init__(self, index, store, text, show_done=True):
+        self.index = index
+        self.store = store
+        self.text = text
+        self.show_done = show_done
+        self._ids = []
+        self._version = None
+
+    def results(self):
+        if self._version != self.index.version:
+            self._ids = self.index.search(self.text, show_done=self.show_done)
+            self._version = self.index.version
+        return self._ids
+
+    def count(self):
+        return len(self.results())
+
+    def ids(self):
+        return list(self.results())
+
+    def page(self, offset, limit):
+        return [self.store.get(task_id) for task_id in self.results()[offset:offset + limit]]
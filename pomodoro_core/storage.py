@@ -0,0 +1,1267 @@
+import json
+import os
+import sqlite3
+import threading
+
+from .locking import FileLock
+from .ordering import SORT_KEYS, TaskOrdering
+from .tasks import NO_DUE, Priority, Task, format_due, parse_due
+from .timer import DEFAULT_SETTINGS
+from .writer import DEBOUNCE_SECONDS, CoalescingWriter
+
+APP_DATA_FILE = "todo_pomodoro_data.json"
+SQLITE_DATA_FILE = "todo_pomodoro_data.db"
+COMPACT_EVERY = 500  # journal records before the snapshot is rewritten
+LOAD_CHUNK = 5000    # tasks decoded per chunk while loading
+ID_BLOCK = 1000      # task ids an instance reserves at a time
+CHANGE_LOG_KEEP = 100_000  # rows of the SQLite change log kept for other instances to catch up from
+
+
+def record_key(record):
+    # The writer key a journal record is queued under: its task id, "ids" or "settings"
+    if "task" in record:
+        task = record["task"]
+        return task["id"] if isinstance(task, dict) else task.id
+    if record["op"] == "ids":
+        return "ids"
+    return record.get("id", "settings")
+
+
+def apply_to_dicts(record, tasks, settings):
+    # A journal record applied to task dicts (id -> dict) and a settings dict
+    op = record["op"]
+    if op == "add" or op == "update":
+        tasks[record["task"]["id"]] = record["task"]
+    elif op == "delete":
+        tasks.pop(record["id"], None)
+    elif op == "done":
+        if record["id"] in tasks:
+            tasks[record["id"]] = dict(tasks[record["id"]], done=True)
+    elif op == "settings":
+        settings.update(record["settings"])
+
+
+class StoreEvents:
+    # Change notifications shared by the storage backends. Listeners are
+    # called on the mutating thread as listener(op, task_id, task), with
+    # op in add/update/delete/done and task None for deletes. ("reload",
+    # None, None) means anything may have changed and caches should be dropped.
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def _notify(self, op, task_id, task):
+        for listener in self.listeners:
+            listener(op, task_id, task)
+
+
+class IdBlocks:
+    # New task ids for stores that other processes share: each instance hands
+    # out ids from a block of ID_BLOCK that is recorded on disk first. The
+    # next block is reserved by the writer thread (an {"op": "ids"} request)
+    # while the current one still has ids left, so adding a task does not
+    # touch the disk. Only a burst that outruns it, or a bigger add_many(),
+    # reserves a block on the spot with _reserve_ids().
+    def _claim_ids(self, count):
+        # First of count consecutive ids for new tasks
+        if self._id_cursor + count > self._id_limit:
+            with self._lock:
+                spare, self._spare_ids = self._spare_ids, None
+            if spare is not None and spare[1] - spare[0] >= count:
+                self._id_cursor, self._id_limit = spare
+            else:
+                self._reserve_ids(max(ID_BLOCK, count))
+        first = self._id_cursor
+        self._id_cursor += count
+        self._want_spare_ids()
+        return first
+
+    def _want_spare_ids(self):
+        if self._id_limit - self._id_cursor < ID_BLOCK // 2 and self._spare_ids is None and not self._spare_wanted:
+            self._spare_wanted = True
+            self.writer.submit("ids", {"op": "ids", "count": ID_BLOCK})
+
+    def _spare_reserved(self, first, count):
+        # Writer thread: the block an "ids" request got
+        with self._lock:
+            self._spare_ids = (first, first + count)
+        self._spare_wanted = False
+
+
+class TaskJournal(StoreEvents, IdBlocks):
+    # Task storage as a JSON snapshot plus an append-only journal of operations.
+    # Changes apply to memory at once and are handed to a CoalescingWriter,
+    # which appends them as fsync'd lines to "<snapshot>.journal" in batches;
+    # loading replays the journal on top of the snapshot. Once the journal
+    # grows past compact_every records, and past the task count, the snapshot
+    # is rewritten in the background.
+    #
+    # Several processes may share the files. Every write happens under an
+    # advisory lock on "<snapshot>.lock", after first reading what the others
+    # appended, so seq numbers stay in order across processes. New task ids
+    # come from blocks reserved in the journal. What the others changed is
+    # applied by reload_changes(), which the app polls via has_changes().
+    def __init__(self, snapshot_path, compact_every=COMPACT_EVERY, debounce=DEBOUNCE_SECONDS):
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path + ".journal"
+        self.compact_every = compact_every
+        self.debounce = debounce
+        self.tasks = {}
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.next_task_id = 1
+        self.seq = 0              # sequence number of the last record written
+        self.journal_records = 0  # records in the journal file
+        self._snapshot_seq = 0
+        self._needs_ids = False   # tasks got new ids while loading
+        self._pinning_ids = None  # compactor writing the snapshot that records them
+        self._fd = None
+        self._lock = threading.Lock()  # tasks vs. the writer and compactor threads
+        self.lock = FileLock(snapshot_path + ".lock")  # the files, between processes and threads
+        self._journal_key = None       # (device, inode) of the journal read so far
+        self._journal_pos = 0          # bytes of it read or written by us
+        self._incoming = []            # records from other processes, for reload_changes()
+        self._snapshot_stale = False   # another process compacted past what we have
+        self._id_cursor = 0            # next id in the block reserved for us
+        self._id_limit = 0
+        self._spare_ids = None         # (first, limit) of the block to use next
+        self._spare_wanted = False     # the writer has been asked for one
+        self._compactor = None
+        self._catcher = None      # thread working out a stale snapshot's changes
+        self._views = {}  # show_done -> cached list of task ids in insertion order
+        self.ordering = TaskOrdering()  # sorted views, built on first use
+        self.writer = None
+        self.listeners = []
+
+    # ----- loading -----
+    # load() does everything at once. The app instead runs read_chunks() on a
+    # worker thread (it only reads files) and feeds each chunk to absorb() on
+    # the UI thread, so tasks appear while the rest of the file is decoded.
+    def load(self):
+        for chunk in self.read_chunks():
+            self.absorb(chunk)
+        return self.finish_load()
+
+    def read_chunks(self, chunk_size=LOAD_CHUNK):
+        snapshot_seq = 0
+        reserved = 0  # ids handed out in blocks, some perhaps not used yet
+        task_list = []
+        settings = {}
+        # Both files are read under the lock, so no compaction lands in between.
+        # A read error (OSError) leaves the files alone and goes to the caller.
+        with self.lock:
+            snapshot = None
+            if os.path.isfile(self.snapshot_path):
+                with open(self.snapshot_path, "rb") as f:
+                    snapshot = f.read()
+            journal = self._read_journal()
+        if snapshot is not None:
+            try:
+                data = json.loads(snapshot)
+                if not isinstance(data, dict):
+                    raise ValueError("expected an object")
+            except ValueError as e:
+                # Keep the unreadable file for inspection, so the next start
+                # begins empty instead of overwriting it
+                with self.lock:
+                    os.replace(self.snapshot_path, self.snapshot_path + ".corrupt")
+                raise ValueError(f"{self.snapshot_path} is not valid JSON ({e}); "
+                                 f"it was moved to {self.snapshot_path}.corrupt") from None
+            task_list = data.get("tasks", [])
+            snapshot_seq = data.get("seq", 0)
+            reserved = data.get("next_task_id", 0)
+            settings = {key: data[key] for key in DEFAULT_SETTINGS if key in data}
+        del snapshot
+
+        next_task_id = max(reserved, max((t["id"] for t in task_list if isinstance(t.get("id"), int)), default=0) + 1)
+        yield ("settings", settings, snapshot_seq, next_task_id)
+        for start in range(0, len(task_list), chunk_size):
+            yield ("tasks", [Task.from_dict(data) for data in task_list[start:start + chunk_size]])
+        yield ("journal", journal)
+
+    def absorb(self, chunk):
+        kind = chunk[0]
+        if kind == "settings":
+            _, settings, snapshot_seq, next_task_id = chunk
+            self.settings.update(settings)
+            self.seq = self._snapshot_seq = snapshot_seq
+            self.next_task_id = next_task_id
+        elif kind == "tasks":
+            with self._lock:
+                for task in chunk[1]:
+                    if not isinstance(task.id, int) or task.id in self.tasks:
+                        task.id = self._new_task_id()
+                        self._needs_ids = True
+                    self.tasks[task.id] = task
+            self._view_changed([task.id for task in chunk[1]], "add")
+            for task in chunk[1]:
+                self._notify("add", task.id, task)
+        elif kind == "journal":
+            records = chunk[1]
+            self.journal_records = len(records)
+            existed = {}  # task_id -> whether it was here before the journal
+            for record in records:
+                if record["seq"] > self._snapshot_seq:
+                    if record["op"] not in ("ids", "base"):
+                        task_id = record["task"]["id"] if "task" in record else record.get("id")
+                        if task_id is not None and task_id not in existed:
+                            existed[task_id] = task_id in self.tasks
+                    with self._lock:
+                        self._apply(record)
+                    self.seq = record["seq"]
+            # Patches the listings already handed out, like any other change
+            self._announce(existed, False)
+
+    def finish_load(self):
+        self._open_journal()
+        self._views.clear()
+        self.ordering = TaskOrdering()
+        if self._needs_ids:
+            # Ids handed out while loading only exist in memory, so pin them
+            # down with a snapshot; the writer waits for it before journaling
+            # anything that uses them, the UI doesn't
+            self.compact()
+            self._pinning_ids = self._compactor
+            self._needs_ids = False
+        self.writer = CoalescingWriter(self._write_batch, self.debounce)
+        self._want_spare_ids()
+        return self.settings
+
+    def _read_journal(self):
+        # Caller holds self.lock
+        try:
+            with open(self.journal_path, "rb") as f:
+                data = f.read()
+                stat = os.fstat(f.fileno())
+        except FileNotFoundError:
+            self._journal_key, self._journal_pos = None, 0
+            return []
+        self._journal_key = (stat.st_dev, stat.st_ino)
+        self._journal_pos = self._trim_torn_tail(data, 0)
+        return self._parse_records(data[:self._journal_pos])
+
+    def _trim_torn_tail(self, data, start):
+        # Whole lines in data (read from offset start). A partial last line is
+        # left by a crash, never by another instance (we hold the lock), so it
+        # is cut off and new records start on a clean line.
+        good = data.rfind(b"\n") + 1
+        if good != len(data):
+            os.truncate(self.journal_path, start + good)
+        return good
+
+    @staticmethod
+    def _parse_records(data):
+        records = []
+        for line in data.splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # unreadable line; later records are still good
+        return records
+
+    def _apply(self, record):
+        op = record["op"]
+        if op == "add" or op == "update":
+            task = Task.from_dict(record["task"])
+            self.tasks[task.id] = task
+            self.next_task_id = max(self.next_task_id, task.id + 1)
+        elif op == "delete":
+            self.tasks.pop(record["id"], None)
+        elif op == "done":
+            if record["id"] in self.tasks:
+                self.tasks[record["id"]].done = True
+        elif op == "settings":
+            self.settings.update(record["settings"])
+        elif op == "ids":
+            self.next_task_id = max(self.next_task_id, record["next"])
+
+    # ----- queries -----
+    def get(self, task_id):
+        return self.tasks[task_id]
+
+    def exists(self, task_id):
+        return task_id in self.tasks
+
+    def get_many(self, task_ids):
+        return [self.tasks[task_id] for task_id in task_ids]
+
+    def task_ids(self, show_done=True):
+        return list(self._view(show_done))
+
+    def all_tasks(self):
+        # A snapshot of the list, so callers may change tasks while iterating
+        return iter(list(self.tasks.values()))
+
+    def due_tasks(self):
+        # Open tasks with a due date, for the reminder schedule
+        with self._lock:
+            return [task for task in self.tasks.values() if not task.done and task.due != NO_DUE]
+
+    def count(self, show_done=True):
+        if show_done:
+            return len(self.tasks)
+        return len(self._view(False))
+
+    def page(self, offset, limit, sort=None, show_done=True, descending=False):
+        if sort:
+            ids = self._ordering().ids(sort, offset, limit, show_done, descending)
+        elif descending:
+            ids = self._view(show_done)
+            end = len(ids) - offset
+            ids = ids[max(0, end - limit):max(0, end)][::-1]
+        else:
+            ids = self._view(show_done)[offset:offset + limit]
+        return [self.tasks[task_id] for task_id in ids]
+
+    def next_task(self):
+        # Top open task by due date, then priority; None if there is none
+        task_id = self._ordering().first("due")
+        return None if task_id is None else self.tasks[task_id]
+
+    def _ordering(self):
+        if not self.ordering.built:
+            with self._lock:
+                self.ordering.add_all(self.tasks.values())
+        return self.ordering
+
+    def _view(self, show_done):
+        ids = self._views.get(show_done)
+        if ids is None:
+            ids = self._views[show_done] = [t.id for t in self.tasks.values() if show_done or not t.done]
+        return ids
+
+    def _view_changed(self, task_ids, op):
+        # Patch cached listings and the sorted orders for a change to some tasks
+        for show_done, ids in list(self._views.items()):
+            if op == "delete":
+                if len(task_ids) == 1:
+                    if task_ids[0] in ids:
+                        ids.remove(task_ids[0])
+                else:
+                    gone = set(task_ids)
+                    ids[:] = [task_id for task_id in ids if task_id not in gone]
+            elif op == "add":
+                ids.extend(task_id for task_id in task_ids if show_done or not self.tasks[task_id].done)
+            elif not show_done:
+                del self._views[show_done]
+        for task_id in task_ids:
+            self.ordering.on_store_change(op, task_id, self.tasks.get(task_id))
+
+    # ----- mutations -----
+    def _new_task_id(self):
+        task_id = self.next_task_id
+        self.next_task_id += 1
+        return task_id
+
+    def _reserve_ids(self, count):
+        # An "ids" record moves every instance's next_task_id past the block
+        try:
+            with self.lock:
+                self._sync_journal()
+                with self._lock:
+                    first = self.next_task_id
+                    self.next_task_id = first + count
+                    self.seq += 1
+                    line = json.dumps({"op": "ids", "next": first + count, "seq": self.seq}, separators=(",", ":"))
+                # No fsync: the adds using these ids are fsync'd after it
+                self._append([line], durable=False)
+        except OSError:
+            # The adds will fail to write too and the writer reports that; carry on locally
+            with self._lock:
+                first = self.next_task_id
+                self.next_task_id = first + count
+        self._id_cursor, self._id_limit = first, first + count
+
+    def add(self, task):
+        task_id = self._claim_ids(1)
+        with self._lock:
+            task.id = task_id
+            self.tasks[task.id] = task
+        self._view_changed([task.id], "add")
+        self.writer.submit(task.id, {"op": "add", "task": task})
+        self._notify("add", task.id, task)
+        return task.id
+
+    def add_many(self, tasks):
+        # Bulk add (imports); all of them go out in one journal write
+        first = self._claim_ids(len(tasks))
+        with self._lock:
+            for i, task in enumerate(tasks):
+                task.id = first + i
+                self.tasks[task.id] = task
+        self._view_changed([task.id for task in tasks], "add")
+        self.writer.submit_many((task.id, {"op": "add", "task": task}) for task in tasks)
+        for task in tasks:
+            self._notify("add", task.id, task)
+        return [task.id for task in tasks]
+
+    def restore_many(self, tasks):
+        # Put deleted tasks back under their old ids (undo); ids are never reused.
+        # Written as updates: a queued delete is undone by them, while an add
+        # followed by a delete would be dropped as never having reached the disk
+        with self._lock:
+            for task in tasks:
+                self.tasks[task.id] = task
+        self._view_changed([task.id for task in tasks], "add")
+        self.writer.submit_many((task.id, {"op": "update", "task": task}) for task in tasks)
+        for task in tasks:
+            self._notify("add", task.id, task)
+
+    def update(self, task):
+        with self._lock:
+            self.tasks[task.id] = task
+        self._view_changed([task.id], "update")
+        self.writer.submit(task.id, {"op": "update", "task": task})
+        self._notify("update", task.id, task)
+
+    def delete(self, task_id):
+        with self._lock:
+            del self.tasks[task_id]
+        self._view_changed([task_id], "delete")
+        self.writer.submit(task_id, {"op": "delete", "id": task_id})
+        self._notify("delete", task_id, None)
+
+    def mark_done(self, task_id):
+        with self._lock:
+            self.tasks[task_id].done = True
+        self._view_changed([task_id], "done")
+        self.writer.submit(task_id, {"op": "done", "id": task_id})
+        self._notify("done", task_id, self.tasks[task_id])
+
+    # Bulk versions: one writer batch, so one journal write, however many tasks
+    def update_many(self, tasks):
+        with self._lock:
+            for task in tasks:
+                self.tasks[task.id] = task
+        self._view_changed([task.id for task in tasks], "update")
+        self.writer.submit_many((task.id, {"op": "update", "task": task}) for task in tasks)
+        for task in tasks:
+            self._notify("update", task.id, task)
+
+    def delete_many(self, task_ids):
+        with self._lock:
+            for task_id in task_ids:
+                del self.tasks[task_id]
+        self._view_changed(task_ids, "delete")
+        self.writer.submit_many((task_id, {"op": "delete", "id": task_id}) for task_id in task_ids)
+        for task_id in task_ids:
+            self._notify("delete", task_id, None)
+
+    def mark_done_many(self, task_ids):
+        with self._lock:
+            for task_id in task_ids:
+                self.tasks[task_id].done = True
+        self._view_changed(task_ids, "done")
+        self.writer.submit_many((task_id, {"op": "done", "id": task_id}) for task_id in task_ids)
+        for task_id in task_ids:
+            self._notify("done", task_id, self.tasks[task_id])
+
+    def save_settings(self, settings):
+        changed = {k: v for k, v in settings.items() if self.settings.get(k) != v}
+        if changed:
+            self.settings.update(changed)
+            self.writer.submit("settings", {"op": "settings", "settings": changed})
+
+    def flush(self):
+        return self.writer.flush()
+
+    # ----- journal file -----
+    def _open_journal(self):
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+        self._fd = os.open(self.journal_path, flags, 0o644)
+
+    def _sync_journal(self):
+        # Caller holds self.lock. Reads what other processes appended since we
+        # last looked, so our seq and ids stay ahead of theirs; their task
+        # changes are queued for reload_changes().
+        try:
+            stat = os.stat(self.journal_path)
+        except FileNotFoundError:
+            stat = None
+        if self._fd is not None and (stat is None or os.fstat(self._fd).st_ino != stat.st_ino):
+            # Replaced by another instance's compaction; append to the new file
+            os.close(self._fd)
+            self._fd = None
+            self._open_journal()
+            stat = os.fstat(self._fd)
+        key = (stat.st_dev, stat.st_ino) if stat else None
+        if key != self._journal_key or (stat and stat.st_size < self._journal_pos):
+            self._journal_key, self._journal_pos = key, 0
+            self.journal_records = 0
+        if stat is None or stat.st_size == self._journal_pos:
+            return
+        with open(self.journal_path, "rb") as f:
+            f.seek(self._journal_pos)
+            data = f.read()
+        good = self._trim_torn_tail(data, self._journal_pos)
+        self._journal_pos += good
+        for record in self._parse_records(data[:good]):
+            self.journal_records += 1
+            self._receive(record)
+
+    def _receive(self, record):
+        if record.get("seq", 0) <= self.seq:
+            return  # ours, or already in our snapshot
+        with self._lock:
+            self.seq = record["seq"]
+            op = record["op"]
+            if op == "base":
+                # Another instance compacted: its snapshot holds everything up to here
+                self._snapshot_stale = True
+                self._incoming = []
+                self.next_task_id = max(self.next_task_id, record.get("next", 0))
+            elif op == "ids":
+                self.next_task_id = max(self.next_task_id, record["next"])
+            else:
+                if "task" in record:
+                    self.next_task_id = max(self.next_task_id, record["task"]["id"] + 1)
+                self._incoming.append(record)
+
+    def _append(self, lines, durable=True):
+        # Caller holds self.lock and has just synced, so we write at _journal_pos
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        os.write(self._fd, data)
+        if durable:
+            os.fsync(self._fd)
+        self._journal_pos += len(data)
+        self.journal_records += len(lines)
+
+    def _write_batch(self, records):
+        # Runs on the writer thread: one write and one fsync for the whole batch
+        if self._pinning_ids is not None:
+            self._pinning_ids.join()
+            self._pinning_ids = None
+        written = {record_key(record) for record in records}
+        spare = None
+        with self.lock:
+            self._sync_journal()
+            with self._lock:
+                lines = []
+                for record in records:
+                    self.seq += 1
+                    if record["op"] == "ids":
+                        # The next block of ids, taken now that we have read everyone's
+                        spare = (self.next_task_id, record["count"])
+                        self.next_task_id += record["count"]
+                        record = {"op": "ids", "next": self.next_task_id, "seq": self.seq}
+                    else:
+                        record = dict(record, seq=self.seq)
+                    if "task" in record:
+                        record["task"] = record["task"].to_dict()
+                    lines.append(json.dumps(record, separators=(",", ":")))
+                # Ours come later, so theirs for the same keys are superseded
+                self._incoming = [r for r in self._incoming if record_key(r) not in written]
+            self._append(lines)
+        if spare is not None:
+            self._spare_reserved(*spare)
+        # A snapshot costs O(tasks) to write, so it waits for at least as many
+        # journal records: bulk imports then compact O(log N) times, not once
+        # a batch, and replaying the journal never costs more than the snapshot
+        if self.journal_records >= max(self.compact_every, len(self.tasks)):
+            self.compact()
+
+    # ----- other instances -----
+    def has_changes(self):
+        # Cheap enough to poll: one stat() of the journal
+        if self._incoming or self._snapshot_stale:
+            return True
+        try:
+            stat = os.stat(self.journal_path)
+        except OSError:
+            return False
+        return (stat.st_dev, stat.st_ino) != self._journal_key or stat.st_size != self._journal_pos
+
+    def reload_changes(self):
+        # Apply what other processes wrote since we last looked; returns
+        # [(op, task_id)] for tasks that changed here, plus ("settings", None)
+        # if the settings did. Tasks with changes of ours still queued keep
+        # our version, which is written after theirs and so wins. The lock is
+        # held until they are applied, so none of ours lands on disk meanwhile.
+        if not self.lock.acquire(blocking=False):
+            return []  # another process is writing; the next poll picks it up
+        try:
+            self._sync_journal()
+            if self._snapshot_stale:
+                # Reading their snapshot is too slow for the UI thread
+                if self._catcher is None or not self._catcher.is_alive():
+                    self._catcher = threading.Thread(target=self._catch_up, daemon=True)
+                    self._catcher.start()
+                return []
+            records = self._incoming
+            self._incoming = []
+            existed, settings_changed = self._merge(records)
+        finally:
+            self.lock.release()
+        return self._announce(existed, settings_changed)
+
+    def _catch_up(self):
+        # Background thread, after another instance's compaction took away the
+        # journal records we hadn't read: diffs its snapshot against our tasks
+        # and leaves the result in _incoming for the next reload_changes()
+        with self.lock:
+            try:
+                self._sync_journal()
+                with open(self.snapshot_path, "rb") as f:
+                    snapshot = f.read()
+                with open(self.journal_path, "rb") as f:
+                    journal = f.read(self._journal_pos)
+                records = self._disk_diff(json.loads(snapshot), self._parse_records(journal))
+            except (OSError, ValueError):
+                return  # still stale, so the next poll tries again
+            with self._lock:
+                self._incoming = records
+                self._snapshot_stale = False
+
+    def _disk_diff(self, data, journal):
+        # Records turning our tasks into what is on disk. Our own writes wait
+        # for the file lock we hold, but the UI thread may edit meanwhile, so
+        # we compare against a copy; its queued edits win in _merge() anyway.
+        with self._lock:
+            tasks = dict(self.tasks)
+            our_settings = dict(self.settings)
+        theirs = {task["id"]: task for task in data.get("tasks", [])}
+        settings = {key: data[key] for key in DEFAULT_SETTINGS if key in data}
+        for record in journal:
+            if record["seq"] > data.get("seq", 0):
+                apply_to_dicts(record, theirs, settings)
+        records = [{"op": "delete", "id": task_id} for task_id in tasks if task_id not in theirs]
+        for task_id, task in theirs.items():
+            ours = tasks.get(task_id)
+            if ours is None or ours.to_dict() != task:
+                records.append({"op": "update", "task": task})
+        if any(our_settings.get(key) != value for key, value in settings.items()):
+            records.append({"op": "settings", "settings": settings})
+        return records
+
+    def _merge(self, records):
+        # Caller holds self.lock; returns which tasks were here before, and
+        # whether the settings changed
+        existed = {}  # task_id -> whether it was here before the merge
+        settings_changed = False
+        with self._lock:
+            for record in records:
+                key = record_key(record)
+                if self.writer is not None and self.writer.is_queued(key):
+                    continue
+                if key == "settings":
+                    settings_changed = True
+                elif key not in existed:
+                    existed[key] = key in self.tasks
+                self._apply(record)
+        return existed, settings_changed
+
+    def _announce(self, existed, settings_changed):
+        changed = {"add": [], "update": [], "delete": []}
+        for task_id, was_here in existed.items():
+            if task_id in self.tasks:
+                changed["update" if was_here else "add"].append(task_id)
+            elif was_here:
+                changed["delete"].append(task_id)
+        changes = []
+        for op, task_ids in changed.items():
+            if task_ids:
+                self._view_changed(task_ids, op)
+                for task_id in task_ids:
+                    self._notify(op, task_id, self.tasks.get(task_id))
+                    changes.append((op, task_id))
+        if settings_changed:
+            changes.append(("settings", None))
+        return changes
+
+    # ----- compaction -----
+    def compact(self, wait=False):
+        if self._compactor and self._compactor.is_alive():
+            if not wait:
+                return
+            self._compactor.join()
+        self._compactor = threading.Thread(target=self._write_snapshot, daemon=True)
+        self._compactor.start()
+        if wait:
+            self._compactor.join()
+
+    def _write_snapshot(self):
+        # Under the file lock throughout, so no instance sees the new snapshot
+        # next to a journal it doesn't belong with
+        with self.lock:
+            try:
+                self._sync_journal()
+            except OSError:
+                return
+            if self._snapshot_stale:
+                return  # another instance just compacted, and we haven't caught up with it
+            with self._lock:
+                tasks = {task.id: task.to_dict() for task in self.tasks.values()}
+                data = dict(self.settings)
+                # Other instances' changes we have read but not applied yet
+                for record in self._incoming:
+                    apply_to_dicts(record, tasks, data)
+                data["tasks"] = list(tasks.values())
+                data["seq"] = self.seq
+                data["next_task_id"] = self.next_task_id
+            tmp_path = self.snapshot_path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.snapshot_path)
+            except OSError:
+                return  # journal still holds everything; retry at the next threshold
+
+            # Everything up to data["seq"] is in the snapshot; the journal starts
+            # over with a "base" record telling other instances so
+            try:
+                journal_tmp = self.journal_path + ".tmp"
+                with open(journal_tmp, "wb") as f:
+                    base = {"op": "base", "seq": data["seq"], "next": data["next_task_id"]}
+                    f.write(json.dumps(base).encode("utf-8") + b"\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.close(self._fd)
+                self._fd = None
+                os.replace(journal_tmp, self.journal_path)
+                self.journal_records = 0
+            except OSError:
+                pass  # old records are skipped by seq on replay, so a full journal is harmless
+            finally:
+                if self._fd is None:
+                    self._open_journal()
+                stat = os.fstat(self._fd)
+                self._journal_key, self._journal_pos = (stat.st_dev, stat.st_ino), stat.st_size
+
+    def close(self):
+        # Returns False if queued changes could not be written
+        ok = self.writer.close() if self.writer else True
+        for thread in (self._compactor, self._catcher):
+            if thread and thread.is_alive():
+                thread.join()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self.lock.close()
+        return ok
+
+
+class SQLiteTaskStore(StoreEvents, IdBlocks):
+    # Tasks in an embedded SQLite database, queried a page at a time.
+    # Only the rows being shown are held in memory; sorting and the done
+    # filter are served by the indexes on due, priority and done.
+    # Writes go through a CoalescingWriter with its own connection; until a
+    # change is committed, get() and page() read it from a small overlay.
+    #
+    # Several processes may share the database; SQLite does the locking.
+    # Triggers log the id of every changed row in "changes", which other
+    # instances read in reload_changes() to pick up what changed under them.
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            details TEXT NOT NULL DEFAULT '',
+            due TEXT,
+            priority INTEGER NOT NULL DEFAULT 1,
+            done INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS tasks_due ON tasks(due IS NULL, due);
+        CREATE INDEX IF NOT EXISTS tasks_priority ON tasks(priority);
+        CREATE INDEX IF NOT EXISTS tasks_done ON tasks(done);
+        CREATE INDEX IF NOT EXISTS tasks_due_queue ON tasks(done, due IS NULL, due, priority, id);
+        CREATE INDEX IF NOT EXISTS tasks_priority_queue ON tasks(done, priority, due IS NULL, due, id);
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER  -- NULL for a settings change
+        );
+        CREATE TRIGGER IF NOT EXISTS tasks_inserted AFTER INSERT ON tasks
+            BEGIN INSERT INTO changes (task_id) VALUES (NEW.id); END;
+        CREATE TRIGGER IF NOT EXISTS tasks_updated AFTER UPDATE ON tasks
+            BEGIN INSERT INTO changes (task_id) VALUES (NEW.id); END;
+        CREATE TRIGGER IF NOT EXISTS tasks_deleted AFTER DELETE ON tasks
+            BEGIN INSERT INTO changes (task_id) VALUES (OLD.id); END;
+        CREATE TRIGGER IF NOT EXISTS settings_changed AFTER INSERT ON settings
+            BEGIN INSERT INTO changes (task_id) VALUES (NULL); END;
+    """
+    # Same orders as SORT_KEYS; descending flips every term but "done"
+    ORDER_BY = {
+        None: ["id"],
+        "due": ["done", "due IS NULL", "due", "priority", "id"],
+        "priority": ["done", "priority", "due IS NULL", "due", "id"],
+    }
+    COLUMNS = "id, title, details, due, priority, done"
+    IN_CHUNK = 500  # ids per "WHERE id IN (...)" query, under SQLite's variable limit
+
+    def __init__(self, db_path, migrate_from=None, debounce=DEBOUNCE_SECONDS):
+        self.db_path = db_path
+        self.migrate_from = migrate_from  # JSON data file imported on first open
+        self.debounce = debounce
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.next_task_id = 1
+        self.conn = None          # reads, on the caller's thread
+        self.write_conn = None    # writes, on the writer thread
+        self.writer = None
+        self._lock = threading.Lock()
+        self._overlay = {}        # task_id -> task dict, or None if deleted, until committed
+        self._counts = {}         # show_done -> cached row count
+        self._id_cursor = 0       # next id in the block reserved for us
+        self._id_limit = 0
+        self._spare_ids = None    # (first, limit) of the block to use next
+        self._spare_wanted = False  # the writer has been asked for one
+        self._change_seq = 0      # last row of the change log we have seen
+        self._own_changes = []    # (first, last) change log rows written by us
+        self._data_version = None
+        self.listeners = []
+
+    # Same loading protocol as TaskJournal; only the one-time migration is
+    # slow enough to be worth doing off the UI thread.
+    def load(self):
+        for chunk in self.read_chunks():
+            self.absorb(chunk)
+        return self.finish_load()
+
+    def read_chunks(self, chunk_size=LOAD_CHUNK):
+        if self.migrate_from and not os.path.isfile(self.db_path) and os.path.isfile(self.migrate_from):
+            migrate_json_to_sqlite(self.migrate_from, self.db_path)
+        return iter(())
+
+    def absorb(self, chunk):
+        pass
+
+    def finish_load(self):
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        for key, value in self.conn.execute("SELECT key, value FROM settings"):
+            self.settings[key] = json.loads(value)
+        self.next_task_id = (self.conn.execute("SELECT MAX(id) FROM tasks").fetchone()[0] or 0) + 1
+        row = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+        self._change_seq = row[0] if row else 0
+        self._data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        self.write_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.write_conn.execute("PRAGMA synchronous=NORMAL")
+        self.writer = CoalescingWriter(self._write_batch, self.debounce)
+        self._want_spare_ids()
+        return self.settings
+
+    @staticmethod
+    def _to_row(task):
+        return (task.id, task.title, task.details, format_due(task.due) or None, int(task.priority), int(task.done))
+
+    @staticmethod
+    def _to_task(row):
+        return Task(row[1], row[2], parse_due(row[3]), Priority(row[4]), bool(row[5]), task_id=row[0])
+
+    # ----- queries -----
+    def get(self, task_id):
+        with self._lock:
+            if task_id in self._overlay:
+                task = self._overlay[task_id]
+                if task is None:
+                    raise KeyError(task_id)
+                return task
+        row = self.conn.execute(f"SELECT {self.COLUMNS} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if row is None:
+            raise KeyError(task_id)
+        return self._to_task(row)
+
+    def exists(self, task_id):
+        with self._lock:
+            if task_id in self._overlay:
+                return self._overlay[task_id] is not None
+        return self.conn.execute("SELECT 1 FROM tasks WHERE id = ?", (task_id,)).fetchone() is not None
+
+    def get_many(self, task_ids):
+        # Like get() for each id, but committed rows are read IN_CHUNK at a time
+        with self._lock:
+            found = {task_id: self._overlay[task_id] for task_id in task_ids if task_id in self._overlay}
+        missing = [task_id for task_id in task_ids if task_id not in found]
+        for start in range(0, len(missing), self.IN_CHUNK):
+            chunk = missing[start:start + self.IN_CHUNK]
+            rows = self.conn.execute(
+                f"SELECT {self.COLUMNS} FROM tasks WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            for row in rows:
+                found[row[0]] = self._to_task(row)
+        tasks = [found.get(task_id) for task_id in task_ids]
+        for task_id, task in zip(task_ids, tasks):
+            if task is None:
+                raise KeyError(task_id)
+        return tasks
+
+    def task_ids(self, show_done=True):
+        where = "" if show_done else " WHERE done = 0"
+        ids = {row[0] for row in self.conn.execute(f"SELECT id FROM tasks{where}")}
+        with self._lock:
+            for task_id, task in self._overlay.items():
+                if task is None or (task.done and not show_done):
+                    ids.discard(task_id)
+                else:
+                    ids.add(task_id)
+        return sorted(ids)
+
+    def all_tasks(self):
+        # Committed rows with uncommitted changes applied, then uncommitted adds
+        with self._lock:
+            overlay = dict(self._overlay)
+        for row in self.conn.execute(f"SELECT {self.COLUMNS} FROM tasks ORDER BY id"):
+            task = overlay.pop(row[0], False)
+            if task is False:
+                yield self._to_task(row)
+            elif task is not None:
+                yield task
+        for task in overlay.values():
+            if task is not None:
+                yield task
+
+    def due_tasks(self):
+        # Open tasks with a due date, served by tasks_due_queue, so the rows
+        # without one are never read
+        with self._lock:
+            overlay = dict(self._overlay)
+        rows = self.conn.execute(f"SELECT {self.COLUMNS} FROM tasks WHERE done = 0 AND (due IS NULL) = 0")
+        tasks = [self._to_task(row) for row in rows if row[0] not in overlay]
+        tasks.extend(t for t in overlay.values() if t is not None and not t.done and t.due != NO_DUE)
+        return tasks
+
+    def count(self, show_done=True):
+        with self._lock:
+            count = self._counts.get(show_done)
+        if count is None:
+            where = "" if show_done else " WHERE done = 0"
+            count = self.conn.execute(f"SELECT COUNT(*) FROM tasks{where}").fetchone()[0]
+            with self._lock:
+                self._counts[show_done] = count
+        return count
+
+    def page(self, offset, limit, sort=None, show_done=True, descending=False):
+        # Uncommitted edits and deletes are patched in; new tasks show up once written
+        where = "" if show_done else " WHERE done = 0"
+        terms = self.ORDER_BY[sort]
+        if descending:
+            terms = [term if term == "done" else term + " DESC" for term in terms]
+        rows = self.conn.execute(
+            f"SELECT {self.COLUMNS} FROM tasks{where} ORDER BY {', '.join(terms)} LIMIT ? OFFSET ?",
+            (limit, offset))
+        tasks = [self._to_task(row) for row in rows]
+        with self._lock:
+            if self._overlay:
+                tasks = [self._overlay.get(t.id, t) for t in tasks]
+                tasks = [t for t in tasks if t is not None]
+        return tasks
+
+    def next_task(self):
+        # Top open task by due date, then priority; served by tasks_due_queue
+        with self._lock:
+            overlay = dict(self._overlay)
+        # Rows with uncommitted changes are judged by their overlay version
+        where = " AND id NOT IN (%s)" % ",".join("?" * len(overlay)) if overlay else ""
+        row = self.conn.execute(
+            f"SELECT {self.COLUMNS} FROM tasks WHERE done = 0{where} "
+            f"ORDER BY {', '.join(self.ORDER_BY['due'])} LIMIT 1", list(overlay)).fetchone()
+        candidates = [t for t in overlay.values() if t is not None and not t.done]
+        if row is not None:
+            candidates.append(self._to_task(row))
+        return min(candidates, key=SORT_KEYS["due"], default=None)
+
+    # ----- mutations -----
+    def _reserve_ids(self, count):
+        # The block is recorded in meta, so no other instance hands out the same ids
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            first = self._take_ids(self.conn, count)
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        self._id_cursor, self._id_limit = first, first + count
+
+    def _take_ids(self, conn, count):
+        # Inside a write transaction on conn: first of count ids nobody has used or reserved
+        row = conn.execute("SELECT value FROM meta WHERE key = 'next_task_id'").fetchone()
+        highest = conn.execute("SELECT MAX(id) FROM tasks").fetchone()[0] or 0
+        with self._lock:
+            first = max(self.next_task_id, highest + 1, row[0] if row else 0)
+            self.next_task_id = first + count
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('next_task_id', ?)", (first + count,))
+        return first
+
+    def add(self, task):
+        task_id = self._claim_ids(1)
+        with self._lock:
+            task.id = task_id
+            self._overlay[task.id] = task
+            self.writer.submit(task.id, {"op": "add", "task": task})
+        self._notify("add", task.id, task)
+        return task.id
+
+    def add_many(self, tasks):
+        # Bulk add (imports); all of them go out in one transaction
+        first = self._claim_ids(len(tasks))
+        with self._lock:
+            for i, task in enumerate(tasks):
+                task.id = first + i
+                self._overlay[task.id] = task
+            self.writer.submit_many((task.id, {"op": "add", "task": task}) for task in tasks)
+        for task in tasks:
+            self._notify("add", task.id, task)
+        return [task.id for task in tasks]
+
+    def restore_many(self, tasks):
+        # Put deleted tasks back under their old ids (undo); written as updates,
+        # as in TaskJournal.restore_many()
+        with self._lock:
+            for task in tasks:
+                self._overlay[task.id] = task
+            self.writer.submit_many((task.id, {"op": "update", "task": task}) for task in tasks)
+        for task in tasks:
+            self._notify("add", task.id, task)
+
+    def update(self, task):
+        with self._lock:
+            self._overlay[task.id] = task
+            self.writer.submit(task.id, {"op": "update", "task": task})
+        self._notify("update", task.id, task)
+
+    def delete(self, task_id):
+        with self._lock:
+            self._overlay[task_id] = None
+            self.writer.submit(task_id, {"op": "delete", "id": task_id})
+            self._drop_unwritten([task_id])
+        self._notify("delete", task_id, None)
+
+    def mark_done(self, task_id):
+        task = self.get(task_id)
+        with self._lock:
+            # Mutate in place so a still-queued add/update writes the done flag too
+            task.done = True
+            self._overlay[task_id] = task
+            self.writer.submit(task_id, {"op": "done", "id": task_id})
+        self._notify("done", task_id, task)
+
+    # Bulk versions: one writer batch, so one transaction, however many tasks
+    def update_many(self, tasks):
+        with self._lock:
+            for task in tasks:
+                self._overlay[task.id] = task
+            self.writer.submit_many((task.id, {"op": "update", "task": task}) for task in tasks)
+        for task in tasks:
+            self._notify("update", task.id, task)
+
+    def delete_many(self, task_ids):
+        with self._lock:
+            for task_id in task_ids:
+                self._overlay[task_id] = None
+            self.writer.submit_many((task_id, {"op": "delete", "id": task_id}) for task_id in task_ids)
+            self._drop_unwritten(task_ids)
+        for task_id in task_ids:
+            self._notify("delete", task_id, None)
+
+    def _drop_unwritten(self, task_ids):
+        # Caller holds self._lock. A delete that cancelled a still-queued add
+        # leaves nothing to write: the row never existed, so neither does its
+        # overlay entry (nothing would ever clear it otherwise)
+        for task_id in task_ids:
+            if not self.writer.is_queued(task_id):
+                del self._overlay[task_id]
+
+    def mark_done_many(self, task_ids):
+        tasks = self.get_many(task_ids)
+        with self._lock:
+            for task in tasks:
+                task.done = True
+                self._overlay[task.id] = task
+            self.writer.submit_many((task.id, {"op": "done", "id": task.id}) for task in tasks)
+        for task in tasks:
+            self._notify("done", task.id, task)
+
+    def save_settings(self, settings):
+        changed = {k: v for k, v in settings.items() if self.settings.get(k) != v}
+        if changed:
+            self.settings.update(changed)
+            self.writer.submit("settings", {"op": "settings", "settings": changed})
+
+    def flush(self):
+        return self.writer.flush()
+
+    def _write_batch(self, records):
+        # Runs on the writer thread: the whole batch is one transaction
+        with self._lock:
+            params = []
+            for record in records:
+                if record["op"] in ("add", "update"):
+                    params.append((record["op"], self._to_row(record["task"])))
+                elif record["op"] == "ids":
+                    params.append(("ids", record["count"]))
+                else:
+                    params.append((record["op"], record.get("id", record.get("settings"))))
+        spare = None
+        # IMMEDIATE, so no other instance's change rows land between ours
+        self.write_conn.execute("BEGIN IMMEDIATE")
+        with self.write_conn:
+            first = self._last_change(self.write_conn) + 1
+            for op, value in params:
+                if op in ("add", "update"):
+                    self.write_conn.execute(
+                        "INSERT OR REPLACE INTO tasks (id, title, details, due, priority, done) VALUES (?, ?, ?, ?, ?, ?)",
+                        value)
+                elif op == "delete":
+                    self.write_conn.execute("DELETE FROM tasks WHERE id = ?", (value,))
+                elif op == "done":
+                    self.write_conn.execute("UPDATE tasks SET done = 1 WHERE id = ?", (value,))
+                elif op == "settings":
+                    self.write_conn.executemany(
+                        "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                        [(k, json.dumps(v)) for k, v in value.items()])
+                elif op == "ids":
+                    spare = (self._take_ids(self.write_conn, value), value)
+            last = self._last_change(self.write_conn)
+            self.write_conn.execute("DELETE FROM changes WHERE seq <= ?", (last - CHANGE_LOG_KEEP,))
+        if spare is not None:
+            self._spare_reserved(*spare)
+        with self._lock:
+            self._own_changes.append((first, last))
+            self._counts.clear()
+            for record in records:
+                task_id = record["task"].id if "task" in record else record.get("id")
+                if task_id in self._overlay and not self.writer.has_pending(task_id):
+                    del self._overlay[task_id]
+
+    @staticmethod
+    def _last_change(conn):
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+        return row[0] if row else 0
+
+    # ----- other instances -----
+    def has_changes(self):
+        # data_version moves whenever another connection commits, ours included
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        changed = version != self._data_version
+        self._data_version = version
+        return changed
+
+    def reload_changes(self):
+        # Pick up rows other processes changed since we last looked. Returns
+        # [(op, task_id)] like TaskJournal.reload_changes(), or [("reload",
+        # None)] if we fell so far behind that the log no longer covers it;
+        # listeners then get ("reload", None, None).
+        rows = self.conn.execute("SELECT seq, task_id FROM changes WHERE seq > ? ORDER BY seq",
+                                 (self._change_seq,)).fetchall()
+        if not rows:
+            return []
+        with self._lock:
+            # A batch of ours committed a moment ago may not be listed yet;
+            # its rows are then re-read like anyone else's, which is harmless
+            own = list(self._own_changes)
+        gap = rows[0][0] > self._change_seq + 1
+        task_ids = {}
+        settings_changed = False
+        for seq, task_id in rows:
+            if any(first <= seq <= last for first, last in own):
+                continue
+            if task_id is None:
+                settings_changed = True
+            else:
+                task_ids[task_id] = None
+        self._change_seq = rows[-1][0]
+        with self._lock:
+            self._own_changes = [(first, last) for first, last in self._own_changes if last > self._change_seq]
+            if task_ids or gap:
+                self._counts.clear()
+        changes = []
+        if settings_changed or gap:
+            settings = {key: json.loads(value) for key, value in self.conn.execute("SELECT key, value FROM settings")}
+            if any(self.settings.get(key) != value for key, value in settings.items()):
+                self.settings.update(settings)
+                changes.append(("settings", None))
+        if gap:
+            self._notify("reload", None, None)
+            return [("reload", None)] + changes
+        with self._lock:
+            task_ids = [task_id for task_id in task_ids if task_id not in self._overlay]
+        found = {task.id: task for task in self._fetch(task_ids)}
+        for task_id in task_ids:
+            task = found.get(task_id)
+            op = "delete" if task is None else "update"
+            self._notify(op, task_id, task)
+            changes.append((op, task_id))
+        return changes
+
+    def _fetch(self, task_ids):
+        for start in range(0, len(task_ids), self.IN_CHUNK):
+            chunk = task_ids[start:start + self.IN_CHUNK]
+            rows = self.conn.execute(
+                f"SELECT {self.COLUMNS} FROM tasks WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            for row in rows:
+                yield self._to_task(row)
+
+    def close(self):
+        # Returns False if queued changes could not be written
+        ok = self.writer.close() if self.writer else True
+        for conn in (self.conn, self.write_conn):
+            if conn is not None:
+                conn.close()
+        self.conn = self.write_conn = None
+        return ok
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    # One-shot import of the JSON snapshot + journal into a new database.
+    # Built under a temporary name so a failed import leaves no half-filled db.
+    # The source is only read: without finish_load() it has no writer and
+    # never opens its journal for appending.
+    source = TaskJournal(json_path)
+    try:
+        for chunk in source.read_chunks():
+            source.absorb(chunk)
+    finally:
+        source.close()
+    settings = source.settings
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SQLiteTaskStore.SCHEMA)
+        with conn:
+            conn.executemany(
+                "INSERT INTO tasks (id, title, details, due, priority, done) VALUES (?, ?, ?, ?, ?, ?)",
+                (SQLiteTaskStore._to_row(task) for task in source.all_tasks()))
+            conn.executemany(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                [(k, json.dumps(v)) for k, v in settings.items()])
+            conn.execute("DELETE FROM changes")  # nobody needs to catch up on the import
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+
+
+def open_store(backend="json"):
+    if backend == "sqlite":
+        return SQLiteTaskStore(SQLITE_DATA_FILE, migrate_from=APP_DATA_FILE)
+    return TaskJournal(APP_DATA_FILE)
+
+
+class TaskQuery:
+    # The listing the task view shows: a store plus the current sort and filter
+    def __init__(self, store, sort=None, show_done=True, descending=False):
+        self.store = store
+        self.sort = sort
+        self.show_done = show_done
+        self.descending = descending
+
+    def count(self):
+        return self.store.count(show_done=self.show_done)
+
+    def ids(self):
+        # Every task id in the listing, in no particular order ("select all")
+        return self.store.task_ids(show_done=self.show_done)
+
+    def page(self, offset, limit):
+        return self.store.page(offset, limit, sort=self.sort, show_done=self.show_done,
+                               descending=self.descending)
@@ -0,0 +1,132 @@
+from datetime import date, datetime
+from enum import IntEnum
+from functools import lru_cache
+
+DUE_FORMAT = "%Y-%m-%d"
+NO_DUE = 0  # Task.due value for "no due date"
+
+PRIORITIES = ["High", "Medium", "Low"]
+PRIORITY_RANK = {name: rank for rank, name in enumerate(PRIORITIES)}
+
+
+class Priority(IntEnum):
+    # Ordered so that sorting by value puts High first
+    HIGH = 0
+    MEDIUM = 1
+    LOW = 2
+
+    @property
+    def label(self):
+        return PRIORITIES[self]
+
+    @classmethod
+    def from_label(cls, label):
+        return cls(PRIORITY_RANK[label])
+
+
+@lru_cache(maxsize=8192)
+def parse_due(due):
+    # "YYYY-MM-DD" -> proleptic ordinal; cached, so repeated dates share one int
+    if not due:
+        return NO_DUE
+    return datetime.strptime(due, DUE_FORMAT).toordinal()
+
+
+def format_due(ordinal):
+    if ordinal == NO_DUE:
+        return ""
+    return date.fromordinal(ordinal).strftime(DUE_FORMAT)
+
+
+def validate_due(due):
+    # Empty means "no due date"; anything else must be YYYY-MM-DD
+    parse_due(due)
+    return due
+
+
+def _due_field(value):
+    try:
+        return parse_due(value)
+    except (TypeError, ValueError):
+        return NO_DUE
+
+
+def _priority_field(value):
+    try:
+        return Priority(PRIORITY_RANK[value])
+    except (KeyError, TypeError):
+        return Priority.MEDIUM
+
+
+# JSON value -> field value, for the fields whose odd values are kept in Task.extra
+FIELD_DECODERS = {"due": _due_field, "priority": _priority_field, "done": bool}
+
+
+class Task:
+    # One task, stored compactly: priority as a Priority, due as a date
+    # ordinal (NO_DUE when unset). JSON values that don't fit those fields,
+    # and any unknown keys, are kept in extra so to_dict() returns them as
+    # read. A kept value only stands while its field still holds what was
+    # decoded from it; once the field is changed, to_dict() writes the field.
+    __slots__ = ("id", "title", "details", "due", "priority", "done", "extra")
+
+    def __init__(self, title, details="", due=NO_DUE, priority=Priority.MEDIUM, done=False, task_id=None, extra=None):
+        self.id = task_id
+        self.title = title
+        self.details = details
+        self.due = due
+        self.priority = priority
+        self.done = done
+        self.extra = extra
+
+    @property
+    def due_str(self):
+        return format_due(self.due)
+
+    @classmethod
+    def from_dict(cls, data):
+        extra = {k: v for k, v in data.items() if k not in ("id", "title", "details", "due", "priority", "done")}
+        due_text = data.get("due", "")
+        due = _due_field(due_text)
+        if format_due(due) != due_text:
+            extra["due"] = due_text
+        label = data.get("priority", "Medium")
+        priority = _priority_field(label)
+        if priority.label != label:
+            extra["priority"] = label
+        done = data.get("done", False)
+        if not isinstance(done, bool):
+            extra["done"] = done
+        return cls(data.get("title", ""), data.get("details", ""), due, priority, bool(done),
+                   task_id=data.get("id"), extra=extra or None)
+
+    def to_dict(self):
+        data = {
+            "id": self.id,
+            "title": self.title,
+            "details": self.details,
+            "due": self.due_str,
+            "priority": self.priority.label,
+            "done": self.done
+        }
+        if self.extra:
+            for key, value in self.extra.items():
+                decode = FIELD_DECODERS.get(key)
+                if decode is None or decode(value) == getattr(self, key):
+                    data[key] = value
+        return data
+
+    def copy(self):
+        return Task(self.title, self.details, self.due, self.priority, self.done,
+                    task_id=self.id, extra=dict(self.extra) if self.extra else None)
+
+    def __eq__(self, other):
+        if not isinstance(other, Task):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None  # mutable
+
+    def __repr__(self):
+        return (f"Task(id={self.id!r}, title={self.title!r}, due={self.due_str!r}, "
+                f"priority={self.priority.label}, done={self.done})")
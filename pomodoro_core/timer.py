@@ -0,0 +1,318 @@
+import heapq
+import math
+import time
+from collections import deque
+
+MODES = ["Work", "Short Break", "Long Break"]
+MODE_SETTINGS = {
+    "Work": "work_mins",
+    "Short Break": "short_break_mins",
+    "Long Break": "long_break_mins"
+}
+
+DEFAULT_SETTINGS = {
+    "work_mins": 25,
+    "short_break_mins": 5,
+    "long_break_mins": 15,
+    "pomodoro_target": 4
+}
+
+
+def validate_settings(settings):
+    # Settings from outside (the control API, a named timer) must be known
+    # keys with whole, positive values: a zero length would fire at once
+    # forever and a zero pomodoro_target divides by zero. Raises ValueError.
+    for key, value in (settings or {}).items():
+        if key not in DEFAULT_SETTINGS:
+            raise ValueError(f"unknown timer setting {key!r}")
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise ValueError(f"{key} must be a whole number of at least 1, not {value!r}")
+    return dict(settings or {})
+
+
+class PomodoroCycle:
+    # Work / break sequencing: which mode comes next and how long it lasts.
+    # settings uses the same keys as the saved data (see DEFAULT_SETTINGS).
+    def __init__(self, settings=None):
+        self.settings = dict(DEFAULT_SETTINGS)
+        if settings:
+            self.settings.update(settings)
+        self.mode = "Work"
+        self.pomodoro_count = 0
+
+    def duration_seconds(self, mode=None):
+        return self.settings[MODE_SETTINGS[mode or self.mode]] * 60
+
+    def advance(self):
+        # Switch between work and break modes; every pomodoro_target-th break is long
+        if self.mode == "Work":
+            self.pomodoro_count += 1
+            if self.pomodoro_count % self.settings["pomodoro_target"] == 0:
+                self.mode = "Long Break"
+            else:
+                self.mode = "Short Break"
+        else:
+            self.mode = "Work"
+        return self.mode
+
+
+class TimerEngine:
+    # Countdown measured against a time.monotonic() deadline, so late ticks
+    # never accumulate into drift. Ticks go through schedule(delay_ms, callback)
+    # and cancel(handle) - Tk's after/after_cancel in the app - which keeps all
+    # timer work on one thread with at most one tick pending.
+    def __init__(self, schedule, cancel, on_tick=None, on_finish=None, clock=time.monotonic):
+        self.schedule = schedule
+        self.cancel = cancel
+        self.on_tick = on_tick      # called with the whole seconds left to display
+        self.on_finish = on_finish
+        self.clock = clock
+        self.remaining = 0.0        # seconds left while not running
+        self.deadline = None        # clock() value the session ends at while running
+        self.last_drift = None      # seconds the last finish fired after its deadline
+        self.drifts = deque(maxlen=100)
+        self.last_lateness = None   # seconds the last tick fired after it was due
+        self._pending = None
+        self._due = None
+
+    @property
+    def running(self):
+        return self.deadline is not None
+
+    def remaining_seconds(self):
+        if self.deadline is None:
+            return self.remaining
+        return max(0.0, self.deadline - self.clock())
+
+    def display_seconds(self):
+        # Round up so a fresh 25:00 session shows 25:00 and 00:00 only at the end
+        return math.ceil(self.remaining_seconds())
+
+    def set(self, seconds):
+        self._cancel_pending()
+        self.deadline = None
+        self.remaining = float(seconds)
+
+    def start(self):
+        if self.running or self.remaining <= 0:
+            return
+        self.deadline = self.clock() + self.remaining
+        self._schedule_next()
+
+    def pause(self):
+        if not self.running:
+            return
+        self.remaining = self.remaining_seconds()
+        self.deadline = None
+        self._cancel_pending()
+
+    def reset(self):
+        self.set(0)
+
+    def _cancel_pending(self):
+        if self._pending is not None:
+            self.cancel(self._pending)
+            self._pending = None
+
+    def _schedule_next(self):
+        # Wake up when the displayed second changes, or exactly at the deadline
+        self._cancel_pending()
+        left = self.remaining_seconds()
+        until_change = left - (math.ceil(left) - 1)
+        delay_ms = max(1, math.ceil(min(left, until_change) * 1000))
+        self._due = self.clock() + delay_ms / 1000
+        self._pending = self.schedule(delay_ms, self._tick)
+
+    def _tick(self):
+        self._pending = None
+        if not self.running:
+            return
+        now = self.clock()
+        self.last_lateness = now - self._due
+        if now >= self.deadline:
+            self.last_drift = now - self.deadline
+            self.drifts.append(self.last_drift)
+            self.deadline = None
+            self.remaining = 0.0
+            if self.on_tick:
+                self.on_tick(0)
+            if self.on_finish:
+                self.on_finish()
+            return
+        if self.on_tick:
+            self.on_tick(self.display_seconds())
+        self._schedule_next()
+
+
+class NamedTimer:
+    # One of TimerManager's timers: its own cycle and countdown. It has no
+    # callbacks of its own; the manager tracks its deadline.
+    __slots__ = ("name", "cycle", "remaining", "deadline", "auto_advance", "last_drift", "generation")
+
+    def __init__(self, name, settings=None, auto_advance=True):
+        self.name = name
+        self.cycle = PomodoroCycle(settings)
+        self.remaining = float(self.cycle.duration_seconds())  # seconds left while not running
+        self.deadline = None      # clock() value the session ends at while running
+        self.auto_advance = auto_advance  # go on to the next mode when a session ends
+        self.last_drift = None
+        self.generation = 0       # bumped on every start, to spot stale heap entries
+
+    @property
+    def running(self):
+        return self.deadline is not None
+
+    def remaining_seconds(self, now):
+        if self.deadline is None:
+            return self.remaining
+        return max(0.0, self.deadline - now)
+
+    def to_dict(self, now):
+        return {
+            "name": self.name,
+            "mode": self.cycle.mode,
+            "running": self.running,
+            "remaining_s": self.remaining_seconds(now),
+            "pomodoros": self.cycle.pomodoro_count,
+        }
+
+
+class TimerManager:
+    # Any number of named timers on one schedule()/cancel() pair (Tk's
+    # after/after_cancel in the app). Running timers sit in a min-heap by
+    # deadline and at most one callback is pending, for the earliest one, so
+    # a thousand idle-looking timers cost nothing until one of them ends.
+    # Nothing ticks per timer: displays ask remaining_seconds() when they redraw.
+    # Pausing or restarting leaves the old heap entry behind; it is skipped
+    # by its generation when it reaches the top.
+    def __init__(self, schedule, cancel, on_finish=None, clock=time.monotonic):
+        self.schedule = schedule
+        self.cancel = cancel
+        self.on_finish = on_finish  # called with the NamedTimer, before it moves on
+        self.clock = clock
+        self.timers = {}     # name -> NamedTimer
+        self.heap = []       # (deadline, generation, name)
+        self.running = 0
+        self.drifts = deque(maxlen=100)
+        self._pending = None
+        self._armed = None   # deadline the pending callback is for
+
+    def __len__(self):
+        return len(self.timers)
+
+    def __iter__(self):
+        return iter(self.timers.values())
+
+    def get(self, name):
+        return self.timers[name]
+
+    def add(self, name, settings=None, auto_advance=True):
+        if name in self.timers:
+            raise ValueError(f"there is already a timer called {name!r}")
+        settings = validate_settings(settings)
+        timer = self.timers[name] = NamedTimer(name, settings, auto_advance)
+        return timer
+
+    def remove(self, name):
+        timer = self.timers.pop(name)
+        if timer.running:
+            self.running -= 1
+            self._arm()
+
+    def start(self, name):
+        timer = self.timers[name]
+        if timer.running:
+            return
+        if timer.remaining <= 0:
+            timer.remaining = float(timer.cycle.duration_seconds())
+        self._run(timer, self.clock() + timer.remaining)
+        self._arm()
+
+    def pause(self, name):
+        timer = self.timers[name]
+        if not timer.running:
+            return
+        timer.remaining = timer.remaining_seconds(self.clock())
+        timer.deadline = None
+        self.running -= 1
+        self._arm()
+
+    def reset(self, name):
+        # Back to the full length of the current mode, stopped
+        timer = self.timers[name]
+        if timer.running:
+            timer.deadline = None
+            self.running -= 1
+            self._arm()
+        timer.remaining = float(timer.cycle.duration_seconds())
+
+    def next_deadline(self):
+        # Earliest deadline of a running timer, or None; stale entries are dropped
+        heap = self.heap
+        while heap:
+            deadline, generation, name = heap[0]
+            timer = self.timers.get(name)
+            if timer is not None and timer.generation == generation and timer.deadline == deadline:
+                return deadline
+            heapq.heappop(heap)
+        return None
+
+    def close(self):
+        if self._pending is not None:
+            self.cancel(self._pending)
+            self._pending = self._armed = None
+
+    def _run(self, timer, deadline):
+        timer.deadline = deadline
+        timer.generation += 1
+        self.running += 1
+        heapq.heappush(self.heap, (deadline, timer.generation, timer.name))
+        if len(self.heap) > 2 * self.running + 64:
+            # Mostly entries left by pauses and restarts; start over from the live ones
+            self.heap = [(t.deadline, t.generation, t.name) for t in self.timers.values() if t.running]
+            heapq.heapify(self.heap)
+
+    def _arm(self):
+        # One pending callback, for the earliest deadline; moved only when that changes
+        deadline = self.next_deadline()
+        if deadline == self._armed:
+            return
+        if self._pending is not None:
+            self.cancel(self._pending)
+            self._pending = None
+        self._armed = deadline
+        if deadline is not None:
+            delay_ms = max(1, math.ceil((deadline - self.clock()) * 1000))
+            self._pending = self.schedule(delay_ms, self._fire)
+
+    def _fire(self):
+        self._pending = self._armed = None
+        now = self.clock()
+        finished = []
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > now:
+                break
+            _, _, name = heapq.heappop(self.heap)
+            timer = self.timers[name]
+            timer.deadline = None
+            timer.remaining = 0.0
+            timer.last_drift = now - deadline
+            self.drifts.append(timer.last_drift)
+            self.running -= 1
+            finished.append(timer)
+        errors = []
+        for timer in finished:
+            # A failing callback must not hold up the other timers
+            try:
+                if self.on_finish:
+                    self.on_finish(timer)
+                if timer.auto_advance and self.timers.get(timer.name) is timer and not timer.running:
+                    timer.cycle.advance()
+                    timer.remaining = float(timer.cycle.duration_seconds())
+                    self._run(timer, now + timer.remaining)
+            except Exception as e:
+                errors.append(e)
+        self._arm()
+        if errors:
+            raise errors[0]  # reported by the loop (Tk prints it), after re-arming
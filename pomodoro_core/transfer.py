@@ -0,0 +1,193 @@
+import csv
+import json
+import os
+
+from .tasks import PRIORITY_RANK, Priority, Task, parse_due
+
+TRANSFER_BATCH = 1000   # tasks per store commit / per file write
+CSV_FIELDS = ["id", "title", "details", "due", "priority", "done"]
+MAX_REPORTED_ERRORS = 100
+FORMATS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}
+
+
+def detect_format(path):
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Unknown task file type: {path} (use .jsonl or .csv)")
+    return fmt
+
+
+def task_from_record(record):
+    # Same rules as the task editor: a title is required and due must be
+    # empty or YYYY-MM-DD. Ids in the file are not kept; the store assigns new ones.
+    title = str(record.get("title") or "").strip()
+    if not title:
+        raise ValueError("missing title")
+    due_text = str(record.get("due") or "").strip()
+    try:
+        due = parse_due(due_text)
+    except ValueError:
+        raise ValueError(f"due date {due_text!r} is not YYYY-MM-DD") from None
+    priority = record.get("priority") or "Medium"
+    if not isinstance(priority, str) or priority not in PRIORITY_RANK:
+        raise ValueError(f"unknown priority {priority!r}")
+    done = record.get("done", False)
+    if isinstance(done, str):
+        done = done.strip().lower() in ("1", "true", "yes", "y", "x", "✔")
+    return Task(title, str(record.get("details") or ""), due, Priority.from_label(priority), bool(done))
+
+
+def _decoded_lines(raw):
+    # Lines of a UTF-8 file read in binary, so raw.tell() stays usable for progress
+    first = True
+    for line in raw:
+        text = line.decode("utf-8")
+        if first:
+            text = text.lstrip("\ufeff")
+            first = False
+        yield text
+
+
+class _BatchedTransfer:
+    # What the importer and exporter share: step() does one batch and says
+    # whether there is more; run() steps through the whole file at once
+    def __init__(self, store, path, fmt, batch_size):
+        self.store = store
+        self.path = path
+        self.fmt = fmt or detect_format(path)
+        self.batch_size = batch_size
+        self.done = False
+        self.waiting = False  # the last step() found the writer behind and did nothing
+
+    def run(self, progress=None):
+        # progress(job) after every batch, and once more at the end
+        while self.step(wait=True):
+            if progress:
+                progress(self)
+        if progress:
+            progress(self)
+        return self
+
+
+class TaskImporter(_BatchedTransfer):
+    # Streams tasks from a JSONL or CSV file into a store, one batch per step().
+    # Each batch is added with store.add_many() and handed straight to the
+    # store's writer. While the writer is two batches behind, step() reads
+    # nothing and sets waiting (run() blocks instead), so memory stays bounded
+    # and the UI never waits on the disk. Rows that fail validation are
+    # skipped and reported as (line number, message).
+    def __init__(self, store, path, fmt=None, batch_size=TRANSFER_BATCH):
+        super().__init__(store, path, fmt, batch_size)
+        self.total_bytes = os.path.getsize(path)
+        self.bytes_read = 0
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []
+        self._raw = open(path, "rb")
+        self._records = self._read_records()
+
+    def _read_records(self):
+        lines = _decoded_lines(self._raw)
+        if self.fmt == "csv":
+            reader = csv.DictReader(lines)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_no, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield line_no, e
+                    continue
+                yield line_no, record if isinstance(record, dict) else ValueError("not a JSON object")
+
+    def _reject(self, line_no, error):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_no, str(error)))
+
+    def step(self, wait=False):
+        # Import one batch; returns False once the file is exhausted
+        if self.done:
+            return False
+        writer = self.store.writer
+        if writer.backlog() >= 2 * self.batch_size:
+            if not wait:
+                self.waiting = True
+                return True
+            writer.wait_for_room(2 * self.batch_size)
+        self.waiting = False
+        batch = []
+        for line_no, record in self._records:
+            if isinstance(record, Exception):
+                self._reject(line_no, record)
+                continue
+            try:
+                batch.append(task_from_record(record))
+            except ValueError as e:
+                self._reject(line_no, e)
+                continue
+            if len(batch) >= self.batch_size:
+                break
+        else:
+            self.done = True
+        if batch:
+            self.store.add_many(batch)
+            writer.hurry()
+            self.imported += len(batch)
+        self.bytes_read = self.total_bytes if self.done else self._raw.tell()
+        if self.done:
+            self.close()
+            compact = getattr(self.store, "compact", None)
+            if compact and self.imported:
+                # One snapshot (in the background) for the whole import, so the
+                # next start doesn't replay it all from the journal
+                compact()
+        return not self.done
+
+    def close(self):
+        self._raw.close()
+
+
+class TaskExporter(_BatchedTransfer):
+    # Streams every task in the store to a JSONL or CSV file, one batch per
+    # step(). Written to "<path>.tmp" and renamed at the end, so a cancelled
+    # export never leaves a half-written file under the real name.
+    def __init__(self, store, path, fmt=None, batch_size=TRANSFER_BATCH):
+        super().__init__(store, path, fmt, batch_size)
+        self.total = store.count()
+        self.exported = 0
+        self._tasks = store.all_tasks()
+        self._file = open(path + ".tmp", "w", encoding="utf-8", newline="")
+        if self.fmt == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def step(self, wait=False):
+        # Export one batch; an export never has to wait for the writer
+        if self.done:
+            return False
+        batch = []
+        for task in self._tasks:
+            batch.append(task.to_dict())
+            if len(batch) >= self.batch_size:
+                break
+        else:
+            self.done = True
+        if self.fmt == "csv":
+            self._csv.writerows(batch)
+        else:
+            self._file.write("".join(json.dumps(data, ensure_ascii=False) + "\n" for data in batch))
+        self.exported += len(batch)
+        if self.done:
+            self._file.close()
+            os.replace(self.path + ".tmp", self.path)
+        return not self.done
+
+    def cancel(self):
+        if not self.done:
+            self.done = True
+            self._file.close()
+            os.remove(self.path + ".tmp")
@@ -0,0 +1,82 @@
+from collections import deque
+
+UNDO_LIMIT = 100  # steps kept; the oldest go first
+
+
+class UndoStep:
+    # One user action as the tasks it touched, before and after:
+    # task_id -> Task copy, or None where the task did not exist
+    __slots__ = ("label", "before", "after")
+
+    def __init__(self, label, before, after):
+        self.label = label
+        self.before = before
+        self.after = after
+
+
+class UndoHistory:
+    # Undo/redo without copying the task list: each step only holds the
+    # tasks its action touched, and undoing writes their old versions back
+    # through the store's bulk calls (redo writes the new ones). So a step
+    # costs O(tasks it touched) in memory and time, and the store journals
+    # and notifies as for any other edit.
+    def __init__(self, limit=UNDO_LIMIT):
+        self.undo_steps = deque(maxlen=limit)
+        self.redo_steps = []
+
+    @staticmethod
+    def capture(store, task_ids):
+        # Copies of some existing tasks, to pass to record() as before or after;
+        # dict.fromkeys(task_ids) stands for tasks that don't exist (yet)
+        return {task.id: task.copy() for task in store.get_many(task_ids)}
+
+    def record(self, label, before, after):
+        if before != after:
+            self.undo_steps.append(UndoStep(label, before, after))
+            self.redo_steps.clear()
+
+    def undo_label(self):
+        return self.undo_steps[-1].label if self.undo_steps else None
+
+    def redo_label(self):
+        return self.redo_steps[-1].label if self.redo_steps else None
+
+    def undo(self, store):
+        # Returns (label, task ids that now exist, task ids removed), or None
+        if not self.undo_steps:
+            return None
+        step = self.undo_steps.pop()
+        self.redo_steps.append(step)
+        return (step.label,) + self._apply(store, step.before)
+
+    def redo(self, store):
+        if not self.redo_steps:
+            return None
+        step = self.redo_steps.pop()
+        self.undo_steps.append(step)
+        return (step.label,) + self._apply(store, step.after)
+
+    def clear(self):
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+
+    @staticmethod
+    def _apply(store, state):
+        # Make the store match state: one bulk call per kind of change
+        removed, restored, updated = [], [], []
+        for task_id, task in state.items():
+            exists = store.exists(task_id)
+            if task is None:
+                if exists:
+                    removed.append(task_id)
+            elif exists:
+                updated.append(task.copy())
+            else:
+                restored.append(task.copy())
+        if removed:
+            store.delete_many(removed)
+        if restored:
+            store.restore_many(restored)
+        if updated:
+            store.update_many(updated)
+        return [task.id for task in restored + updated], removed
@@ -0,0 +1,210 @@
+import threading
+import time
+
+from .metrics import LatencyStat
+
+DEBOUNCE_SECONDS = 0.25  # how long changes may pile up before they are written
+
+
+def merge_ops(old, new):
+    # Combine two queued changes to the same key; None means nothing to write.
+    # Queued tasks are the store's live dicts, so an earlier add/update
+    # already carries the effect of a later "done".
+    if new["op"] == "delete":
+        return None if old["op"] == "add" else new
+    if new["op"] == "done" and old["op"] in ("add", "update"):
+        return old
+    if new["op"] == "settings":
+        return {"op": "settings", "settings": dict(old["settings"], **new["settings"])}
+    if old["op"] == "add":
+        return dict(new, op="add")
+    return new
+
+
+class CoalescingWriter:
+    # Persists store changes on one background thread.
+    # Changes are queued by key and a later change to the same key is merged
+    # into the queued one, so a burst of edits ends up as a single
+    # write_batch(ops) call once the debounce window has passed.
+    def __init__(self, write_batch, debounce=DEBOUNCE_SECONDS):
+        self.write_batch = write_batch
+        self.debounce = debounce
+        self._pending = {}         # key -> op, oldest first
+        self._writing = set()      # keys of the batch being written
+        self._first_change = 0.0   # monotonic time the oldest pending op was queued
+        self._in_flight = False
+        self._flush_waiters = 0
+        self._hurry = False        # write without waiting out the debounce
+        self._closing = False
+        self._streak = 0           # consecutive failed writes
+        self._error = None
+        self._cond = threading.Condition()
+
+        # Counters
+        self.ops = 0          # changes submitted
+        self.coalesced = 0    # changes merged into an already queued one
+        self.writes = 0       # successful write_batch calls
+        self.failures = 0     # failed write_batch calls
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+        self.latency = LatencyStat()  # every write_batch call, failed ones as errors
+
+        self._thread = threading.Thread(target=self._run, name="store-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, op):
+        with self._cond:
+            self._queue(key, op)
+            self._cond.notify_all()
+
+    def submit_many(self, items):
+        # (key, op) pairs queued together, so they land in the same write
+        with self._cond:
+            for key, op in items:
+                self._queue(key, op)
+            self._cond.notify_all()
+
+    def _queue(self, key, op):
+        self.ops += 1
+        if key in self._pending:
+            self.coalesced += 1
+            merged = merge_ops(self._pending.pop(key), op)
+            if merged is not None:
+                self._pending[key] = merged
+        else:
+            if not self._pending:
+                self._first_change = time.monotonic()
+            self._pending[key] = op
+
+    def has_pending(self, key):
+        with self._cond:
+            return key in self._pending
+
+    def is_queued(self, key):
+        # Pending or being written right now
+        with self._cond:
+            return key in self._pending or key in self._writing
+
+    def idle(self):
+        with self._cond:
+            return not self._pending and not self._in_flight
+
+    def backlog(self):
+        # Changes queued or being written; bulk producers hold off while it is large
+        with self._cond:
+            return len(self._pending) + len(self._writing)
+
+    def wait_for_room(self, limit):
+        # Blocks while the backlog is at limit or more, or until a write fails.
+        # For producers off the UI thread; the UI checks backlog() instead.
+        with self._cond:
+            failures = self.failures
+            while len(self._pending) + len(self._writing) >= limit and self.failures == failures:
+                self._cond.wait()
+
+    def hurry(self):
+        # Start writing what is queued now, without waiting for it to finish
+        with self._cond:
+            self._hurry = True
+            self._cond.notify_all()
+
+    def take_error(self):
+        # First error of a failing streak, reported once
+        with self._cond:
+            error, self._error = self._error, None
+            return error
+
+    def stats(self):
+        with self._cond:
+            latency = self.latency.summary()
+            return {
+                "ops": self.ops,
+                "coalesced": self.coalesced,
+                "writes": self.writes,
+                "failures": self.failures,
+                "pending": len(self._pending),
+                "last_latency_ms": self.last_latency * 1000,
+                "max_latency_ms": self.max_latency * 1000,
+                "avg_latency_ms": self.total_latency * 1000 / self.writes if self.writes else 0.0,
+                "p50_latency_ms": latency["p50_ms"],
+                "p99_latency_ms": latency["p99_ms"],
+            }
+
+    def flush(self):
+        # Write everything queued now; returns False if a write failed meanwhile
+        with self._cond:
+            self._flush_waiters += 1
+            self._cond.notify_all()
+            failures = self.failures
+            try:
+                while (self._pending or self._in_flight) and self.failures == failures:
+                    self._cond.wait()
+            finally:
+                self._flush_waiters -= 1
+            return not self._pending and not self._in_flight
+
+    def close(self):
+        ok = self.flush()
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+        return ok
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if self._closing and not self._pending:
+                    return
+                # Let more changes arrive unless someone is waiting on a flush
+                deadline = self._first_change + self.debounce
+                while not self._flush_waiters and not self._hurry and not self._closing:
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        break
+                    self._cond.wait(left)
+                self._hurry = False
+                batch = list(self._pending.items())
+                self._pending = {}
+                self._writing = {key for key, op in batch}
+                self._in_flight = True
+
+            error = None
+            start = time.perf_counter()
+            try:
+                self.write_batch([op for key, op in batch])
+            except Exception as e:  # storage errors differ per backend
+                error = e
+            latency = time.perf_counter() - start
+
+            with self._cond:
+                self._in_flight = False
+                self._writing = set()
+                self.latency.record(latency, error is not None)
+                if error is None:
+                    self._streak = 0
+                    self.writes += 1
+                    self.last_latency = latency
+                    self.max_latency = max(self.max_latency, latency)
+                    self.total_latency += latency
+                else:
+                    self.failures += 1
+                    self._streak += 1
+                    if self._streak == 1:
+                        self._error = error
+                    # Put the batch back in front of anything queued since
+                    requeued = dict(batch)
+                    for key, op in self._pending.items():
+                        merged = merge_ops(requeued.pop(key), op) if key in requeued else op
+                        if merged is not None:
+                            requeued[key] = merged
+                    self._pending = requeued
+                    self._first_change = time.monotonic()
+                self._cond.notify_all()
+                if error is not None:
+                    if self._closing:
+                        return
+                    self._cond.wait(min(30.0, self.debounce * 2 ** min(self._streak, 7)))
@@ -0,0 +1,22 @@
+import pytest
+
+from pomodoro_core import SQLiteTaskStore, TaskJournal
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def open_store(request, tmp_path):
+    # Opens a loaded store on the same files every time, like another app
+    # instance would; every store it opened is closed afterwards
+    path = str(tmp_path / ("tasks.json" if request.param == "json" else "tasks.db"))
+    backend = TaskJournal if request.param == "json" else SQLiteTaskStore
+    stores = []
+
+    def opener(debounce=0):
+        store = backend(path, debounce=debounce)
+        store.load()
+        stores.append(store)
+        return store
+
+    yield opener
+    for store in stores:
+        store.close()
@@ -0,0 +1,25 @@
+import time
+
+from pomodoro_core import TaskJournal
+
+
+def open_json(path, **kwargs):
+    store = TaskJournal(str(path), debounce=0, **kwargs)
+    store.load()
+    return store
+
+
+def snapshot(store):
+    return {task.id: task.to_dict() for task in store.all_tasks()}
+
+
+def reload_until_changed(store, timeout=5.0):
+    # Changes from another instance may take a poll or two to show up
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if store.has_changes():
+            changes = store.reload_changes()
+            if changes:
+                return changes
+        time.sleep(0.01)
+    return []
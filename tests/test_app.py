@@ -0,0 +1,76 @@
+import time
+import tkinter as tk
+
+import pytest
+
+from pomodoro_core import Task
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # The whole window, on data files in tmp_path; skipped without a display
+    monkeypatch.chdir(tmp_path)
+    try:
+        tk.Tk().destroy()
+    except tk.TclError as e:
+        pytest.skip(f"no display: {e}")
+    from todo_pomodoro import PomodoroApp
+    app = PomodoroApp()
+    app.overlay.destroy()
+    app._build_main_ui()
+    deadline = time.monotonic() + 10
+    while not app.tasks_loaded and time.monotonic() < deadline:
+        app.update()
+        time.sleep(0.01)
+    assert app.tasks_loaded
+    yield app
+    app.on_close()
+
+
+def add_task(app, title):
+    app.open_task_editor()
+    app.task_title_var.set(title)
+    app.save_task()
+
+
+def test_saving_an_edit_leaves_no_row_selected(app):
+    add_task(app, "first")
+    task_id = next(app.store.all_tasks()).id
+    app.task_list.select(task_id)
+    app.task_title_var.set("first, edited")
+    app.save_task()
+    assert app.task_list.selection() == []
+
+    app.task_title_var.set("second")
+    app.save_task()
+    assert sorted(task.title for task in app.store.all_tasks()) == ["first, edited", "second"]
+
+
+def test_marking_done_leaves_no_row_selected(app):
+    add_task(app, "first")
+    task_id = next(app.store.all_tasks()).id
+    app.task_list.select(task_id)
+    app.mark_task_done()
+    assert app.task_list.selection() == []
+    add_task(app, "second")
+    assert app.store.count() == 2
+
+
+def test_new_task_does_not_overwrite_the_selected_one(app):
+    add_task(app, "first")
+    app.task_list.select(next(app.store.all_tasks()).id)
+    add_task(app, "second")
+    assert sorted(task.title for task in app.store.all_tasks()) == ["first", "second"]
+
+
+def test_every_row_of_the_page_is_on_screen(app):
+    app.store.add_many([Task(f"task {i}") for i in range(200)])
+    app._store_changed()
+    app.style.configure("Treeview", rowheight=40)  # taller than any default
+    app.geometry("600x700")
+    app.update()
+    app.geometry("600x650")
+    app.update()
+    tree = app.tasks_tree
+    assert app.task_list.rendered
+    assert all(tree.bbox(str(task_id)) for task_id in app.task_list.rendered)
@@ -0,0 +1,90 @@
+import wave
+
+import pytest
+
+from pomodoro_core import AudioPlayer, RecordingSink
+
+
+@pytest.fixture
+def sound(tmp_path):
+    path = str(tmp_path / "bell.wav")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(8000)
+        f.writeframes(b"\x00\x00" * 800)
+    return path
+
+
+class FlakySink(RecordingSink):
+    # Fails its first playback, like a busy sound device
+    def play(self, clip):
+        if not self.played:
+            self.played.append(None)
+            raise RuntimeError("Failed to play sound")
+        super().play(clip)
+
+
+def test_playback_latency_is_measured(sound):
+    sink = RecordingSink()
+    player = AudioPlayer(sink)
+    requested = player.clock()
+    player.play(sound)
+    assert player.wait_idle(5)
+    player.close()
+    (clip, started), = sink.played
+    assert clip.duration == pytest.approx(0.1)
+    assert 0 <= started - requested < 1.0
+    stats = player.stats()
+    assert stats["plays"] == 1
+    assert stats["last_latency_ms"] == pytest.approx((started - requested) * 1000, abs=50)
+
+
+def test_clip_is_decoded_once(sound):
+    sink = RecordingSink()
+    player = AudioPlayer(sink)
+    for _ in range(3):
+        player.play(sound)
+        assert player.wait_idle(5)
+    player.close()
+    clips = [clip for clip, started in sink.played]
+    assert len(clips) == 3
+    assert clips[0] is clips[1] is clips[2]
+
+
+def test_repeats_of_a_queued_sound_are_dropped(sound, tmp_path):
+    sink = RecordingSink(hold=0.3)
+    player = AudioPlayer(sink)
+    other = str(tmp_path / "other.wav")
+    with open(sound, "rb") as f, open(other, "wb") as out:
+        out.write(f.read())
+    player.play(other)  # keeps the worker busy while the rest queue up
+    for _ in range(3):
+        player.play(sound)
+    assert player.wait_idle(5)
+    player.close()
+    assert [clip.path for clip, started in sink.played] == [other, sound]
+
+
+def test_sink_errors_are_reported_and_playback_carries_on(sound):
+    sink = FlakySink()
+    player = AudioPlayer(sink)
+    player.play(sound)
+    assert player.wait_idle(5)
+    assert isinstance(player.take_error(), RuntimeError)
+    player.play(sound)
+    assert player.wait_idle(5)
+    player.close()
+    assert player.take_error() is None
+    assert len(sink.played) == 2 and sink.played[1][0].path == sound
+
+
+def test_unreadable_file_is_reported(tmp_path):
+    path = str(tmp_path / "not.wav")
+    with open(path, "wb") as f:
+        f.write(b"not a wav file")
+    player = AudioPlayer(RecordingSink())
+    player.play(path)
+    assert player.wait_idle(5)
+    player.close()
+    assert isinstance(player.take_error(), (EOFError, wave.Error))
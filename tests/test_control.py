@@ -0,0 +1,109 @@
+import json
+import os
+import socket
+import stat
+import time
+
+import pytest
+
+from pomodoro_core import ControlServer, parse_address
+
+
+def test_ports_listen_on_loopback():
+    assert parse_address("8765") == ("127.0.0.1", 8765)
+    assert parse_address("localhost:8765") == ("localhost", 8765)
+    assert parse_address("[::1]:8765") == ("::1", 8765)
+
+
+def test_socket_paths_pass_through():
+    assert parse_address("/tmp/pomodoro.sock") == "/tmp/pomodoro.sock"
+
+
+@pytest.mark.parametrize("text", ["0.0.0.0:8765", "192.168.1.20:8765", "example.com:80", "[::]:8765"])
+def test_other_hosts_are_refused(text):
+    with pytest.raises(ValueError):
+        parse_address(text)
+
+
+class Client:
+    # Plays the Tk thread too: queued calls run while it waits for a line
+    def __init__(self, server):
+        self.server = server
+        self.sock = socket.socket(socket.AF_UNIX)
+        self.sock.connect(server.address)
+        self.sock.settimeout(0.05)
+        self.buffer = b""
+
+    def send(self, message):
+        self.sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+
+    def receive(self):
+        deadline = time.monotonic() + 5
+        while b"\n" not in self.buffer:
+            assert time.monotonic() < deadline, "no reply"
+            self.server.run_pending()
+            try:
+                self.buffer += self.sock.recv(65536)
+            except socket.timeout:
+                pass
+        line, self.buffer = self.buffer.split(b"\n", 1)
+        return json.loads(line)
+
+    def call(self, method, params=None, request_id=1):
+        self.send({"id": request_id, "method": method, "params": params or {}})
+        return self.receive()
+
+
+@pytest.fixture
+def server(tmp_path):
+    tasks = {}
+
+    def add(params):
+        if not params.get("title"):
+            raise ValueError("a task needs a title")
+        tasks[len(tasks) + 1] = params["title"]
+        return len(tasks)
+
+    def get(params):
+        return tasks[params["id"]]
+
+    server = ControlServer(str(tmp_path / "control.sock"), {"tasks.add": add, "tasks.get": get},
+                           status={"state": "idle"})
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_calls_run_on_the_polling_thread(server):
+    client = Client(server)
+    assert stat.S_IMODE(os.stat(server.address).st_mode) == 0o600
+    assert client.call("status") == {"id": 1, "result": {"state": "idle"}}
+    assert client.call("tasks.add", {"title": "Write tests"}, request_id=2) == {"id": 2, "result": 1}
+    assert client.call("tasks.get", {"id": 1}) == {"id": 1, "result": "Write tests"}
+    reply = client.call("batch", {"requests": [{"method": "tasks.add", "params": {"title": "x"}},
+                                               {"method": "tasks.add", "params": {}}]})
+    assert reply["result"] == [{"result": 2}, {"error": "a task needs a title"}]
+    assert server.stats()["requests"] == 4
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_errors_are_replies(server):
+    client = Client(server)
+    assert client.call("tasks.get", {"id": 9}) == {"id": 1, "error": "not found: 9"}
+    assert client.call("tasks.remove")["error"] == "unknown method 'tasks.remove'"
+    client.sock.sendall(b"[1, 2]\n")
+    assert client.receive()["error"].startswith("bad request")
+    assert client.call("subscribe", {"topics": ["weather"]})["error"] == "unknown topic 'weather'"
+    assert client.call("status")["result"] == {"state": "idle"}  # still connected
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_subscribers_get_published_events(server):
+    client = Client(server)
+    assert not server.wants("tick")
+    assert client.call("subscribe", {"topics": ["tick"]})["result"] == ["tick"]
+    assert server.wants("tick") and not server.wants("tasks")
+    server.publish("tasks", {"ignored": True})
+    server.publish("tick", {"remaining": 60})
+    assert client.receive() == {"event": "tick", "data": {"remaining": 60}}
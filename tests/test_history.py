@@ -0,0 +1,84 @@
+import time
+
+from pomodoro_core import FileLock, SessionLog
+from pomodoro_core.history import LOG_MAGIC, RECORD
+
+
+def open_log(path):
+    log = SessionLog(str(path))
+    log.load()
+    return log
+
+
+def log_session(log, start, task_id=None):
+    return log.append("Work", start, start + 1500, start, start + 1500, 1500, task_id)
+
+
+def test_instances_append_without_overwriting(tmp_path):
+    path = tmp_path / "sessions.bin"
+    a = open_log(path)
+    b = open_log(path)
+    log_session(a, 1_700_000_000, task_id=1)
+    assert a.flush()
+    log_session(b, 1_700_003_600, task_id=2)
+    assert b.flush()
+    log_session(a, 1_700_007_200, task_id=1)
+    assert a.flush()
+    assert len(b) == 2  # read a's first session when writing its own
+    assert len(a) == 3
+    a.close()
+    b.close()
+
+    reopened = open_log(path)
+    assert sorted(reopened.task_ids) == [1, 1, 2]
+    assert reopened.task(1).work_sessions == 2
+    assert path.stat().st_size == len(LOG_MAGIC) + 3 * RECORD.size
+    reopened.close()
+
+
+def test_torn_record_is_cut_off(tmp_path):
+    path = tmp_path / "sessions.bin"
+    log = open_log(path)
+    log_session(log, 1_700_000_000)
+    log.close()
+    with open(path, "ab") as f:
+        f.write(b"\x01" * (RECORD.size // 2))  # a crash mid-append
+
+    log = open_log(path)
+    assert len(log) == 1
+    assert log.skipped_bytes == RECORD.size // 2
+    log_session(log, 1_700_003_600)
+    log.close()
+
+    reopened = open_log(path)
+    assert len(reopened) == 2
+    assert reopened.skipped_bytes == 0
+    reopened.close()
+
+
+def test_paused_time_is_not_counted(tmp_path):
+    path = tmp_path / "sessions.bin"
+    log = open_log(path)
+    start = 1_700_000_000
+    # A 25 minute session paused for 10 minutes along the way
+    index = log.append("Work", start, start + 2100, start, start + 2100, 1500, task_id=1, actual=1500)
+    log.close()
+
+    reopened = open_log(path)
+    assert reopened.session(index)["actual_s"] == 1500
+    assert reopened.task(1).work_seconds == 1500
+    reopened.close()
+
+
+def test_append_does_not_wait_for_the_file(tmp_path):
+    path = tmp_path / "sessions.bin"
+    log = open_log(path)
+    with FileLock(str(path) + ".lock"):  # another instance busy with the log
+        started = time.monotonic()
+        log_session(log, 1_700_000_000)
+        assert time.monotonic() - started < 0.5
+        assert len(log) == 1
+        assert path.stat().st_size == len(LOG_MAGIC)
+    assert log.flush()
+    assert path.stat().st_size == len(LOG_MAGIC) + RECORD.size
+    log.close()
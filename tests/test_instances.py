@@ -0,0 +1,107 @@
+import threading
+
+from pomodoro_core import Task
+
+from .helpers import open_json, reload_until_changed, snapshot
+
+
+def test_instances_see_each_others_changes(open_store):
+    a = open_store()
+    b = open_store()
+    task_id = a.add(Task("from a"))
+    a.flush()
+    assert reload_until_changed(b)
+    assert b.get(task_id).title == "from a"
+
+    b.delete(task_id)
+    b.flush()
+    assert ("delete", task_id) in reload_until_changed(a)
+    assert not a.exists(task_id)
+
+
+def test_instances_never_hand_out_the_same_id(open_store):
+    a = open_store()
+    b = open_store()
+    ids = [a.add(Task("a")) for _ in range(3)] + [b.add(Task("b")) for _ in range(3)]
+    a.flush()
+    b.flush()
+    assert len(set(ids)) == len(ids)
+    assert reload_until_changed(a)
+    assert sorted(task.id for task in a.all_tasks()) == sorted(ids)
+
+
+def test_queued_change_wins_over_another_instances(tmp_path):
+    path = tmp_path / "tasks.json"
+    a = open_json(path)
+    task_id = a.add(Task("original"))
+    a.flush()
+    b = open_json(path)
+    a.writer.debounce = 60  # keep a's edit queued while b's lands
+    mine = a.get(task_id).copy()
+    mine.title = "mine"
+    a.update(mine)
+    theirs = b.get(task_id).copy()
+    theirs.title = "theirs"
+    b.update(theirs)
+    b.flush()
+    reload_until_changed(a, timeout=0.5)
+    assert a.get(task_id).title == "mine"
+    a.flush()
+    assert reload_until_changed(b)
+    assert b.get(task_id).title == "mine"
+    a.close()
+    b.close()
+
+
+def test_catching_up_after_another_instance_compacts(tmp_path):
+    path = tmp_path / "tasks.json"
+    a = open_json(path, compact_every=5)
+    b = open_json(path)
+    doomed = b.add(Task("deleted by a"))
+    b.flush()
+    assert reload_until_changed(a)
+    for i in range(20):
+        a.add(Task(f"from a {i}"))
+        a.flush()
+    a.delete(doomed)
+    a.flush()
+    a.compact(wait=True)
+
+    diff_threads = []
+    disk_diff = b._disk_diff
+
+    def spy(*args):
+        diff_threads.append(threading.current_thread())
+        return disk_diff(*args)
+
+    b._disk_diff = spy
+    changes = reload_until_changed(b)
+    assert ("delete", doomed) in changes
+    assert snapshot(b) == snapshot(a)
+    # The snapshot is read and diffed off the polling (UI) thread
+    assert diff_threads and threading.current_thread() not in diff_threads
+    a.close()
+    b.close()
+
+
+def test_adding_tasks_uses_ids_reserved_by_the_writer(open_store):
+    store = open_store()
+    store.flush()
+
+    def reserve_on_the_calling_thread(count):
+        raise AssertionError("reserved ids on the calling thread")
+
+    store._reserve_ids = reserve_on_the_calling_thread
+    ids = []
+    for i in range(2500):
+        ids.append(store.add(Task(f"task {i}")))
+        if i % 100 == 0:
+            store.flush()
+    assert len(set(ids)) == len(ids)
+    expected = snapshot(store)
+    assert store.close()
+
+    reopened = open_store()
+    assert snapshot(reopened) == expected
+    other = reopened.add(Task("after restart"))
+    assert other not in expected
@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+
+from pomodoro_core import Task
+
+from .helpers import open_json, snapshot
+
+
+def test_torn_journal_tail_is_dropped(tmp_path):
+    path = tmp_path / "tasks.json"
+    store = open_json(path)
+    first = store.add(Task("first"))
+    assert store.close()
+    with open(store.journal_path, "ab") as f:
+        f.write(b'{"op":"add","task":{"id":99,"tit')  # a crash mid-append
+
+    store = open_json(path)
+    assert [task.id for task in store.all_tasks()] == [first]
+    second = store.add(Task("second"))
+    assert store.close()
+    with open(store.journal_path, "rb") as f:
+        lines = f.read().splitlines()
+    assert all(json.loads(line) for line in lines)
+
+    store = open_json(path)
+    assert [task.title for task in store.all_tasks()] == ["first", "second"]
+    assert store.get(second).title == "second"
+    store.close()
+
+
+def test_corrupt_snapshot_fails_the_load_and_is_kept(tmp_path):
+    path = tmp_path / "tasks.json"
+    path.write_text('{"tasks": [{"id": 1, "title": "half')
+    with pytest.raises(ValueError, match="moved to"):
+        open_json(path)
+    assert not path.exists()
+    assert (tmp_path / "tasks.json.corrupt").read_text().startswith('{"tasks"')
+
+
+def test_unreadable_snapshot_is_left_in_place(tmp_path, monkeypatch):
+    path = tmp_path / "tasks.json"
+    store = open_json(path)
+    store.add(Task("kept"))
+    store.flush()
+    store.compact(wait=True)
+    store.close()
+    assert path.exists()
+    real_open = open
+
+    def failing_open(file, *args, **kwargs):
+        if str(file) == str(path):
+            raise PermissionError("denied")
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", failing_open)
+    with pytest.raises(OSError):
+        open_json(path)
+    monkeypatch.undo()
+    assert not (tmp_path / "tasks.json.corrupt").exists()
+    reopened = open_json(path)
+    assert [task.title for task in reopened.all_tasks()] == ["kept"]
+    reopened.close()
+
+
+def test_compaction_keeps_every_task(tmp_path):
+    path = tmp_path / "tasks.json"
+    store = open_json(path, compact_every=5)
+    for i in range(40):
+        store.add(Task(f"task {i}"))
+        store.flush()
+    expected = snapshot(store)
+    assert store.close()
+    assert os.path.isfile(path)
+
+    store = open_json(path)
+    assert snapshot(store) == expected
+    store.close()
@@ -0,0 +1,94 @@
+import json
+import threading
+
+import pytest
+
+from pomodoro_core import LatencyStat, Metrics, percentile
+from pomodoro_core.metrics import SAMPLE_WINDOW
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_percentile_picks_a_recorded_value():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([3, 1, 2], 0.5) == 2
+    assert percentile(list(range(100)), 0.99) == 99
+    assert percentile(list(range(100)), 1.0) == 99
+
+
+def test_stat_summary_in_milliseconds():
+    stat = LatencyStat()
+    for seconds in (0.001, 0.002, 0.003, 0.010):
+        stat.record(seconds)
+    stat.record(0.004, error=True)
+    summary = stat.summary()
+    assert summary["count"] == 5 and summary["errors"] == 1
+    assert summary["avg_ms"] == pytest.approx(4.0)
+    assert summary["p50_ms"] == pytest.approx(3.0)
+    assert summary["max_ms"] == pytest.approx(10.0)
+
+
+def test_samples_keep_only_the_latest_window():
+    stat = LatencyStat()
+    for _ in range(SAMPLE_WINDOW):
+        stat.record(1.0)
+    for _ in range(SAMPLE_WINDOW):
+        stat.record(0.001)
+    assert len(stat.samples) == SAMPLE_WINDOW
+    assert stat.summary()["p99_ms"] == pytest.approx(1.0)
+    assert stat.summary()["max_ms"] == pytest.approx(1000.0)  # max covers everything
+
+
+def test_timed_records_errors_and_lets_them_through():
+    clock = Clock()
+    metrics = Metrics(clock)
+    with metrics.timed("save"):
+        clock.now += 0.25
+    with pytest.raises(OSError):
+        with metrics.timed("save"):
+            clock.now += 0.75
+            raise OSError("disk full")
+    latency = metrics.snapshot()["latency"]["save"]
+    assert latency["count"] == 2 and latency["errors"] == 1
+    assert latency["avg_ms"] == pytest.approx(500.0)
+
+
+def test_counters_from_many_threads():
+    metrics = Metrics()
+
+    def count():
+        for _ in range(1000):
+            metrics.count("calls")
+            metrics.record("call", 0.001)
+
+    threads = [threading.Thread(target=count) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {"calls": 4000}
+    assert snapshot["latency"]["call"]["count"] == 4000
+
+
+def test_dump_includes_sources_and_reset_clears(tmp_path):
+    metrics = Metrics()
+    metrics.count("saves", 3)
+    metrics.add_source("writer", lambda: {"pending": 2})
+    path = str(tmp_path / "metrics.json")
+    metrics.dump(path)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["counters"] == {"saves": 3}
+    assert data["writer"] == {"pending": 2}
+    assert not (tmp_path / "metrics.json.tmp").exists()
+
+    metrics.reset()
+    metrics.count("saves")
+    assert metrics.snapshot()["counters"] == {"saves": 1}
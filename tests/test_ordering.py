@@ -0,0 +1,97 @@
+import random
+from datetime import date
+
+from pomodoro_core import SORT_KEYS, Priority, Task, TaskOrdering
+from pomodoro_core.tasks import NO_DUE
+
+JAN1 = date(2025, 1, 1).toordinal()
+
+
+def make_task(task_id, due=NO_DUE, priority=Priority.MEDIUM, done=False):
+    return Task(f"task {task_id}", "", due, priority, done, task_id=task_id)
+
+
+def expected_ids(tasks, sort, show_done=True, descending=False):
+    # Open tasks first, then done ones; descending reverses within each group
+    key = SORT_KEYS[sort]
+    groups = [sorted((t for t in tasks if not t.done), key=key)]
+    if show_done:
+        groups.append(sorted((t for t in tasks if t.done), key=key))
+    ids = []
+    for group in groups:
+        ids.extend(t.id for t in (reversed(group) if descending else group))
+    return ids
+
+
+def test_orders_by_due_then_priority_with_undated_and_done_last():
+    today = JAN1 + 30
+    tasks = [
+        make_task(1),
+        make_task(2, due=today + 2),
+        make_task(3, due=today, priority=Priority.LOW),
+        make_task(4, due=today, priority=Priority.HIGH),
+        make_task(5, due=today - 9, done=True),
+    ]
+    ordering = TaskOrdering()
+    ordering.add_all(tasks)
+    assert ordering.ids("due", 0, 10) == [4, 3, 2, 1, 5]
+    assert ordering.ids("priority", 0, 10) == [4, 2, 1, 3, 5]
+    assert ordering.first("due") == 4
+    assert ordering.count(show_done=False) == 4
+
+
+def test_insert_update_and_delete_refile_one_task():
+    ordering = TaskOrdering()
+    ordering.add_all([make_task(1, due=JAN1 + 1), make_task(2, due=JAN1 + 2)])
+    ordering.on_store_change("add", 3, make_task(3, due=JAN1))
+    assert ordering.ids("due", 0, 10) == [3, 1, 2]
+    ordering.on_store_change("update", 3, make_task(3, due=JAN1, done=True))
+    assert ordering.ids("due", 0, 10) == [1, 2, 3]
+    assert ordering.ids("due", 0, 10, show_done=False) == [1, 2]
+    ordering.on_store_change("delete", 1, None)
+    assert ordering.ids("due", 0, 10) == [2, 3]
+    assert ordering.first("due") == 2
+    ordering.on_store_change("update", 2, make_task(2, due=JAN1 + 2, done=True))
+    assert ordering.first("due") is None
+
+
+def test_descending_pages_keep_open_tasks_first():
+    tasks = [make_task(i, due=JAN1 + i - 1, done=i % 3 == 0) for i in range(1, 10)]
+    ordering = TaskOrdering()
+    ordering.add_all(tasks)
+    assert ordering.ids("due", 0, 20, descending=True) == [8, 7, 5, 4, 2, 1, 9, 6, 3]
+    assert ordering.ids("due", 4, 4, descending=True) == [2, 1, 9, 6]
+    assert ordering.ids("due", 0, 20, show_done=False, descending=True) == [8, 7, 5, 4, 2, 1]
+
+
+def test_random_changes_match_a_full_sort():
+    rng = random.Random(7)
+    ordering = TaskOrdering()
+    tasks = {i: make_task(i) for i in range(1, 40)}
+    ordering.add_all(tasks.values())
+    next_id = 40
+    for _ in range(400):
+        roll = rng.random()
+        if roll < 0.3 or not tasks:
+            task_id, next_id = next_id, next_id + 1
+            op = "add"
+        elif roll < 0.45:
+            task_id = rng.choice(list(tasks))
+            del tasks[task_id]
+            ordering.on_store_change("delete", task_id, None)
+            continue
+        else:
+            task_id = rng.choice(list(tasks))
+            op = "update"
+        due = rng.choice([NO_DUE, JAN1 + rng.randrange(20)])
+        task = tasks[task_id] = make_task(task_id, due, rng.choice(list(Priority)), rng.random() < 0.3)
+        ordering.on_store_change(op, task_id, task)
+
+        sort = rng.choice(list(SORT_KEYS))
+        show_done, descending = rng.random() < 0.5, rng.random() < 0.5
+        offset, limit = rng.randrange(len(tasks) + 5), rng.randrange(1, 15)
+        full = expected_ids(tasks.values(), sort, show_done, descending)
+        assert ordering.ids(sort, offset, limit, show_done, descending) == full[offset:offset + limit]
+        assert ordering.count(show_done) == len(full)
+    open_ids = expected_ids(tasks.values(), "due", show_done=False)
+    assert ordering.first("due") == (open_ids[0] if open_ids else None)
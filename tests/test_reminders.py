@@ -0,0 +1,66 @@
+from datetime import date, datetime
+
+from pomodoro_core import Task, ReminderSchedule
+from pomodoro_core.reminders import due_deadline
+from pomodoro_core.tasks import NO_DUE
+
+DAY1 = date(2025, 5, 1).toordinal()
+DAY2 = DAY1 + 1
+DAY3 = DAY1 + 2
+
+
+def make_task(task_id, due=NO_DUE, done=False):
+    return Task(f"task {task_id}", "", due, done=done, task_id=task_id)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadline_is_the_midnight_after_the_due_date():
+    assert due_deadline(DAY1) == datetime(2025, 5, 2).timestamp()
+    assert due_deadline(DAY3) == datetime(2025, 5, 4).timestamp()
+
+
+def test_build_splits_overdue_from_upcoming():
+    clock = Clock(due_deadline(DAY1) + 1)
+    schedule = ReminderSchedule(clock)
+    schedule.add_all([make_task(1, DAY1), make_task(2, DAY3), make_task(3, DAY2),
+                      make_task(4), make_task(5, DAY1, done=True)])
+    assert schedule.overdue == {1}
+    assert schedule.next_deadline() == due_deadline(DAY2)
+    assert schedule.pop_due() == []
+    assert schedule.pop_due(due_deadline(DAY3)) == [3, 2]
+    assert schedule.overdue == {1, 2, 3}
+    assert schedule.next_deadline() is None
+
+
+def test_edits_move_or_drop_deadlines():
+    clock = Clock(0.0)
+    schedule = ReminderSchedule(clock)
+    schedule.on_store_change("add", 1, make_task(1, DAY1))  # ignored before the build
+    assert schedule.next_deadline() is None
+    schedule.add_all([make_task(1, DAY1), make_task(2, DAY2)])
+
+    schedule.on_store_change("update", 1, make_task(1, DAY3))
+    assert schedule.next_deadline() == due_deadline(DAY2)
+    schedule.on_store_change("update", 2, make_task(2, DAY2, done=True))
+    schedule.on_store_change("add", 3, make_task(3, DAY2))
+    schedule.on_store_change("delete", 1, None)
+    assert schedule.pop_due(due_deadline(DAY3)) == [3]
+
+    schedule.on_store_change("reload", None, None)
+    assert not schedule.built and schedule.next_deadline() is None
+
+
+def test_repeated_edits_do_not_grow_the_heap_without_bound():
+    schedule = ReminderSchedule(Clock(0.0))
+    schedule.add_all([make_task(1, DAY1)])
+    for i in range(1000):
+        schedule.on_store_change("update", 1, make_task(1, DAY2 if i % 2 else DAY3))
+    assert len(schedule.heap) <= 2 + 64 + 1
+    assert schedule.pop_due(due_deadline(DAY3)) == [1]
@@ -0,0 +1,25 @@
+from pomodoro_core import SearchIndex, Task
+
+
+def make_index(*titles):
+    index = SearchIndex()
+    tasks = []
+    for task_id, title in enumerate(titles, 1):
+        task = Task(title)
+        task.id = task_id
+        tasks.append(task)
+    index.add_all(tasks)
+    return index
+
+
+def test_prefixes_of_three_letters_match_word_starts():
+    index = make_index("review report", "reading list", "fix bug")
+    assert index.search("rep") == [1]
+    assert index.search("rea") == [2]
+    assert index.search("rev rep") == [1]
+
+
+def test_short_terms_only_match_whole_words():
+    index = make_index("go home", "good morning")
+    assert index.search("go") == [1]
+    assert index.search("re") == []
@@ -0,0 +1,101 @@
+import json
+
+from pomodoro_core import SQLiteTaskStore, Task, TaskJournal, migrate_json_to_sqlite
+from pomodoro_core.tasks import Priority, parse_due
+
+from .helpers import open_json, snapshot
+
+
+def test_changes_survive_a_restart(open_store):
+    store = open_store()
+    kept = store.add(Task("kept", "details", parse_due("2025-03-01"), Priority.HIGH))
+    edited = store.add(Task("edited"))
+    gone = store.add(Task("gone"))
+    done = store.add(Task("done"))
+    task = store.get(edited).copy()
+    task.title = "edited twice"
+    store.update(task)
+    store.delete(gone)
+    store.mark_done(done)
+    store.save_settings({"work_mins": 50})
+    expected = snapshot(store)
+    assert store.close()
+
+    reopened = open_store()
+    assert snapshot(reopened) == expected
+    assert reopened.get(done).done
+    assert reopened.get(kept).priority == Priority.HIGH
+    assert reopened.settings["work_mins"] == 50
+
+
+def test_due_tasks_are_the_open_ones_with_a_due_date(open_store):
+    store = open_store(debounce=60)
+    due = store.add(Task("due", due=parse_due("2025-03-01")))
+    closed = store.add(Task("closed", due=parse_due("2025-03-01")))
+    store.add(Task("someday"))
+    store.flush()
+    store.mark_done(closed)
+    queued = store.add(Task("queued", due=parse_due("2025-03-02")))  # not written yet
+    assert sorted(task.id for task in store.due_tasks()) == [due, queued]
+
+
+def test_ids_given_out_while_loading_survive_a_restart(tmp_path):
+    path = tmp_path / "tasks.json"
+    path.write_text(json.dumps({"tasks": [{"id": 1, "title": "a"}, {"id": 1, "title": "b"}, {"title": "c"}]}))
+    store = open_json(path)
+    assert len({task.id for task in store.all_tasks()}) == 3
+    task = next(task for task in store.all_tasks() if task.title == "b").copy()
+    task.title = "b, edited"
+    store.update(task)
+    expected = snapshot(store)
+    assert store.close()
+
+    reopened = open_json(path)
+    assert snapshot(reopened) == expected
+    reopened.close()
+
+
+def test_listings_follow_the_journal_while_loading(tmp_path):
+    path = tmp_path / "tasks.json"
+    store = open_json(path)
+    ids = [store.add(Task(f"task {i}")) for i in range(10)]
+    store.flush()
+    store.compact(wait=True)
+    store.delete(ids[0])
+    store.mark_done(ids[1])
+    added = store.add(Task("from the journal"))
+    store.close()
+
+    loading = TaskJournal(str(path), debounce=0)
+    for chunk in loading.read_chunks():
+        loading.absorb(chunk)
+        # The app pages after every chunk, before finish_load()
+        listed = [task.id for task in loading.page(0, 20)]
+        hidden = [task.id for task in loading.page(0, 20, show_done=False)]
+        by_due = [task.id for task in loading.page(0, 20, sort="due")]
+    assert listed == ids[1:] + [added]
+    assert sorted(by_due) == listed
+    assert hidden == ids[2:] + [added]
+    loading.finish_load()
+    loading.close()
+
+
+def test_migration_to_sqlite_leaves_the_json_files_alone(tmp_path):
+    path = tmp_path / "tasks.json"
+    store = open_json(path)
+    store.add(Task("in the snapshot"))
+    store.flush()
+    store.compact(wait=True)
+    store.add(Task("in the journal"))
+    store.save_settings({"work_mins": 40})
+    expected = snapshot(store)
+    assert store.close()
+    before = {name: (tmp_path / name).read_bytes() for name in ("tasks.json", "tasks.json.journal")}
+
+    migrate_json_to_sqlite(str(path), str(tmp_path / "tasks.db"))
+    assert {name: (tmp_path / name).read_bytes() for name in before} == before
+    migrated = SQLiteTaskStore(str(tmp_path / "tasks.db"), debounce=0)
+    migrated.load()
+    assert snapshot(migrated) == expected
+    assert migrated.settings["work_mins"] == 40
+    migrated.close()
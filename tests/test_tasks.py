@@ -0,0 +1,39 @@
+from pomodoro_core import Priority, Task, parse_due
+
+
+def test_odd_values_are_written_back_as_read():
+    data = {"id": 1, "title": "t", "details": "", "due": "2025-1-5", "priority": "Urgent", "done": 0, "tag": "x"}
+    task = Task.from_dict(data)
+    assert task.due == parse_due("2025-01-05")
+    assert task.priority == Priority.MEDIUM
+    assert task.done is False
+    assert task.to_dict() == data
+
+
+def test_changed_fields_replace_the_kept_values():
+    task = Task.from_dict({"id": 1, "title": "t", "due": "2025-1-5", "priority": "Urgent", "done": 0, "tag": "x"})
+    task.due = parse_due("2025-02-01")
+    task.priority = Priority.LOW
+    task.done = True
+    data = task.to_dict()
+    assert (data["due"], data["priority"], data["done"]) == ("2025-02-01", "Low", True)
+    assert data["tag"] == "x"
+
+
+def test_unparseable_due_is_kept_until_a_date_is_set():
+    task = Task.from_dict({"id": 1, "title": "t", "due": "tomorrow"})
+    assert task.to_dict()["due"] == "tomorrow"
+    task.due = parse_due("2025-03-01")
+    assert task.to_dict()["due"] == "2025-03-01"
+
+
+def test_edited_due_date_survives_a_restart(open_store):
+    store = open_store()
+    task_id = store.add(Task.from_dict({"title": "old file", "due": "2025-1-5"}))
+    task = store.get(task_id).copy()
+    task.due = parse_due("2025-06-30")
+    store.update(task)
+    assert store.close()
+
+    reopened = open_store()
+    assert reopened.get(task_id).due_str == "2025-06-30"
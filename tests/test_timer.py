@@ -0,0 +1,81 @@
+import pytest
+
+from benchmarks.timer_drift import SimulatedLoop
+from pomodoro_core import TimerManager
+
+
+def make_manager(on_finish=None):
+    loop = SimulatedLoop(lambda: 0.0)
+    manager = TimerManager(loop.after, loop.after_cancel, on_finish=on_finish, clock=loop.clock)
+    return loop, manager
+
+
+def run_for(loop, manager, seconds):
+    loop.after(seconds * 1000, manager.close)
+    loop.run()
+
+
+def test_timers_finish_in_deadline_order_and_move_on():
+    finished = []
+    loop, manager = make_manager(lambda timer: finished.append((timer.name, timer.cycle.mode)))
+    manager.add("long", {"work_mins": 2})
+    manager.add("short", {"work_mins": 1, "short_break_mins": 5})
+    manager.start("long")
+    manager.start("short")
+    run_for(loop, manager, 150)
+    assert finished == [("short", "Work"), ("long", "Work")]
+    assert manager.get("short").cycle.mode == "Short Break"
+    assert manager.get("long").running
+
+
+def test_pause_and_reset_stop_a_timer():
+    finished = []
+    loop, manager = make_manager(lambda timer: finished.append(timer.name))
+    manager.add("paused", {"work_mins": 1})
+    manager.add("reset", {"work_mins": 1})
+    manager.start("paused")
+    manager.start("reset")
+    manager.pause("paused")
+    manager.reset("reset")
+    run_for(loop, manager, 120)
+    assert finished == []
+    assert manager.running == 0
+    assert manager.get("paused").remaining == 60
+
+
+@pytest.mark.parametrize("settings", [
+    {"pomodoro_target": 0},
+    {"work_mins": 0},
+    {"short_break_mins": -5},
+    {"work_mins": 1.5},
+    {"work_mins": "25"},
+    {"work_mins": True},
+    {"snooze_mins": 5},
+])
+def test_bad_settings_are_rejected(settings):
+    _, manager = make_manager()
+    with pytest.raises(ValueError):
+        manager.add("bad", settings)
+    assert len(manager) == 0
+
+
+def test_a_failing_callback_does_not_stop_the_other_timers():
+    finished = []
+
+    def on_finish(timer):
+        finished.append(timer.name)
+        if timer.name == "broken":
+            raise RuntimeError("display gone")
+
+    loop, manager = make_manager(on_finish)
+    manager.add("broken", {"work_mins": 1})
+    manager.add("fine", {"work_mins": 1})
+    manager.add("later", {"work_mins": 2})
+    for name in ("broken", "fine", "later"):
+        manager.start(name)
+    with pytest.raises(RuntimeError):
+        loop.run()  # the loop reports the error, like Tk does
+    run_for(loop, manager, 180)
+    assert finished.count("fine") == 1
+    assert "later" in finished
+    assert manager.get("fine").cycle.mode == "Short Break"
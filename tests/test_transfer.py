@@ -0,0 +1,82 @@
+import json
+import threading
+import time
+
+import pytest
+
+from pomodoro_core import TaskImporter, TaskJournal
+
+
+def test_import_compacts_a_few_times_not_once_a_batch(tmp_path, monkeypatch):
+    source = tmp_path / "tasks.jsonl"
+    with open(source, "w", encoding="utf-8") as f:
+        for i in range(2000):
+            f.write(json.dumps({"title": f"task {i}", "due": "2025-01-05"}) + "\n")
+        f.write(json.dumps({"title": "bad", "due": "someday"}) + "\n")
+    store = TaskJournal(str(tmp_path / "tasks.json"), compact_every=5, debounce=0)
+    store.load()
+    snapshots = []
+    write_snapshot = store._write_snapshot
+    monkeypatch.setattr(store, "_write_snapshot", lambda: snapshots.append(1) or write_snapshot())
+
+    job = TaskImporter(store, str(source), batch_size=20).run()
+    assert store.close()
+    assert (job.imported, job.rejected) == (2000, 1)
+    assert len(snapshots) <= 12  # 100 batches
+
+    reopened = TaskJournal(store.snapshot_path)
+    reopened.load()
+    assert reopened.count() == 2000
+    assert reopened.journal_records <= 1  # the import ended with a snapshot
+    reopened.close()
+
+
+def test_bad_rows_are_skipped_and_reported(tmp_path):
+    source = tmp_path / "tasks.jsonl"
+    rows = [
+        json.dumps({"title": "good", "priority": "High"}),
+        json.dumps({"title": "list priority", "priority": ["High"]}),
+        json.dumps({"title": "object priority", "priority": {"label": "Low"}}),
+        json.dumps({"title": "odd priority", "priority": "Urgent"}),
+        json.dumps({"title": ""}),
+        json.dumps(["not", "an", "object"]),
+        "{not json",
+        json.dumps({"title": "also good", "due": "2025-02-01", "done": "yes"}),
+    ]
+    source.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    store = TaskJournal(str(tmp_path / "tasks.json"), debounce=0)
+    store.load()
+
+    job = TaskImporter(store, str(source)).run()
+    assert (job.imported, job.rejected) == (2, 6)
+    assert [line for line, _ in job.errors] == [2, 3, 4, 5, 6, 7]
+    assert sorted(task.title for task in store.all_tasks()) == ["also good", "good"]
+    assert store.close()
+
+
+def test_import_steps_hold_off_instead_of_waiting_for_the_disk(tmp_path, monkeypatch):
+    source = tmp_path / "tasks.jsonl"
+    source.write_text("".join(json.dumps({"title": f"task {i}"}) + "\n" for i in range(100)), encoding="utf-8")
+    store = TaskJournal(str(tmp_path / "tasks.json"), debounce=0)
+    store.load()
+    store.flush()
+    monkeypatch.setattr(store, "flush", lambda: pytest.fail("an import step waited on the writer"))
+    disk = threading.Event()
+    write_batch = store.writer.write_batch
+    store.writer.write_batch = lambda ops: disk.wait() and write_batch(ops)
+
+    job = TaskImporter(store, str(source), batch_size=10)
+    assert job.step() and job.step()
+    assert job.step() and job.waiting  # two batches behind: nothing read
+    assert job.imported == 20
+    disk.set()
+    while job.step():
+        time.sleep(0.001 if job.waiting else 0)
+    assert job.imported == 100
+    monkeypatch.undo()
+    assert store.close()
+
+    reopened = TaskJournal(store.snapshot_path)
+    reopened.load()
+    assert reopened.count() == 100
+    reopened.close()
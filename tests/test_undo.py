@@ -0,0 +1,67 @@
+from pomodoro_core import Task, UndoHistory
+
+
+def test_undo_and_redo_of_a_delete_within_one_write(open_store):
+    # Delete, undo, redo before the writer gets to any of it: the task must stay deleted
+    store = open_store()
+    task_id = store.add(Task("doomed"))
+    store.flush()
+    store.writer.debounce = 60
+    history = UndoHistory()
+    before = history.capture(store, [task_id])
+    store.delete(task_id)
+    history.record("Delete", before, {task_id: None})
+    assert history.undo(store) == ("Delete", [task_id], [])
+    assert store.get(task_id).title == "doomed"
+    assert history.redo(store) == ("Delete", [], [task_id])
+    assert not store.exists(task_id)
+    assert store.close()
+
+    reopened = open_store()
+    assert not reopened.exists(task_id)
+    assert reopened.count() == 0
+
+
+def test_undone_delete_survives_a_restart(open_store):
+    store = open_store(debounce=60)
+    task_id = store.add(Task("kept"))
+    history = UndoHistory()
+    before = history.capture(store, [task_id])
+    store.delete(task_id)
+    history.record("Delete", before, {task_id: None})
+    history.undo(store)
+    assert store.close()
+
+    reopened = open_store()
+    assert reopened.get(task_id).title == "kept"
+
+
+def test_undo_of_an_add_that_was_never_written(open_store):
+    store = open_store(debounce=60)
+    history = UndoHistory()
+    task_id = store.add(Task("new"))
+    history.record("Add", {task_id: None}, history.capture(store, [task_id]))
+    history.undo(store)
+    assert not store.exists(task_id)
+    history.redo(store)
+    assert store.close()
+
+    reopened = open_store()
+    assert reopened.get(task_id).title == "new"
+
+
+def test_undo_of_an_edit_restores_every_field(open_store):
+    store = open_store()
+    task_id = store.add(Task("title", "details"))
+    history = UndoHistory()
+    before = history.capture(store, [task_id])
+    edited = store.get(task_id).copy()
+    edited.title, edited.details, edited.done = "new title", "new details", True
+    store.update(edited)
+    history.record("Edit", before, history.capture(store, [task_id]))
+    history.undo(store)
+    assert store.close()
+
+    reopened = open_store()
+    assert reopened.get(task_id) == before[task_id]
+    assert history.redo_label() == "Edit"
@@ -0,0 +1,66 @@
+import threading
+
+from pomodoro_core.writer import CoalescingWriter, merge_ops
+
+
+def test_add_then_update_stays_an_add():
+    merged = merge_ops({"op": "add", "task": "old"}, {"op": "update", "task": "new"})
+    assert merged == {"op": "add", "task": "new"}
+
+
+def test_add_then_delete_writes_nothing():
+    assert merge_ops({"op": "add", "task": "t"}, {"op": "delete", "id": 1}) is None
+
+
+def test_update_then_delete_is_a_delete():
+    assert merge_ops({"op": "update", "task": "t"}, {"op": "delete", "id": 1}) == {"op": "delete", "id": 1}
+
+
+def test_delete_then_update_writes_the_task():
+    # A deleted task put back (undo) must reach the disk again
+    assert merge_ops({"op": "delete", "id": 1}, {"op": "update", "task": "t"}) == {"op": "update", "task": "t"}
+
+
+def test_done_is_carried_by_a_queued_task():
+    old = {"op": "update", "task": "t"}
+    assert merge_ops(old, {"op": "done", "id": 1}) is old
+
+
+def test_settings_are_merged_key_by_key():
+    merged = merge_ops({"op": "settings", "settings": {"a": 1, "b": 1}}, {"op": "settings", "settings": {"b": 2}})
+    assert merged == {"op": "settings", "settings": {"a": 1, "b": 2}}
+
+
+def test_burst_is_written_as_one_batch():
+    batches = []
+    writer = CoalescingWriter(batches.append, debounce=60)
+    for i in range(100):
+        writer.submit(1, {"op": "update", "task": i})
+    writer.submit(2, {"op": "delete", "id": 2})
+    assert writer.flush()
+    writer.close()
+    assert batches == [[{"op": "update", "task": 99}, {"op": "delete", "id": 2}]]
+    stats = writer.stats()
+    assert (stats["ops"], stats["coalesced"], stats["writes"]) == (101, 99, 1)
+
+
+def test_failed_batch_is_retried_with_later_changes_merged():
+    batches = []
+    fail = threading.Event()
+    fail.set()
+
+    def write_batch(ops):
+        if fail.is_set():
+            fail.clear()
+            raise OSError("disk full")
+        batches.append(ops)
+
+    writer = CoalescingWriter(write_batch, debounce=0.01)
+    writer.submit(1, {"op": "add", "task": "a"})
+    assert not writer.flush()
+    assert isinstance(writer.take_error(), OSError)
+    writer.submit(1, {"op": "update", "task": "b"})
+    assert writer.flush()
+    writer.close()
+    assert batches == [[{"op": "add", "task": "b"}]]
+    assert writer.stats()["failures"] == 1
@@ -1,21 +1,298 @@
+import time
+STARTED = time.perf_counter()  # startup phases are timed from here, before the heavy imports
+
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox, filedialog, simpledialog
 from tkinter.font import Font
-from datetime import datetime, timedelta
 import json
+import math
 import os
-import platform
+import queue
+import sqlite3
 import threading
-import time
-import winsound  # Only works on Windows for sound
-# For cross-platform sound, external libs are needed, but we'll keep offline & minimal.
+import wave
+from datetime import date
+
+from pomodoro_core import (
+    AudioPlayer,
+    ControlServer,
+    Metrics,
+    MIN_PREFIX,
+    PomodoroCycle,
+    PRIORITIES,
+    Priority,
+    ReminderSchedule,
+    SearchIndex,
+    SearchQuery,
+    SessionLog,
+    Task,
+    TaskExporter,
+    TaskImporter,
+    TaskQuery,
+    TimerEngine,
+    TimerManager,
+    UndoHistory,
+    open_store,
+    parse_address,
+    parse_due,
+    task_from_record,
+    validate_settings,
+)
 
-APP_DATA_FILE = "todo_pomodoro_data.json"
 AUDIO_PREF_FILE = "audio_pref.json"
+WRITER_POLL_MS = 100  # how often to check on the background writer while it has work
+TRANSFER_FILETYPES = [("JSON Lines", "*.jsonl"), ("CSV", "*.csv")]
+TRANSFER_WAIT_MS = 50  # between import steps while the store's writer is behind
+SHIFT_MASK, CONTROL_MASK = 0x1, 0x4  # event.state bits
+AUDIO_CHECK_MS = 1000  # when to look for a playback error after starting a sound
+LOAD_POLL_MS = 15      # how often loaded chunks are picked up from the loader thread
+LOAD_SLICE = 0.02      # seconds of chunk handling per Tk callback, so the UI stays live
+DIAGNOSTICS_REFRESH_MS = 1000  # how often the Diagnostics tab updates while it is shown
+CHANGE_POLL_MS = 1000  # how often to look for changes saved by another running instance
+REMINDER_MAX_WAIT_MS = 3_600_000  # longest single after() for a due date, so sleep/clock changes are caught
+OVERDUE_COLOR = "#d64545"
+TIMERS_REFRESH_MS = 1000  # how often the Timers tab redraws while it is shown
+CONTROL_POLL_MS = 20   # how often control API calls are picked up on the Tk thread
+CONTROL_PAGE_LIMIT = 1000  # most tasks one "tasks.list" call returns
+
+
+def format_metric(value):
+    # One Diagnostics row: latency summaries on a line, numbers grouped
+    if isinstance(value, dict) and "p50_ms" in value:
+        return (f"{value['count']:,}× p50 {value['p50_ms']:.2f} p99 {value['p99_ms']:.2f} "
+                f"max {value['max_ms']:.2f} ms" + (f", {value['errors']:,} errors" if value["errors"] else ""))
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, int):
+        return f"{value:,}"
+    if isinstance(value, float):
+        return f"{value:,.3f}"
+    return str(value)
+
+
+def format_focus(seconds):
+    minutes = round(seconds / 60)
+    if minutes < 60:
+        return f"{minutes} min"
+    return f"{minutes // 60} h {minutes % 60:02d} min"
+
+
+def task_row_values(task):
+    details = task.details
+    return (
+        details[:30] + ("..." if len(details) > 30 else ""),
+        task.due_str,
+        task.priority.label,
+        "✔" if task.done else ""
+    )
+
+
+class VirtualTaskList:
+    # Shows a window of the task list in a Treeview.
+    # Only the visible rows exist as Tk items; their iids are the stable task
+    # ids, so an edit only touches the rows that actually changed. Rows come
+    # from a source with count() and page(offset, limit), e.g. a TaskQuery.
+    def __init__(self, tree, scrollbar, source, row_values, row_tags=None, page_size=20):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.source = source
+        self.row_values = row_values  # task dict -> tuple of column values
+        self.row_tags = row_tags or (lambda task: ())  # task -> tuple of Treeview tags
+        self.page_size = page_size
+        self.total = 0        # rows in the source
+        self.offset = 0       # source position of the first visible row
+        self.rendered = []    # task ids currently in the tree, top to bottom
+        self.row_cache = {}   # task_id -> (values, tags) last written to the tree
+        self.selected = set()  # task ids, including rows scrolled out of view
+        self._extending = False  # last click/key had Ctrl or Shift held
+        self._set_by_us = None   # tree selection we set ourselves, to ignore its event
+
+        self.scrollbar.configure(command=self.yview)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+        self.tree.bind("<Configure>", self._on_resize, add="+")
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Up>", lambda e: self._on_arrow(-1))
+        self.tree.bind("<Down>", lambda e: self._on_arrow(1))
+        self.tree.bind("<ButtonPress-1>", self._note_modifiers, add="+")
+        self.tree.bind("<KeyPress>", self._note_modifiers, add="+")
+        self.tree.bind("<Control-a>", lambda e: self.select_all() or "break")
+
+    # ----- model changes -----
+    def set_source(self, source):
+        self.source = source
+        self.offset = 0
+        self.refresh()
+
+    def refresh(self, removed=()):
+        # Re-read the visible window; only rows that differ are touched
+        self.selected.difference_update(removed)
+        self.total = self.source.count()
+        self._clamp_offset()
+        self.render()
+
+    def selection(self):
+        return sorted(self.selected)
+
+    def clear_selection(self):
+        self.selected.clear()
+        if self.tree.selection():
+            self.tree.selection_set(())
+
+    def select(self, task_id):
+        self.selected = {task_id}
+        self._restore_selection()
+        if task_id in self.rendered:
+            self.tree.focus(str(task_id))
+
+    def select_all(self):
+        # Every row matching the current source, not just the visible ones
+        self.selected = set(self.source.ids())
+        self._restore_selection()
+
+    # ----- rendering -----
+    def render(self):
+        window = [(task.id, (self.row_values(task), self.row_tags(task)))
+                  for task in self.source.page(self.offset, self.page_size)]
+        wanted = {task_id for task_id, _ in window}
+
+        current = [task_id for task_id in self.rendered if task_id in wanted]
+        gone = [str(task_id) for task_id in self.rendered if task_id not in wanted]
+        if gone:
+            self.tree.delete(*gone)
+            for iid in gone:
+                self.row_cache.pop(int(iid), None)
+
+        present = set(current)
+        for pos, (task_id, row) in enumerate(window):
+            if task_id not in present:
+                self.tree.insert("", pos, iid=str(task_id), values=row[0], tags=row[1])
+                current.insert(pos, task_id)
+                present.add(task_id)
+            else:
+                if current[pos] != task_id:
+                    self.tree.move(str(task_id), "", pos)
+                    current.remove(task_id)
+                    current.insert(pos, task_id)
+                if self.row_cache.get(task_id) != row:
+                    self.tree.item(str(task_id), values=row[0], tags=row[1])
+            self.row_cache[task_id] = row
+
+        self.rendered = current
+        self._restore_selection()
+        self._update_scrollbar()
+
+    def _restore_selection(self):
+        visible = [str(task_id) for task_id in self.rendered if task_id in self.selected]
+        if set(self.tree.selection()) != set(visible):
+            self._set_by_us = set(visible)
+            self.tree.selection_set(visible)
+
+    def _update_scrollbar(self):
+        if self.total <= self.page_size:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / self.total, (self.offset + self.page_size) / self.total)
+
+    def _clamp_offset(self):
+        max_offset = max(0, self.total - self.page_size)
+        self.offset = min(max(0, self.offset), max_offset)
+
+    # ----- scrolling -----
+    def scroll(self, rows):
+        old = self.offset
+        self.offset += rows
+        self._clamp_offset()
+        if self.offset != old:
+            self.render()
+        return "break"
+
+    def yview(self, *args):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"|"pages")
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self.total)
+            self._clamp_offset()
+            self.render()
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= max(1, self.page_size - 1)
+            self.scroll(step)
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS reports small deltas
+        notches = event.delta // 120 if abs(event.delta) >= 120 else (1 if event.delta > 0 else -1)
+        return self.scroll(-3 * notches)
+
+    def _on_arrow(self, step):
+        focus = self.tree.focus()
+        if not focus or not self.rendered:
+            return None
+        edge = 0 if step < 0 else -1
+        if int(focus) != self.rendered[edge]:
+            return None
+        old = self.offset
+        self.scroll(step)
+        if self.offset != old:
+            target = self.rendered[edge]
+            self.selected = {target}
+            self.tree.focus(str(target))
+            self._restore_selection()
+        return "break"
+
+    def _on_resize(self, event):
+        top, rowheight = self._row_metrics()
+        rows = max(1, (event.height - top - 2) // rowheight)
+        if rows != self.page_size:
+            self.page_size = rows
+            self._clamp_offset()
+            self.render()
+
+    def _row_metrics(self):
+        # (y of the first row, row height), measured on a rendered row when
+        # there is one: themes often leave rowheight unset, and a bigger font
+        # makes rows taller than any fixed guess
+        if self.rendered:
+            box = self.tree.bbox(str(self.rendered[0]))
+            if box:
+                return box[1], box[3]
+        style = ttk.Style(self.tree)
+        rowheight = style.lookup("Treeview", "rowheight")
+        if not rowheight:
+            font = Font(root=self.tree, font=style.lookup("Treeview", "font") or "TkDefaultFont")
+            rowheight = font.metrics("linespace") + 2
+        rowheight = int(rowheight)
+        return rowheight + 4, rowheight  # the heading is about one row high
+
+    def _note_modifiers(self, event):
+        self._extending = bool(event.state & (SHIFT_MASK | CONTROL_MASK))
+
+    def _on_select(self, event=None):
+        current = set(self.tree.selection())
+        if current == self._set_by_us:
+            # Our own selection_set after a scroll or refresh; nothing changed
+            self._set_by_us = None
+            return
+        self._set_by_us = None
+        visible = {int(iid) for iid in current}
+        if self._extending and str(self.tree.cget("selectmode")) != "browse":
+            # Ctrl/Shift-click adds to a selection that may reach off screen
+            self.selected = visible | (self.selected - set(self.rendered))
+        else:
+            self.selected = visible
+
 
 class PomodoroApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, storage="json", report_startup=False, diagnostics_path=None, control_address=None):
+        self.startup = {"imports": time.perf_counter() - STARTED}  # phase -> seconds since STARTED
+        self.report_startup = report_startup
+        self.diagnostics_path = diagnostics_path  # written on exit when set
+        self.metrics = Metrics()
         super().__init__()
+        self._mark_startup("window")
 
         self.title("ToDo + Pomodoro Timer")
         self.geometry("600x500")
@@ -26,14 +303,47 @@ class PomodoroApp(tk.Tk):
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Data holders
-        self.tasks = []
-        self.timer_running = False
-        self.timer_thread = None
-        self.remaining_seconds = 0
-        self.current_timer_mode = "Work"  # Work, Short Break, Long Break
+        self.store = open_store(storage)
+        self.task_query = TaskQuery(self.store)
+        self.search_index = SearchIndex()  # built on the first search
+        self.store.add_listener(self.search_index.on_store_change)
+        self.undo_history = UndoHistory()  # inverse steps for Ctrl+Z / Ctrl+Y
+        self.reminders = ReminderSchedule()  # built once the tasks are loaded
+        self.store.add_listener(self._on_task_change)
+        self._reminder_call = None      # the one pending after() for the next due date
+        self._reminder_deadline = None  # deadline it was set for
+        self._overdue_shown = 0         # overdue count on the status line
+        self._writer_poll = None
+        self._transfer = None  # import/export in progress
+        self.tasks_loaded = False  # set once the background load has finished
+        self._load_queue = queue.Queue()
+        self._load_started = None
+        self._diagnostics_poll = None
+        self.control = None  # local control API, with --control
+        self.timer = TimerEngine(self.after, self.after_cancel,
+                                 on_tick=self._on_timer_tick,
+                                 on_finish=self._on_timer_finished)
+        self.cycle = PomodoroCycle()  # Work, Short Break, Long Break
+        self.timers = TimerManager(self.after, self.after_cancel,  # extra named timers (Timers tab)
+                                   on_finish=self._on_named_timer_finished)
+        self._timers_poll = None
+        self._timer_sound_queued = False
+        self.current_task_id = None   # task the work sessions are for
+        self.history = SessionLog()   # read by the loader thread with the tasks
+        self.history_loaded = False
+        self._session = None          # (mode, wall start, monotonic start, planned secs, task id)
+        self._unlogged_sessions = []  # sessions that ended before the log was read
 
         self.audio_file = None
         self.audio_permanent = False
+        self.audio = AudioPlayer()  # picks winsound, aplay/paplay or silence
+
+        # Components that keep their own numbers; read when a snapshot is taken.
+        # The store's writer only exists once the tasks are loaded
+        self.metrics.add_source("writer", lambda: self.store.writer.stats() if self.store.writer else {})
+        self.metrics.add_source("audio", self.audio.stats)
+        self.metrics.add_source("session_log", self.history.stats)
+        self.metrics.add_source("startup", lambda: dict(self.startup))
 
         # Fonts & Icons (use emojis for icons for simplicity)
         self.font_heading = Font(family="Segoe UI", size=14, weight="bold")
@@ -45,23 +355,33 @@ class PomodoroApp(tk.Tk):
         self.custom_work_mins = tk.IntVar(value=25)
         self.custom_short_break_mins = tk.IntVar(value=5)
         self.custom_long_break_mins = tk.IntVar(value=15)
-        self.pomodoro_count = 0
         self.pomodoro_target = tk.IntVar(value=4)
 
         self.task_title_var = tk.StringVar()
         self.task_detail_var = tk.StringVar()
         self.task_due_var = tk.StringVar()
         self.task_priority_var = tk.StringVar(value="Medium")
+        self.hide_done_var = tk.BooleanVar(value=False)
+        self.search_var = tk.StringVar()
 
         self.timer_display_var = tk.StringVar(value="00:00")
+        self.current_task_var = tk.StringVar(value="")
+        self.tasks_heading_var = tk.StringVar(value="Your Tasks (loading…)")
+        self.overdue_var = tk.StringVar(value="")
 
-        # Load saved data if any
-        self.load_data()
         self.load_audio_pref()
+        if self.audio_file:
+            self.audio.preload(self.audio_file)
 
         # UI Build
         self._build_audio_select_overlay()
 
+        # Tasks load in the background; the window paints straight away
+        self.load_data()
+        if control_address:
+            self._start_control(control_address)
+        self.after(0, lambda: self.after_idle(self._mark_startup, "first_paint"))
+
     def _set_theme(self, mode):
         # Simple light/dark style setup
         if mode == "dark":
@@ -102,7 +422,7 @@ class PomodoroApp(tk.Tk):
         proceed_btn = ttk.Button(self.overlay, text="Proceed", command=self._on_audio_selected)
         proceed_btn.pack(pady=5)
 
-        help_label = ttk.Label(self.overlay, text="(WAV audio recommended for offline playback)", font=self.font_small, foreground="gray")
+        help_label = ttk.Label(self.overlay, text="(uncompressed WAV; played with winsound, aplay or paplay)", font=self.font_small, foreground="gray")
         help_label.pack()
 
     def browse_audio(self):
@@ -116,6 +436,11 @@ class PomodoroApp(tk.Tk):
         if not path or not os.path.isfile(path):
             messagebox.showerror("Invalid File", "Please select a valid audio file.")
             return
+        try:
+            self.audio.load(path)
+        except (OSError, EOFError, wave.Error):
+            messagebox.showerror("Invalid File", "Please select an uncompressed (PCM) WAV file.")
+            return
         self.audio_file = path
         self.audio_permanent = self.perm_sound_var.get()
 
@@ -142,12 +467,14 @@ class PomodoroApp(tk.Tk):
 
         self.timer_display = ttk.Label(timer_frame, textvariable=self.timer_display_var, font=Font(family="Segoe UI", size=48, weight="bold"))
         self.timer_display.pack()
+        current_task_label = ttk.Label(timer_frame, textvariable=self.current_task_var, font=self.font_normal)
+        current_task_label.pack()
 
         # Timer mode display & buttons
         mode_frame = ttk.Frame(timer_frame)
         mode_frame.pack(pady=5)
 
-        self.mode_label_var = tk.StringVar(value=f"Mode: {self.current_timer_mode}")
+        self.mode_label_var = tk.StringVar(value=f"Mode: {self.cycle.mode}")
         mode_label = ttk.Label(mode_frame, textvariable=self.mode_label_var, font=self.font_normal)
         mode_label.pack(side="left", padx=(0,15))
 
@@ -167,14 +494,27 @@ class PomodoroApp(tk.Tk):
         todo_frame = ttk.Frame(content_frame, relief="solid", borderwidth=1, padding=10)
         todo_frame.pack(side="left", fill="both", expand=True, padx=(0,10))
 
-        todo_heading = ttk.Label(todo_frame, text="Your Tasks", font=self.font_heading)
+        todo_heading = ttk.Label(todo_frame, textvariable=self.tasks_heading_var, font=self.font_heading)
         todo_heading.pack(anchor="w")
-
-        self.tasks_tree = ttk.Treeview(todo_frame, columns=("Detail", "Due", "Priority", "Done"), show="headings", selectmode="browse")
-        self.tasks_tree.pack(fill="both", expand=True, pady=5)
-        self.tasks_tree.heading("Detail", text="Details")
-        self.tasks_tree.heading("Due", text="Due Date")
-        self.tasks_tree.heading("Priority", text="Priority")
+        ttk.Label(todo_frame, textvariable=self.overdue_var, font=self.font_small, foreground=OVERDUE_COLOR).pack(anchor="w")
+
+        search_frame = ttk.Frame(todo_frame)
+        search_frame.pack(fill="x", pady=(5, 0))
+        ttk.Label(search_frame, text="🔍", font=self.font_normal).pack(side="left")
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        search_entry.pack(side="left", fill="x", expand=True, padx=(5, 0))
+        self.search_var.trace_add("write", lambda *args: self.apply_task_filter())
+
+        tree_frame = ttk.Frame(todo_frame)
+        tree_frame.pack(fill="both", expand=True, pady=5)
+        self.tasks_tree = ttk.Treeview(tree_frame, columns=("Detail", "Due", "Priority", "Done"), show="headings", selectmode="extended")
+        tasks_scroll = ttk.Scrollbar(tree_frame, orient="vertical")
+        tasks_scroll.pack(side="right", fill="y")
+        self.tasks_tree.pack(side="left", fill="both", expand=True)
+        # Clicking Due/Priority sorts (again to reverse), Details goes back to insertion order
+        self.tasks_tree.heading("Detail", text="Details", command=lambda: self.sort_tasks(None))
+        self.tasks_tree.heading("Due", text="Due Date", command=lambda: self.sort_tasks("due"))
+        self.tasks_tree.heading("Priority", text="Priority", command=lambda: self.sort_tasks("priority"))
         self.tasks_tree.heading("Done", text="Done")
 
         self.tasks_tree.column("Detail", width=150)
@@ -184,7 +524,24 @@ class PomodoroApp(tk.Tk):
 
         self.tasks_tree.bind("<Delete>", self.delete_selected_task)
         self.tasks_tree.bind("<Double-1>", self.edit_selected_task)
-
+        self.tasks_tree.bind("<Button-3>", self._show_task_menu)
+        self.tasks_tree.bind("<Button-2>", self._show_task_menu)  # macOS right button
+
+        # Right-click menu; every entry acts on the whole selection at once
+        self.task_menu = tk.Menu(self, tearoff=0)
+        self.task_menu.add_command(label="Mark Done", command=self.mark_task_done)
+        priority_menu = tk.Menu(self.task_menu, tearoff=0)
+        for label in PRIORITIES:
+            priority_menu.add_command(label=label, command=lambda label=label: self.set_selected_priority(label))
+        self.task_menu.add_cascade(label="Set Priority", menu=priority_menu)
+        self.task_menu.add_command(label="Reschedule…", command=self.reschedule_selected)
+        self.task_menu.add_command(label="Delete", command=self.delete_selected_task)
+        self.task_menu.add_separator()
+        self.task_menu.add_command(label="Select All Matching (Ctrl+A)", command=self.select_all_tasks)
+
+        self.tasks_tree.tag_configure("overdue", foreground=OVERDUE_COLOR)
+        self.task_list = VirtualTaskList(self.tasks_tree, tasks_scroll, self.task_query, task_row_values,
+                                         self._task_row_tags)
         self.refresh_task_list()
 
         # Buttons below tasks list
@@ -197,6 +554,10 @@ class PomodoroApp(tk.Tk):
         del_btn.pack(side="left", padx=2, pady=5)
         done_btn = ttk.Button(btn_frame, text="✔ Mark Done", command=self.mark_task_done)
         done_btn.pack(side="left", padx=2, pady=5)
+        next_btn = ttk.Button(btn_frame, text="⏭ Next Task", command=self.show_next_task)
+        next_btn.pack(side="left", padx=2, pady=5)
+        hide_done_check = ttk.Checkbutton(btn_frame, text="Hide done", variable=self.hide_done_var, command=self.apply_task_filter)
+        hide_done_check.pack(side="left", padx=2, pady=5)
 
         # RIGHT - Task Details and Settings Tabs
         right_notebook = ttk.Notebook(content_frame)
@@ -233,6 +594,7 @@ class PomodoroApp(tk.Tk):
         # Settings Tab
         settings_frame = ttk.Frame(right_notebook, padding=10)
         right_notebook.add(settings_frame, text="Settings")
+        self.right_notebook = right_notebook
 
         # Custom timers
         ttk.Label(settings_frame, text="Work Duration (minutes):", font=self.font_normal).grid(row=0, column=0, sticky="w", pady=5)
@@ -260,31 +622,151 @@ class PomodoroApp(tk.Tk):
         audio_btn = ttk.Button(settings_frame, text="Change Timer Sound", command=self.change_audio_sound)
         audio_btn.grid(row=5, column=0, columnspan=2, pady=10)
 
-        for i in range(6):
+        # Bulk import / export
+        transfer_frame = ttk.Frame(settings_frame)
+        transfer_frame.grid(row=6, column=0, columnspan=2, pady=5)
+        ttk.Button(transfer_frame, text="Import Tasks…", command=self.import_tasks).pack(side="left", padx=5)
+        ttk.Button(transfer_frame, text="Export Tasks…", command=self.export_tasks).pack(side="left", padx=5)
+        self.transfer_status_var = tk.StringVar(value="")
+        ttk.Label(settings_frame, textvariable=self.transfer_status_var, font=self.font_small).grid(row=7, column=0, columnspan=2)
+
+        for i in range(8):
             settings_frame.rowconfigure(i, weight=0)
         settings_frame.columnconfigure(1, weight=1)
 
+        # Stats Tab: from the session log's running totals, so it is instant at any history size
+        self.stats_frame = ttk.Frame(right_notebook, padding=10)
+        right_notebook.add(self.stats_frame, text="Stats")
+        self.stats_summary_var = tk.StringVar(value="")
+        ttk.Label(self.stats_frame, textvariable=self.stats_summary_var, font=self.font_normal, justify="left").pack(anchor="w")
+        self.stats_days_tree = ttk.Treeview(self.stats_frame, columns=("Day", "Pomodoros", "Focus"), show="headings", height=7)
+        self.stats_tasks_tree = ttk.Treeview(self.stats_frame, columns=("Task", "Pomodoros", "Focus"), show="headings", height=5)
+        for tree in (self.stats_days_tree, self.stats_tasks_tree):
+            for column in tree["columns"]:
+                tree.heading(column, text=column)
+                tree.column(column, width=70, anchor="center")
+            tree.column(tree["columns"][0], width=140, anchor="w")
+        self.stats_days_tree.pack(fill="x", pady=5)
+        ttk.Label(self.stats_frame, text="Most focused tasks", font=self.font_small).pack(anchor="w")
+        self.stats_tasks_tree.pack(fill="x", pady=5)
+
+        # Timers Tab: any number of named timers (per task, per teammate) beside the main one
+        self.timers_frame = ttk.Frame(right_notebook, padding=10)
+        right_notebook.add(self.timers_frame, text="Timers")
+        timers_add = ttk.Frame(self.timers_frame)
+        timers_add.pack(fill="x")
+        self.timer_name_var = tk.StringVar()
+        ttk.Entry(timers_add, textvariable=self.timer_name_var, width=18, font=self.font_normal).pack(side="left", padx=(0, 5))
+        ttk.Button(timers_add, text="Add", command=self.add_named_timer).pack(side="left", padx=2)
+        ttk.Button(timers_add, text="For Selected Task", command=self.add_task_timers).pack(side="left", padx=2)
+        self.timers_tree = ttk.Treeview(self.timers_frame, columns=("Mode", "Left", "Pomodoros"), show="tree headings", height=8)
+        self.timers_tree.heading("#0", text="Timer")
+        self.timers_tree.column("#0", width=130)
+        for column in ("Mode", "Left", "Pomodoros"):
+            self.timers_tree.heading(column, text=column)
+            self.timers_tree.column(column, width=70, anchor="center")
+        self.timers_tree.pack(fill="both", expand=True, pady=5)
+        timers_btns = ttk.Frame(self.timers_frame)
+        timers_btns.pack(fill="x")
+        for text, action in (("Start", self.timers.start), ("Pause", self.timers.pause),
+                             ("Reset", self.timers.reset), ("Remove", self.timers.remove)):
+            ttk.Button(timers_btns, text=text, command=lambda action=action: self._each_selected_timer(action)).pack(side="left", padx=2)
+
+        # Diagnostics Tab: hot-path timings, counters and writer/audio/startup stats
+        self.diagnostics_frame = ttk.Frame(right_notebook, padding=10)
+        right_notebook.add(self.diagnostics_frame, text="Diagnostics")
+        self.diagnostics_tree = ttk.Treeview(self.diagnostics_frame, columns=("Value",), show="tree headings", height=10)
+        self.diagnostics_tree.heading("#0", text="Metric")
+        self.diagnostics_tree.heading("Value", text="Value")
+        self.diagnostics_tree.column("#0", width=130)
+        self.diagnostics_tree.column("Value", width=220)
+        self.diagnostics_tree.pack(fill="both", expand=True)
+        diagnostics_btns = ttk.Frame(self.diagnostics_frame)
+        diagnostics_btns.pack(fill="x")
+        ttk.Button(diagnostics_btns, text="Save JSON…", command=self.save_diagnostics).pack(side="left", padx=2, pady=5)
+        ttk.Button(diagnostics_btns, text="Reset", command=self.reset_diagnostics).pack(side="left", padx=2, pady=5)
+        right_notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
         # Keyboard shortcuts
         self.bind_all("<space>", self.toggle_timer_keyboard)
         self.bind_all("<Control-n>", lambda e: self.open_task_editor())
         self.bind_all("<Control-d>", lambda e: self.delete_selected_task())
+        self.bind_all("<Control-z>", self.undo)
+        self.bind_all("<Control-y>", self.redo)
+        self.bind_all("<Control-Z>", self.redo)  # Ctrl+Shift+Z
 
     # ===== TASKS handling =====
-    def refresh_task_list(self):
-        self.tasks_tree.delete(*self.tasks_tree.get_children())
-        for idx, task in enumerate(self.tasks):
-            done_mark = "✔" if task.get("done", False) else ""
-            due_str = task.get("due", "")
-            priority = task.get("priority", "Medium")
-            self.tasks_tree.insert("", "end", iid=str(idx), values=(
-                task.get("details", "")[:30] + ("..." if len(task.get("details", ""))>30 else ""),
-                due_str,
-                priority,
-                done_mark
-            ))
+    def refresh_task_list(self, removed=()):
+        # Re-reads only the visible page from the store
+        if self._tasks_readable():
+            with self.metrics.timed("refresh_task_list"):
+                self.task_list.refresh(removed)
+
+    def _tasks_readable(self):
+        # JSON tasks can be shown while they stream in; SQLite only once opened
+        return self.tasks_loaded or "first_tasks" in self.startup
+
+    def apply_task_filter(self):
+        if not self._tasks_readable():
+            return  # applied when loading finishes
+        show_done = not self.hide_done_var.get()
+        text = self.search_var.get().strip()
+        # One or two letters would match most of the list (or, as whole
+        # words, almost none of it), so keep showing everything until then
+        if len(text) >= MIN_PREFIX:
+            if not self.search_index.built:
+                self.search_index.add_all(self.store.all_tasks())
+            source = SearchQuery(self.search_index, self.store, text, show_done)
+        else:
+            self.task_query.show_done = show_done
+            source = self.task_query
+        self.task_list.set_source(source)
+
+    def sort_tasks(self, sort, descending=None):
+        # descending=None toggles when the same column is clicked again
+        if descending is None:
+            descending = sort is not None and sort == self.task_query.sort and not self.task_query.descending
+        self.task_query.sort = sort
+        self.task_query.descending = descending
+        arrow = " ▼" if self.task_query.descending else " ▲"
+        for column, text, key in (("Due", "Due Date", "due"), ("Priority", "Priority", "priority")):
+            self.tasks_tree.heading(column, text=text + (arrow if key == sort else ""))
+        if self.search_var.get():
+            self.search_var.set("")  # the trace re-applies the filter
+        else:
+            self.apply_task_filter()
+
+    def show_next_task(self):
+        # Make the top open task current and show it at the top of the due-date order
+        if not self._tasks_ready():
+            return
+        task = self._pick_next_task()
+        if task is None:
+            messagebox.showinfo("Next Task", "No open tasks left.")
+            return
+        self.sort_tasks("due", descending=False)
+        self.task_list.select(task.id)
+
+    def _pick_next_task(self):
+        if not self.tasks_loaded:
+            return None
+        task = self.store.next_task()
+        self.current_task_id = task.id if task else None
+        self._show_current_task()
+        return task
+
+    def _show_current_task(self):
+        try:
+            task = self.store.get(self.current_task_id)
+        except KeyError:
+            task = None
+        self.current_task_var.set(f"Working on: {task.title}" if task and not task.done else "")
 
     def open_task_editor(self):
+        # A new task: with a row still selected, saving would overwrite it
         self.clear_task_editor()
+        if hasattr(self, "task_list"):
+            self.task_list.clear_selection()
         self.task_title_var.set("")
         self.task_detail_var.set("")
         self.task_due_var.set("")
@@ -303,6 +785,8 @@ class PomodoroApp(tk.Tk):
         self.task_priority_var.set("Medium")
 
     def save_task(self):
+        if not self._tasks_ready():
+            return
         title = self.task_title_var.get().strip()
         detail = self.entry_task_detail.get("1.0", tk.END).strip()
         due = self.task_due_var.get().strip()
@@ -312,153 +796,630 @@ class PomodoroApp(tk.Tk):
             messagebox.showwarning("Missing Title", "Task must have a title.")
             return
 
-        if due:
-            try:
-                datetime.strptime(due, "%Y-%m-%d")
-            except ValueError:
-                messagebox.showerror("Invalid Date", "Due Date must be in YYYY-MM-DD format.")
-                return
+        try:
+            due = parse_due(due)
+        except ValueError:
+            messagebox.showerror("Invalid Date", "Due Date must be in YYYY-MM-DD format.")
+            return
 
         # Check if editing existing task
-        selected = self.tasks_tree.selection()
-        if selected:
-            idx = int(selected[0])
-            self.tasks[idx] = {
-                "title": title,
-                "details": detail,
-                "due": due,
-                "priority": priority,
-                "done": self.tasks[idx].get("done", False)
-            }
+        selected = self.task_list.selection()
+        if len(selected) == 1:
+            before = self.undo_history.capture(self.store, selected)
+            task = self.store.get(selected[0]).copy()
+            task.title = title
+            task.details = detail
+            task.due = due
+            task.priority = Priority.from_label(priority)
+            self.store.update(task)
+            self.undo_history.record("Edit", before, self.undo_history.capture(self.store, selected))
         else:
-            self.tasks.append({
-                "title": title,
-                "details": detail,
-                "due": due,
-                "priority": priority,
-                "done": False
-            })
-
-        self.save_data()
-        self.refresh_task_list()
+            try:
+                task_id = self.store.add(Task(title, detail, due, Priority.from_label(priority)))
+            except sqlite3.Error as e:  # no spare ids yet and the database stayed locked
+                messagebox.showerror("Save Failed", f"Could not add the task:\n{e}")
+                return
+            self.undo_history.record("Add", {task_id: None}, self.undo_history.capture(self.store, [task_id]))
+        self._store_changed()
         self.clear_task_editor()
+        # Rows stay selected across refreshes, so the next save would edit this one
+        self.task_list.clear_selection()
 
+    # Bulk actions: one confirmation, one store call (so one write) and one refresh
     def delete_selected_task(self, event=None):
-        selected = self.tasks_tree.selection()
+        if not self._tasks_ready():
+            return
+        selected = self.task_list.selection()
         if not selected:
             return
-        idx = int(selected[0])
-        confirm = messagebox.askyesno("Delete Task", f"Delete task: {self.tasks[idx].get('title', '')}?")
-        if confirm:
-            self.tasks.pop(idx)
-            self.save_data()
-            self.refresh_task_list()
+        if len(selected) == 1:
+            prompt = f"Delete task: {self.store.get(selected[0]).title}?"
+        else:
+            prompt = f"Delete {len(selected):,} tasks?"
+        if messagebox.askyesno("Delete Task", prompt):
+            before = self.undo_history.capture(self.store, selected)
+            self.store.delete_many(selected)
+            self.undo_history.record("Delete", before, dict.fromkeys(selected))
+            self._store_changed(removed=selected)
 
     def mark_task_done(self):
-        selected = self.tasks_tree.selection()
+        if not self._tasks_ready():
+            return
+        selected = self.task_list.selection()
         if not selected:
             return
-        idx = int(selected[0])
-        self.tasks[idx]["done"] = True
-        self.save_data()
-        self.refresh_task_list()
+        before = self.undo_history.capture(self.store, selected)
+        self.store.mark_done_many(selected)
+        self.undo_history.record("Mark Done", before, self.undo_history.capture(self.store, selected))
+        self._store_changed()
+        self.task_list.clear_selection()
+
+    def set_selected_priority(self, label):
+        self._update_selected(priority=Priority.from_label(label))
+
+    def reschedule_selected(self):
+        selected = self.task_list.selection()
+        if not selected:
+            return
+        due = simpledialog.askstring("Reschedule", f"New due date for {len(selected):,} task(s) (YYYY-MM-DD, empty for none):", parent=self)
+        if due is None:
+            return
+        try:
+            due = parse_due(due.strip())
+        except ValueError:
+            messagebox.showerror("Invalid Date", "Due Date must be in YYYY-MM-DD format.")
+            return
+        self._update_selected(due=due)
+
+    def _update_selected(self, **changes):
+        if not self._tasks_ready():
+            return
+        selected = self.task_list.selection()
+        if not selected:
+            return
+        before = self.undo_history.capture(self.store, selected)
+        tasks = [task.copy() for task in before.values()]
+        for task in tasks:
+            for name, value in changes.items():
+                setattr(task, name, value)
+        self.store.update_many(tasks)
+        self.undo_history.record("Change " + ", ".join(changes), before, {task.id: task.copy() for task in tasks})
+        self._store_changed()
+
+    def select_all_tasks(self):
+        self.task_list.select_all()
+
+    def _show_task_menu(self, event):
+        row = self.tasks_tree.identify_row(event.y)
+        if row and int(row) not in self.task_list.selected:
+            self.task_list.select(int(row))
+        try:
+            self.task_menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            self.task_menu.grab_release()
 
     def edit_selected_task(self, event=None):
-        selected = self.tasks_tree.selection()
+        selected = self.task_list.selection()
         if not selected:
             return
-        idx = int(selected[0])
-        task = self.tasks[idx]
-        self.task_title_var.set(task.get("title", ""))
+        task = self.store.get(selected[0])
+        self.task_title_var.set(task.title)
         self.entry_task_detail.delete("1.0", tk.END)
-        self.entry_task_detail.insert(tk.END, task.get("details", ""))
-        self.task_due_var.set(task.get("due", ""))
-        self.task_priority_var.set(task.get("priority", "Medium"))
+        self.entry_task_detail.insert(tk.END, task.details)
+        self.task_due_var.set(task.due_str)
+        self.task_priority_var.set(task.priority.label)
         try:
             nb = self.task_editor_frame.master
             nb.select(self.task_editor_frame)
         except Exception:
             pass
 
+    def _on_tab_changed(self, event=None):
+        self.refresh_stats()
+        self.refresh_timers()
+        self.refresh_diagnostics()
+
+    # ===== Undo / redo =====
+    def undo(self, event=None):
+        self._step_history(self.undo_history.undo, event)
+
+    def redo(self, event=None):
+        self._step_history(self.undo_history.redo, event)
+
+    def _step_history(self, step, event):
+        # In a text field the keys undo typing instead
+        if event is not None and isinstance(event.widget, (tk.Entry, tk.Text)):
+            return
+        if not self._tasks_ready():
+            return
+        with self.metrics.timed("undo_redo"):
+            result = step(self.store)
+        if result is None:
+            self.bell()
+            return
+        _, changed, removed = result
+        self._store_changed(removed=removed)
+        if len(changed) == 1:
+            self.task_list.select(changed[0])  # show what came back
+
+    # ===== Import / export =====
+    def import_tasks(self):
+        if not self._tasks_ready():
+            return
+        if self._transfer is not None:
+            return
+        path = filedialog.askopenfilename(title="Import Tasks", filetypes=TRANSFER_FILETYPES)
+        if not path:
+            return
+        try:
+            self._transfer = TaskImporter(self.store, path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Import Failed", str(e))
+            return
+        self._step_transfer()
+
+    def export_tasks(self):
+        if not self._tasks_ready():
+            return
+        if self._transfer is not None:
+            return
+        path = filedialog.asksaveasfilename(title="Export Tasks", filetypes=TRANSFER_FILETYPES, defaultextension=".jsonl")
+        if not path:
+            return
+        try:
+            self._transfer = TaskExporter(self.store, path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Export Failed", str(e))
+            return
+        self._step_transfer()
+
+    def _step_transfer(self):
+        # One batch per Tk callback, so the window stays responsive on big files
+        job = self._transfer
+        more = False
+        try:
+            more = job.step()
+        except (OSError, ValueError, sqlite3.Error) as e:
+            self.transfer_status_var.set("")
+            messagebox.showerror("Transfer Failed", str(e))
+            return
+        finally:
+            if not more:
+                # Finished or failed, however it failed: import/export are free again
+                self._transfer = None
+        importing = isinstance(job, TaskImporter)
+        if importing:
+            percent = job.bytes_read * 100 // max(1, job.total_bytes)
+            self.transfer_status_var.set(f"Importing… {job.imported:,} tasks ({percent}%)")
+        else:
+            self.transfer_status_var.set(f"Exporting… {job.exported:,} of {job.total:,} tasks")
+        if more:
+            # An import waiting for the writer to catch up looks again a little later
+            self.after(TRANSFER_WAIT_MS if job.waiting else 1, self._step_transfer)
+            return
+
+        if importing:
+            self._store_changed()
+            summary = f"Imported {job.imported:,} tasks."
+            if job.rejected:
+                lines = "\n".join(f"line {line}: {error}" for line, error in job.errors[:10])
+                summary += f"\nSkipped {job.rejected:,} invalid rows:\n{lines}"
+            self.transfer_status_var.set(f"Imported {job.imported:,} tasks")
+            messagebox.showinfo("Import Finished", summary)
+        else:
+            self.transfer_status_var.set(f"Exported {job.exported:,} tasks")
+
     # ===== TIMER functions =====
     def start_timer(self):
-        if self.timer_running:
+        if self.timer.running:
             return
-        if self.remaining_seconds == 0:
+        if self.timer.remaining_seconds() == 0:
             self._set_timer_by_mode()
+        if self._session is None:
+            self._begin_session()
 
-        self.timer_running = True
+        self.timer.start()
         self.update_timer_display()
-        self.timer_thread = threading.Thread(target=self._timer_countdown, daemon=True)
-        self.timer_thread.start()
 
     def pause_timer(self):
-        self.timer_running = False
+        self.timer.pause()
+        self._publish_status()
 
     def reset_timer(self):
-        self.timer_running = False
-        self.remaining_seconds = 0
+        self._end_session(completed=False)
+        self.timer.reset()
         self.update_timer_display()
 
     def toggle_timer_keyboard(self, event=None):
-        if self.timer_running:
+        # Space in a text field (task title, search box) is just typing
+        if event is not None and isinstance(event.widget, (tk.Entry, tk.Text)):
+            return
+        if self.timer.running:
             self.pause_timer()
         else:
             self.start_timer()
 
     def _set_timer_by_mode(self):
-        if self.current_timer_mode == "Work":
-            self.remaining_seconds = self.custom_work_mins.get() * 60
-        elif self.current_timer_mode == "Short Break":
-            self.remaining_seconds = self.custom_short_break_mins.get() * 60
-        elif self.current_timer_mode == "Long Break":
-            self.remaining_seconds = self.custom_long_break_mins.get() * 60
-
-    def _timer_countdown(self):
-        while self.timer_running and self.remaining_seconds > 0:
-            time.sleep(1)
-            if not self.timer_running:
-                break
-            self.remaining_seconds -= 1
+        self.cycle.settings.update(self._timer_settings())
+        self.timer.set(self.cycle.duration_seconds())
+
+    def _on_timer_tick(self, secs):
+        with self.metrics.timed("timer_tick"):
             self.update_timer_display()
+        self.metrics.record("timer_tick_lateness", self.timer.last_lateness)
 
-        if self.remaining_seconds == 0 and self.timer_running:
-            self.timer_running = False
-            self._play_sound()
-            self._switch_timer_mode()
+    def _on_timer_finished(self):
+        self.metrics.record("timer_drift", self.timer.last_drift)
+        self._end_session(completed=True)
+        self._play_sound()
+        self._switch_timer_mode()
 
     def update_timer_display(self):
-        mins, secs = divmod(self.remaining_seconds, 60)
+        mins, secs = divmod(self.timer.display_seconds(), 60)
         self.timer_display_var.set(f"{mins:02d}:{secs:02d}")
+        self._publish_status()
 
     def _switch_timer_mode(self):
         # Switch between work and break modes automatically
-        if self.current_timer_mode == "Work":
-            self.pomodoro_count += 1
-            if self.pomodoro_count % self.pomodoro_target.get() == 0:
-                self.current_timer_mode = "Long Break"
-            else:
-                self.current_timer_mode = "Short Break"
-        else:
-            self.current_timer_mode = "Work"
-        self.mode_label_var.set(f"Mode: {self.current_timer_mode}")
+        self.cycle.settings.update(self._timer_settings())
+        self.cycle.advance()
+        self.mode_label_var.set(f"Mode: {self.cycle.mode}")
+        if self.cycle.mode == "Work":
+            self._pick_next_task()
         self._set_timer_by_mode()
         self.update_timer_display()
         # Auto-start next session?
         # Comment next line if you want manual start
         self.start_timer()
 
-    def _play_sound(self):
-        if self.audio_file and os.path.isfile(self.audio_file):
+    # ===== Named timers =====
+    def add_named_timer(self, name=None):
+        name = (name or self.timer_name_var.get()).strip()
+        if not name:
+            messagebox.showwarning("Missing Name", "Give the timer a name.")
+            return
+        try:
+            self.timers.add(name, self._timer_settings())
+        except ValueError as e:  # the name is taken, or a duration is not positive
+            messagebox.showerror("Cannot Add Timer", str(e))
+            return
+        self.timer_name_var.set("")
+        self.refresh_timers()
+
+    def add_task_timers(self):
+        # One timer per selected task, named after it
+        if not self._tasks_ready():
+            return
+        try:
+            settings = validate_settings(self._timer_settings())
+        except ValueError as e:
+            messagebox.showerror("Cannot Add Timer", str(e))
+            return
+        for task in self.store.get_many(self.task_list.selection()):
+            if task.title not in self.timers.timers:
+                self.timers.add(task.title, settings)
+        self.refresh_timers()
+
+    def _each_selected_timer(self, action):
+        for name in self.timers_tree.selection():
+            if name in self.timers.timers:
+                action(name)
+        self.refresh_timers()
+
+    def _on_named_timer_finished(self, timer):
+        # Timers ending together share one sound
+        self.metrics.count("named_timer_finishes")
+        if not self._timer_sound_queued:
+            self._timer_sound_queued = True
+            self.after_idle(self._play_timer_sound)
+
+    def _play_timer_sound(self):
+        self._timer_sound_queued = False
+        self._play_sound()
+
+    def refresh_timers(self):
+        # Only while the tab is on screen; the timers themselves never tick
+        if self._timers_poll is not None:
+            self.after_cancel(self._timers_poll)
+            self._timers_poll = None
+        notebook = self.timers_frame.master
+        if notebook.select() != str(self.timers_frame):
+            return
+        tree = self.timers_tree
+        now = self.timers.clock()
+        for iid in tree.get_children():
+            if iid not in self.timers.timers:
+                tree.delete(iid)
+        for timer in self.timers:
+            mins, secs = divmod(math.ceil(timer.remaining_seconds(now)), 60)
+            values = (timer.cycle.mode, f"{mins:02d}:{secs:02d}" + ("" if timer.running else " ⏸"), timer.cycle.pomodoro_count)
+            if tree.exists(timer.name):
+                tree.item(timer.name, values=values)
+            else:
+                tree.insert("", "end", iid=timer.name, text=timer.name, values=values)
+        if self.timers.running:
+            self._timers_poll = self.after(TIMERS_REFRESH_MS, self.refresh_timers)
+
+    # ===== Control API =====
+    def _start_control(self, address):
+        try:
+            parsed = parse_address(address)
+        except ValueError as e:
+            messagebox.showerror("Control API", f"Could not listen on {address}:\n{e}")
+            return
+        self.control = ControlServer(parsed, {
+            "tasks.list": self._api_list_tasks,
+            "tasks.get": lambda params: self._api_ready().get(params["id"]).to_dict(),
+            "tasks.add": lambda params: self._api_add_tasks([params])[0],
+            "tasks.add_many": lambda params: self._api_add_tasks(params["tasks"]),
+            "tasks.update": lambda params: self._api_update_tasks([params])[0],
+            "tasks.update_many": lambda params: self._api_update_tasks(params["tasks"]),
+            "tasks.done": lambda params: self._api_mark_done([params["id"]]),
+            "tasks.done_many": lambda params: self._api_mark_done(params["ids"]),
+            "tasks.delete": lambda params: self._api_delete([params["id"]]),
+            "tasks.delete_many": lambda params: self._api_delete(params["ids"]),
+            "timer.start": lambda params: self._api_timer(self.start_timer),
+            "timer.pause": lambda params: self._api_timer(self.pause_timer),
+            "timer.reset": lambda params: self._api_timer(self.reset_timer),
+            "timers.list": self._api_list_timers,
+            "timers.add": self._api_add_timer,
+            "timers.start": lambda params: self._api_named_timer(self.timers.start, params["name"]),
+            "timers.pause": lambda params: self._api_named_timer(self.timers.pause, params["name"]),
+            "timers.reset": lambda params: self._api_named_timer(self.timers.reset, params["name"]),
+            "timers.remove": lambda params: self._api_named_timer(self.timers.remove, params["name"]),
+        }, self._timer_status())
+        try:
+            self.control.start()
+        except OSError as e:
+            self.control = None
+            messagebox.showerror("Control API", f"Could not listen on {address}:\n{e}")
+            return
+        self.store.add_listener(self._publish_task_change)
+        self.metrics.add_source("control", self.control.stats)
+        self.after(CONTROL_POLL_MS, self._poll_control)
+
+    def _poll_control(self):
+        # Requests wait in a queue for the Tk thread; only they ever touch the widgets
+        ran = self.control.run_pending()
+        if ran:
+            self.metrics.count("control_calls", ran)
+        self.after(CONTROL_POLL_MS, self._poll_control)
+
+    def _timer_status(self):
+        task = None
+        if self.current_task_id is not None and self.tasks_loaded:
             try:
-                # Windows sound play
-                if platform.system() == "Windows":
-                    winsound.PlaySound(self.audio_file, winsound.SND_FILENAME)
-                else:
-                    # Non-Windows systems: skip sound for now
-                    pass
-            except Exception:
+                task = self.store.get(self.current_task_id)
+            except KeyError:
                 pass
+        return {
+            "mode": self.cycle.mode,
+            "running": self.timer.running,
+            "remaining_s": self.timer.remaining_seconds(),
+            "pomodoros": self.cycle.pomodoro_count,
+            "task": {"id": task.id, "title": task.title} if task else None,
+        }
+
+    def _publish_status(self):
+        # Clients read status from here without waiting on the Tk thread
+        if self.control is not None:
+            self.control.status = self._timer_status()
+            self.control.publish("tick", self.control.status)
+
+    def _publish_task_change(self, op, task_id, task):
+        if self.control.wants("tasks"):
+            self.control.publish("tasks", {"op": op, "id": task_id, "task": task.to_dict() if task else None})
+
+    def _api_ready(self):
+        if not hasattr(self, "task_list"):
+            raise ValueError("the main window is not open yet")
+        if not self.tasks_loaded:
+            raise ValueError("tasks are still loading")
+        return self.store
+
+    def _api_list_tasks(self, params):
+        sort = params.get("sort")
+        if sort not in (None, "due", "priority"):
+            raise ValueError(f"unknown sort {sort!r}")
+        query = TaskQuery(self._api_ready(), sort, params.get("show_done", True), params.get("descending", False))
+        offset = max(0, int(params.get("offset", 0)))
+        limit = min(CONTROL_PAGE_LIMIT, max(0, int(params.get("limit", 100))))
+        return {"total": query.count(), "tasks": [task.to_dict() for task in query.page(offset, limit)]}
+
+    def _api_add_tasks(self, records):
+        # Every record is checked before any is added, so a bad one adds nothing
+        store = self._api_ready()
+        task_ids = store.add_many([task_from_record(record) for record in records])
+        self._store_changed()
+        return task_ids
+
+    def _api_update_tasks(self, records):
+        store = self._api_ready()
+        tasks = []
+        for record in records:
+            old = store.get(record["id"])
+            task = task_from_record(dict(old.to_dict(), **record))
+            task.id, task.extra = old.id, old.extra
+            tasks.append(task)
+        store.update_many(tasks)
+        self._store_changed()
+        return [task.to_dict() for task in tasks]
+
+    def _api_mark_done(self, task_ids):
+        store = self._api_ready()
+        store.get_many(task_ids)  # KeyError for unknown ids, before anything changes
+        store.mark_done_many(task_ids)
+        self._store_changed()
+        return len(task_ids)
+
+    def _api_delete(self, task_ids):
+        store = self._api_ready()
+        store.get_many(task_ids)
+        store.delete_many(task_ids)
+        self._store_changed(removed=task_ids)
+        return len(task_ids)
+
+    def _api_list_timers(self, params):
+        now = self.timers.clock()
+        return [timer.to_dict(now) for timer in self.timers]
+
+    def _api_add_timer(self, params):
+        settings = params.get("settings", {})
+        if not isinstance(settings, dict):
+            raise ValueError("settings must be an object")
+        settings = dict(self._timer_settings(), **validate_settings(settings))
+        timer = self.timers.add(str(params["name"]), settings, params.get("auto_advance", True))
+        if params.get("start"):
+            self.timers.start(timer.name)
+        self._refresh_timers_later()
+        return timer.to_dict(self.timers.clock())
+
+    def _api_named_timer(self, action, name):
+        action(name)
+        self._refresh_timers_later()
+        timer = self.timers.timers.get(name)
+        return timer.to_dict(self.timers.clock()) if timer else None
+
+    def _refresh_timers_later(self):
+        if hasattr(self, "timers_tree"):
+            self.after_idle(self.refresh_timers)
+
+    def _api_timer(self, action):
+        if not hasattr(self, "mode_label_var"):
+            raise ValueError("the main window is not open yet")
+        action()
+        return self._timer_status()
+
+    # ===== Due-date reminders =====
+    def _start_reminders(self):
+        # Built once from the loaded tasks; kept current by _on_task_change
+        self.reminders.add_all(self.store.due_tasks())
+        if self.reminders.overdue:
+            self.refresh_task_list()
+        self._show_overdue()
+        self._arm_reminder()
+
+    def _on_task_change(self, op, task_id, task):
+        # Store listener: O(log N) heap update, then move the wake-up if the top changed
+        self.reminders.on_store_change(op, task_id, task)
+        if self.reminders.built:
+            if len(self.reminders.overdue) != self._overdue_shown:
+                self._show_overdue()
+            self._arm_reminder()
+
+    def _task_row_tags(self, task):
+        return ("overdue",) if task.id in self.reminders.overdue else ()
+
+    def _arm_reminder(self):
+        # A single after() for the earliest deadline; nothing runs until then
+        deadline = self.reminders.next_deadline()
+        if deadline == self._reminder_deadline:
+            return
+        if self._reminder_call is not None:
+            self.after_cancel(self._reminder_call)
+            self._reminder_call = None
+        self._reminder_deadline = deadline
+        if deadline is not None:
+            delay = min(REMINDER_MAX_WAIT_MS, max(0, int((deadline - time.time()) * 1000) + 1))
+            self._reminder_call = self.after(delay, self._on_reminder_due)
+
+    def _on_reminder_due(self):
+        self._reminder_call = self._reminder_deadline = None
+        due = self.reminders.pop_due()
+        if due:
+            self.metrics.count("reminders", len(due))
+            self.refresh_task_list()
+            self.bell()
+            self._show_overdue(due)
+        self._arm_reminder()
+
+    def _show_overdue(self, newly_due=()):
+        # A status line under the heading rather than a dialog: how many tasks
+        # are overdue, and which ones just became so
+        self._overdue_shown = count = len(self.reminders.overdue)
+        text = f"⚠ {count:,} task{'s' if count != 1 else ''} overdue" if count else ""
+        if newly_due:
+            titles = [task.title for task in self.store.get_many(newly_due[:3])]
+            more = len(newly_due) - len(titles)
+            text += " — now due: " + ", ".join(titles) + (f" and {more:,} more" if more else "")
+        self.overdue_var.set(text)
+
+    # ===== Session history =====
+    def _begin_session(self):
+        wall, mono = time.time(), time.monotonic()
+        task_id = self.current_task_id if self.cycle.mode == "Work" else None
+        self._session = (self.cycle.mode, wall, mono, self.timer.remaining_seconds(), task_id)
+
+    def _end_session(self, completed):
+        # Logs the running session, if any; a reset or quitting counts as abandoned
+        if self._session is None:
+            return
+        mode, start_wall, start_mono, planned, task_id = self._session
+        self._session = None
+        # What the countdown used up, so pauses don't count as focus time
+        actual = planned - self.timer.remaining_seconds()
+        entry = (mode, start_wall, time.time(), start_mono, time.monotonic(), planned, task_id, completed, actual)
+        if not self.history_loaded:
+            self._unlogged_sessions.append(entry)
+            return
+        self._log_session(entry)
+        self.refresh_stats()
+
+    def _log_session(self, entry):
+        # Memory only; the log writes it on its own thread (see SessionLog.stats())
+        self.history.append(*entry)
+        self.metrics.count("sessions_logged")
+
+    def _history_read(self, error):
+        # From the loader thread: the log is in memory (or could not be read)
+        if error is not None:
+            self._unlogged_sessions = []
+            messagebox.showwarning("Session History", f"Could not read the session history; new sessions won't be logged:\n{error}")
+            return
+        self.history_loaded = True
+        for entry in self._unlogged_sessions:
+            self._log_session(entry)
+        self._unlogged_sessions = []
+        self.refresh_stats()
+
+    def refresh_stats(self):
+        if not hasattr(self, "stats_frame") or self.right_notebook.select() != str(self.stats_frame):
+            return
+        if not self.history_loaded:
+            self.stats_summary_var.set("Loading session history…")
+            return
+        today = date.today()
+        day, week = self.history.day(today), self.history.week(today)
+        self.stats_summary_var.set(
+            f"Today: {day.completed} pomodoros, {format_focus(day.work_seconds)} focus\n"
+            f"This week: {week.completed} pomodoros, {format_focus(week.work_seconds)} focus\n"
+            f"Streak: {self.history.streak(today)} days · {len(self.history):,} sessions logged")
+
+        self.stats_days_tree.delete(*self.stats_days_tree.get_children())
+        for day, totals in reversed(self.history.last_days(7, today)):
+            self.stats_days_tree.insert("", "end", values=(
+                day.strftime("%a %Y-%m-%d"), totals.completed, format_focus(totals.work_seconds)))
+
+        self.stats_tasks_tree.delete(*self.stats_tasks_tree.get_children())
+        for task_id, totals in self.history.top_tasks(5):
+            try:
+                title = self.store.get(task_id).title
+            except KeyError:
+                title = "(deleted task)"
+            self.stats_tasks_tree.insert("", "end", values=(title, totals.completed, format_focus(totals.work_seconds)))
+
+    def _play_sound(self):
+        # Queued to the audio worker; the mode switch never waits for playback
+        if self.audio_file:
+            with self.metrics.timed("play_sound"):
+                self.audio.play(self.audio_file)
+            self.after(AUDIO_CHECK_MS, self._check_audio)
+
+    def _check_audio(self):
+        error = self.audio.take_error()
+        if error:
+            self.metrics.count("sound_errors")
+            messagebox.showwarning("Sound Failed", f"Could not play the timer sound:\n{error}")
 
     # ===== Dark mode toggle =====
     def toggle_dark_mode(self):
@@ -469,31 +1430,153 @@ class PomodoroApp(tk.Tk):
 
     # ===== Data persistence =====
     def load_data(self):
-        if os.path.isfile(APP_DATA_FILE):
-            try:
-                with open(APP_DATA_FILE, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    self.tasks = data.get("tasks", [])
-                    self.custom_work_mins.set(data.get("work_mins", 25))
-                    self.custom_short_break_mins.set(data.get("short_break_mins", 5))
-                    self.custom_long_break_mins.set(data.get("long_break_mins", 15))
-                    self.pomodoro_target.set(data.get("pomodoro_target", 4))
-            except Exception:
-                self.tasks = []
+        # The store is read on a worker thread (files only) and its chunks are
+        # absorbed here on the Tk thread, a slice at a time
+        self._load_started = time.perf_counter()
+        threading.Thread(target=self._read_store, name="store-loader", daemon=True).start()
+        self.after(LOAD_POLL_MS, self._absorb_loaded)
+
+    def _read_store(self):
+        try:
+            self.history.load()
+            self._load_queue.put(("history", None))
+        except (OSError, ValueError) as e:
+            self._load_queue.put(("history", e))
+        try:
+            for chunk in self.store.read_chunks():
+                self._load_queue.put(chunk)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            self._load_queue.put(e)
+            return
+        self._load_queue.put(None)
+
+    def _absorb_loaded(self):
+        with self.metrics.timed("load_slice"):
+            self._absorb_slice()
+
+    def _absorb_slice(self):
+        deadline = time.perf_counter() + LOAD_SLICE
+        absorbed = False
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    chunk = self._load_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                if chunk is None:
+                    self._finish_loading(self.store.finish_load())
+                    return
+                if chunk[0] == "history":
+                    self._history_read(chunk[1])
+                    continue
+                self.store.absorb(chunk)
+                self.metrics.count("load_chunks")
+                absorbed = True
+                if chunk[0] == "tasks" and "first_tasks" not in self.startup:
+                    self._mark_startup("first_tasks")
+        except (OSError, ValueError, sqlite3.Error) as e:
+            self.metrics.record("load_data", time.perf_counter() - self._load_started, error=True)
+            self.tasks_heading_var.set("Your Tasks")
+            messagebox.showerror("Load Failed", f"Could not read saved tasks:\n{e}")
+            return
+        # Re-armed first, so a refresh that raises cannot stall the load
+        self.after(LOAD_POLL_MS, self._absorb_loaded)
+        if absorbed and self._tasks_readable():
+            self.tasks_heading_var.set(f"Your Tasks (loading… {self.store.count():,})")
+            if hasattr(self, "task_list"):
+                self.refresh_task_list()
+
+    def _finish_loading(self, settings):
+        self.metrics.record("load_data", time.perf_counter() - self._load_started)
+        self.tasks_loaded = True
+        self._mark_startup("tasks_loaded")
+        self.tasks_heading_var.set("Your Tasks")
+        self._show_settings(settings)
+        if hasattr(self, "task_list"):
+            self.apply_task_filter()
+        self.after_idle(self._mark_startup, "list_complete")
+        self.after(CHANGE_POLL_MS, self._poll_changes)
+        self._start_reminders()
+
+    def _show_settings(self, settings):
+        self.custom_work_mins.set(settings["work_mins"])
+        self.custom_short_break_mins.set(settings["short_break_mins"])
+        self.custom_long_break_mins.set(settings["long_break_mins"])
+        self.pomodoro_target.set(settings["pomodoro_target"])
+
+    def _poll_changes(self):
+        # Another instance may have the same data files open; show what it saved
+        try:
+            if self.store.has_changes():
+                with self.metrics.timed("reload_changes"):
+                    changes = self.store.reload_changes()
+                if changes:
+                    self.metrics.count("external_changes", len(changes))
+                    self._show_external_changes(changes)
+        except (OSError, ValueError, sqlite3.Error):
+            self.metrics.count("reload_errors")  # e.g. the database is busy; try again next time
+        self.after(CHANGE_POLL_MS, self._poll_changes)
+
+    def _show_external_changes(self, changes):
+        if ("settings", None) in changes:
+            self._show_settings(self.store.settings)
+        if ("reload", None) in changes:
+            self.reminders.add_all(self.store.due_tasks())
+            self._show_overdue()
+            self._arm_reminder()
+            self.apply_task_filter()
+        else:
+            self.refresh_task_list([task_id for op, task_id in changes if op == "delete"])
+        if self.current_task_id is not None:
+            self._show_current_task()
+
+    def _mark_startup(self, phase):
+        self.startup[phase] = time.perf_counter() - STARTED
+        if phase == "list_complete" and self.report_startup:
+            print(json.dumps(self.startup, indent=2))
+
+    def _tasks_ready(self):
+        # Task edits wait until the background load has finished
+        if not self.tasks_loaded:
+            self.bell()
+        return self.tasks_loaded
 
     def save_data(self):
-        data = {
-            "tasks": self.tasks,
+        # Tasks are journaled as they change; only the timer settings are left
+        if self.tasks_loaded:
+            with self.metrics.timed("save_data"):
+                self.store.save_settings(self._timer_settings())
+
+    def _timer_settings(self):
+        return {
             "work_mins": self.custom_work_mins.get(),
             "short_break_mins": self.custom_short_break_mins.get(),
             "long_break_mins": self.custom_long_break_mins.get(),
             "pomodoro_target": self.pomodoro_target.get()
         }
-        try:
-            with open(APP_DATA_FILE, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4)
-        except Exception:
-            pass
+
+    def _store_changed(self, removed=()):
+        # Show the change now; the store writes it on its own thread
+        self.metrics.count("store_changes")
+        self.refresh_task_list(removed)
+        if self.current_task_id is not None:
+            self._show_current_task()
+        if self._writer_poll is None:
+            self._writer_poll = self.after(WRITER_POLL_MS, self._poll_writer)
+
+    def _poll_writer(self):
+        # Rows that only appear once committed (SQLite adds) show up after the write
+        self._writer_poll = None
+        error = self.store.writer.take_error()
+        if error:
+            self.metrics.count("save_errors")
+            messagebox.showerror("Save Failed", f"Could not write task data (will keep retrying):\n{error}")
+        if self.store.writer.idle():
+            self.refresh_task_list()
+        else:
+            self._writer_poll = self.after(WRITER_POLL_MS, self._poll_writer)
 
     def load_audio_pref(self):
         if os.path.isfile(AUDIO_PREF_FILE):
@@ -512,22 +1595,131 @@ class PomodoroApp(tk.Tk):
             "permanent": self.audio_permanent
         }
         try:
-            with open(AUDIO_PREF_FILE, "w", encoding="utf-8") as f:
+            with self.metrics.timed("save_audio_pref"), open(AUDIO_PREF_FILE, "w", encoding="utf-8") as f:
                 json.dump(data, f, indent=4)
         except Exception:
-            pass
+            pass  # counted as an error under save_audio_pref
+
+    # ===== Diagnostics =====
+    def refresh_diagnostics(self):
+        # Only while the tab is on screen; rows are updated in place by name
+        if self._diagnostics_poll is not None:
+            self.after_cancel(self._diagnostics_poll)
+            self._diagnostics_poll = None
+        notebook = self.diagnostics_frame.master
+        if notebook.select() != str(self.diagnostics_frame):
+            return
+        tree = self.diagnostics_tree
+        for name, value in self.metrics.snapshot().items():
+            if isinstance(value, dict):
+                if not tree.exists(name):
+                    tree.insert("", "end", iid=name, text=name, open=True)
+                for key, item in value.items():
+                    self._set_diagnostics_row(name, f"{name}.{key}", key, item)
+            else:
+                self._set_diagnostics_row("", name, name, value)
+        self._diagnostics_poll = self.after(DIAGNOSTICS_REFRESH_MS, self.refresh_diagnostics)
+
+    def _set_diagnostics_row(self, parent, iid, text, value):
+        values = (format_metric(value),)
+        if self.diagnostics_tree.exists(iid):
+            self.diagnostics_tree.item(iid, values=values)
+        else:
+            self.diagnostics_tree.insert(parent, "end", iid=iid, text=text, values=values)
+
+    def reset_diagnostics(self):
+        self.metrics.reset()
+        self.diagnostics_tree.delete(*self.diagnostics_tree.get_children())
+        self.refresh_diagnostics()
+
+    def save_diagnostics(self):
+        path = filedialog.asksaveasfilename(title="Save Diagnostics", filetypes=[("JSON", "*.json")], defaultextension=".json")
+        if not path:
+            return
+        try:
+            self.metrics.dump(path)
+        except OSError as e:
+            messagebox.showerror("Save Failed", f"Could not write diagnostics:\n{e}")
 
     def change_audio_sound(self):
         # Open overlay again
         self._build_audio_select_overlay()
 
     def on_close(self):
-        # Save data before exit
+        # Save data before exit; close() waits for the writer to flush
         self.save_data()
+        self._end_session(completed=False)
+        if not self.history.close():
+            messagebox.showerror("Save Failed", "Some timer sessions could not be written to the history.")
+        self.audio.close()
+        self.timers.close()
+        if self.control is not None:
+            self.control.stop()
+        if not self.store.close():
+            messagebox.showerror("Save Failed", "Some changes could not be written to disk.")
+        if self.diagnostics_path:
+            try:
+                self.metrics.dump(self.diagnostics_path)
+            except OSError as e:
+                messagebox.showerror("Save Failed", f"Could not write diagnostics:\n{e}")
         self.destroy()
 
+def run_transfer(storage, import_path=None, export_path=None):
+    # Headless --import/--export: progress on stderr, no window
+    import sys
+    store = open_store(storage)
+    store.load()
+    try:
+        if import_path:
+            def progress(job):
+                percent = job.bytes_read * 100 // max(1, job.total_bytes)
+                print(f"\rimported {job.imported:,} tasks ({percent}%)", end="", file=sys.stderr)
+            job = TaskImporter(store, import_path).run(progress)
+            print(file=sys.stderr)
+            for line, error in job.errors:
+                print(f"skipped line {line}: {error}", file=sys.stderr)
+            if job.rejected > len(job.errors):
+                print(f"... {job.rejected - len(job.errors):,} more rows skipped", file=sys.stderr)
+        if export_path:
+            def progress(job):
+                print(f"\rexported {job.exported:,} of {job.total:,} tasks", end="", file=sys.stderr)
+            TaskExporter(store, export_path).run(progress)
+            print(file=sys.stderr)
+    finally:
+        if not store.close():
+            print("error: some changes could not be written", file=sys.stderr)
+            return 1
+    return 0
+
+
 if __name__ == "__main__":
-    app = PomodoroApp()
+    import argparse
+    parser = argparse.ArgumentParser(description="ToDo + Pomodoro Timer")
+    parser.add_argument("--storage", choices=["json", "sqlite"], default="json",
+                        help="task storage backend; sqlite imports the JSON data file on first use")
+    parser.add_argument("--import", dest="import_path", metavar="FILE",
+                        help="add the tasks in a .jsonl or .csv file, then exit")
+    parser.add_argument("--export", dest="export_path", metavar="FILE",
+                        help="write all tasks to a .jsonl or .csv file, then exit")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print the startup phase timings as JSON once the task list is complete")
+    parser.add_argument("--diagnostics", dest="diagnostics_path", metavar="FILE",
+                        help="write the Diagnostics tab (timings, counters, writer/audio stats) to FILE as JSON on exit")
+    parser.add_argument("--control", dest="control_address", metavar="ADDRESS",
+                        help="serve the local control API on a Unix socket path, or on a localhost PORT")
+    args = parser.parse_args()
+    if args.control_address:
+        try:
+            parse_address(args.control_address)
+        except ValueError as e:
+            parser.error(f"--control: {e}")
+    if args.import_path or args.export_path:
+        try:
+            raise SystemExit(run_transfer(args.storage, args.import_path, args.export_path))
+        except (OSError, ValueError) as e:
+            parser.exit(1, f"error: {e}\n")
+    app = PomodoroApp(storage=args.storage, report_startup=args.startup_report, diagnostics_path=args.diagnostics_path,
+                      control_address=args.control_address)
     if app.audio_file and app.audio_permanent:
         app.overlay.destroy()
         app._build_main_ui()